@@ -1,294 +1,181 @@
+"""
+Фабрика Flask-приложения.
+
+create_app() собирает конфиг, расширения и блюпринты (views/*). Модуль
+по-прежнему отдаёт готовый `app` — для gunicorn app:app, asgi.py,
+`flask --app app ...` и бенчмарков.
+
+Тяжёлые зависимости при старте не загружаются: аналитика, графики
+и выгрузка импортируются при первом обращении к своим маршрутам
+(views/reports.py), Flask-Migrate с alembic — только под `flask`-CLI.
+
+С gunicorn --preload (gunicorn.conf.py) приложение собирается один раз
+в мастере: before_fork() по желанию подгружает тяжёлые модули, закрывает
+соединения с БД и замораживает объекты для сборщика мусора, чтобы
+общие страницы памяти не копировались в каждый воркер.
+"""
+import gc
+import importlib
 import os
-from datetime import datetime, date, timedelta
-from dotenv import load_dotenv
-from flask import Flask, render_template, url_for, redirect, jsonify, request
-from flask_migrate import Migrate
-
-from models import db, Practice, PracticeDailyStatus, Hint, Example
-
-# ---------------------------------------------------------
-# Инициализация приложения
-# ---------------------------------------------------------
-
-app = Flask(__name__)
-load_dotenv()
-
-app.config["SECRET_KEY"] = "super-secret-key"
-app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-db.init_app(app)
-migrate = Migrate(app, db)
+import secrets
+from datetime import datetime
 
+from dotenv import load_dotenv
+from flask import Flask, jsonify, redirect, request, url_for
+from flask_login import LoginManager
+
+from models import db, User
+from services import db_config
+from services.cache import reference_cache
+from services.csrf import csrf
+from services.metrics import sql_metrics
+from services.page_cache import page_cache, practice_card
+
+# Профилирование SQL: лимит запросов на эндпоинт (с учётом холодного кэша)
+QUERY_BUDGETS = {
+    "practices.today_page": 10,
+    "practices.toggle_practice": 8,
+    "practices.api_sync": 16,
+    "practices.practice_detail": 5,
+    "practices.practice_form": 6,
+    "progress.progress_page": 5,
+    "progress.api_progress": 4,
+    "progress.api_progress_batch": 6,
+    "progress.history_page": 6,
+    "progress.api_history": 5,
+    "progress.digest_page": 6,
+    "reports.api_analytics": 6,
+    "reports.chart_progress": 6,
+    "reports.analytics_page": 8,
+    "search.search_page": 5,
+    "search.api_search": 5,
+}
+
+# Модули, которые по умолчанию грузятся лениво; before_fork может загрузить их в мастере
+HEAVY_MODULES = ("services.analytics", "services.charts", "services.export")
+
+login_manager = LoginManager()
+login_manager.login_view = "auth.login_page"
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return db.session.get(User, int(user_id))
+
+
+@login_manager.unauthorized_handler
+def unauthorized():
+    # JSON-эндпоинтам — 401, страницам — переход на вход
+    if request.path.startswith("/api/") or request.method != "GET":
+        return jsonify({"error": "Требуется вход"}), 401
+    return redirect(url_for("auth.login_page", next=request.path))
 
-# ---------------------------------------------------------
-# Мотивационный блок
-# ---------------------------------------------------------
 
-def generate_motivation(statuses, practices):
-    completed_count = sum(1 for s in statuses.values() if s.completed)
-    total = len(practices)
+def inject_year():
+    return {"current_year": datetime.now().year}
 
-    if completed_count == 0:
-        return "Начни с самой простой практики — движение запускается с первого шага."
 
-    if completed_count == 1:
-        return "Отлично. Одна практика — это уже точка опоры. Закрепи её."
+def configure(app, overrides=None):
+    app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-    if total > 0 and completed_count >= total * 0.5 and completed_count < total:
-        return "Ты уже в процессе. Держи темп — прогресс строится на повторении."
+    # Кэш справочных данных: CACHE_REDIS_URL — общий для всех воркеров
+    app.config["CACHE_TTL"] = int(os.getenv("CACHE_TTL", 300))
+    app.config["CACHE_MAXSIZE"] = int(os.getenv("CACHE_MAXSIZE", 256))
+    app.config["CACHE_REDIS_URL"] = os.getenv("CACHE_REDIS_URL")
 
-    if total > 0 and completed_count == total:
-        return "Сегодня ты закрыл весь список. Это и есть дисциплина в действии."
+    app.config["PAGE_CACHE_TTL"] = int(os.getenv("PAGE_CACHE_TTL", 600))
+    app.config["PAGE_CACHE_MAXSIZE"] = int(os.getenv("PAGE_CACHE_MAXSIZE", 512))
 
-    max_streak = max((s.streak for s in statuses.values()), default=0)
+    # Процессы для серверной отрисовки графиков
+    app.config["CHART_WORKERS"] = int(os.getenv("CHART_WORKERS", 2))
 
-    if max_streak >= 7:
-        return f"Серия {max_streak} дней — это уже привычка. Продолжай укреплять."
+    app.config["QUERY_BUDGETS"] = dict(QUERY_BUDGETS)
+    app.config["QUERY_BUDGET_STRICT"] = os.getenv("QUERY_BUDGET_STRICT") == "1"
+    app.config["SLOW_QUERY_MS"] = int(os.getenv("SLOW_QUERY_MS", 100))
+    app.config["DEBUG_METRICS"] = os.getenv("DEBUG_METRICS") == "1"
 
-    if max_streak >= 3:
-        return f"Серия {max_streak} дней — хороший старт. Не обрывай ритм."
+    # Cookie не уходят с чужих сайтов POST-запросом; CSRF_ENABLED — токены в формах и fetch
+    app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
+    app.config["REMEMBER_COOKIE_SAMESITE"] = "Lax"
+    app.config["CSRF_ENABLED"] = os.getenv("CSRF_ENABLED", "1") != "0"
 
-    return "Каждое выполненное действие — кирпич в твою систему. Продолжай."
+    overrides = overrides or {}
+    app.config.update(overrides)
 
+    # Secure — cookie только по HTTPS; вне отладки по умолчанию включено
+    secure = os.getenv("COOKIE_SECURE", "0" if app.debug or app.testing else "1") != "0"
+    for key in ("SESSION_COOKIE_SECURE", "REMEMBER_COOKIE_SECURE"):
+        app.config[key] = overrides.get(key, secure)
 
-# ---------------------------------------------------------
-# Маршруты
-# ---------------------------------------------------------
+    # Ключом подписана сессия с _user_id: известный всем ключ = вход под любым пользователем
+    if not app.config["SECRET_KEY"]:
+        if not (app.debug or app.testing):
+            raise RuntimeError("Не задан SECRET_KEY (переменная окружения или .env)")
+        app.config["SECRET_KEY"] = secrets.token_hex(32)
 
-@app.route("/")
-def welcome_page():
-    return render_template(
-        "welcome.html",
-        today=url_for("today_page"),
-        practices=url_for("practice_list_page"),
-        guide=url_for("guide_page"),
+    # Пул соединений: DB_POOL_SIZE, DB_MAX_OVERFLOW, ..., DB_EXTERNAL_POOLER
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS", db_config.engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
     )
 
 
-@app.route("/today")
-def today_page():
-    today = date.today()
+def create_app(config=None):
+    """Новое приложение; config — переопределения поверх переменных окружения."""
+    load_dotenv()
 
-    practices = Practice.query.all()
+    app = Flask(__name__)
+    configure(app, config)
 
-    statuses = {
-        s.practice_id: s
-        for s in PracticeDailyStatus.query.filter_by(
-            user_id=1,
-            date=today
-        ).all()
-    }
+    db.init_app(app)
+    reference_cache.init_app(app)
+    page_cache.init_app(app)
+    sql_metrics.init_app(app, caches=[reference_cache, page_cache])
+    login_manager.init_app(app)
+    csrf.init_app(app)
 
-    hints = Hint.query.all()
-    examples = Example.query.all()
+    # alembic — самый тяжёлый импорт из всех; нужен только командам flask db
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+        Migrate(app, db)
 
-    hint_of_day = hints[today.toordinal() % len(hints)] if hints else None
-    example_of_day = examples[today.toordinal() % len(examples)] if examples else None
+    from views import auth, cli, practices, progress, reports, search
 
-    motivation = generate_motivation(statuses, practices)
+    for blueprint in (auth.bp, practices.bp, progress.bp, reports.bp, search.bp, cli.bp):
+        app.register_blueprint(blueprint)
 
-    return render_template(
-        "today.html",
-        practices=practices,
-        statuses=statuses,
-        hint_of_day=hint_of_day,
-        example_of_day=example_of_day,
-        motivation=motivation
-    )
+    app.context_processor(inject_year)
+    app.add_template_global(practice_card)
 
+    return app
 
-@app.route("/guide")
-def guide_page():
-    practices = Practice.query.all()
-    return render_template("guide.html", practices=practices)
-
-
-@app.route("/practices")
-def practice_list_page():
-    practices = Practice.query.all()
-    return render_template("practice_list.html", practices=practices)
-
-
-@app.route("/practice/<int:pid>/toggle", methods=["POST"])
-def toggle_practice(pid):
-    today = date.today()
-
-    status = PracticeDailyStatus.query.filter_by(
-        user_id=1,
-        practice_id=pid,
-        date=today
-    ).first()
-
-    # Создаём статус, если его нет
-    if not status:
-        status = PracticeDailyStatus(
-            user_id=1,
-            practice_id=pid,
-            date=today,
-            completed=True
-        )
-        db.session.add(status)
-        db.session.commit()
-
-    else:
-        status.completed = not status.completed
-        db.session.commit()
-
-    # Пересчёт streak
-    if status.completed:
-        yesterday = today - timedelta(days=1)
-
-        prev = PracticeDailyStatus.query.filter_by(
-            user_id=1,
-            practice_id=pid,
-            date=yesterday,
-            completed=True
-        ).first()
-
-        status.streak = (prev.streak + 1) if prev else 1
-    else:
-        status.streak = 0
-
-    # Прогресс 14/30/60
-    s = status.streak
-    status.progress_14 = min(int(s / 14 * 100), 100)
-    status.progress_30 = min(int(s / 30 * 100), 100)
-    status.progress_60 = min(int(s / 60 * 100), 100)
-
-    db.session.commit()
-
-    return jsonify({
-        "completed": status.completed,
-        "streak": status.streak,
-        "progress_14": status.progress_14,
-        "progress_30": status.progress_30,
-        "progress_60": status.progress_60,
-        "practice_id": pid
-    })
-
-@app.route("/progress")
-def progress_page():
-    """
-    Страница визуализации прогресса: выбор практики и график.
-    """
-    practices = Practice.query.all()
-    practice_id = request.args.get("practice_id", type=int)
-    selected = None
-    if practice_id:
-        selected = Practice.query.get(practice_id)
-    return render_template(
-        "progress.html",
-        practices=practices,
-        selected_practice=selected
-    )
 
+def before_fork(app, preload_heavy=False):
+    """Мастер gunicorn --preload, перед запуском воркеров."""
+    if preload_heavy:
+        for module in HEAVY_MODULES:
+            importlib.import_module(module)
 
-@app.route("/api/progress/<int:practice_id>")
-def api_progress(practice_id):
-    """
-    JSON-данные для графика: последние 60 дней.
-    """
-    today = date.today()
-    start = today - timedelta(days=59)
-
-    statuses = (
-        PracticeDailyStatus.query
-        .filter(
-            PracticeDailyStatus.user_id == 1,
-            PracticeDailyStatus.practice_id == practice_id,
-            PracticeDailyStatus.date >= start,
-            PracticeDailyStatus.date <= today
-        )
-        .order_by(PracticeDailyStatus.date.asc())
-        .all()
-    )
+    # Соединения не должны достаться воркерам по наследству
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
 
-    by_date = {s.date: s for s in statuses}
-
-    dates, completed, streak = [], [], []
-    current_streak = 0
-
-    for i in range(60):
-        dt = start + timedelta(days=i)
-        dates.append(dt.isoformat())
-
-        st = by_date.get(dt)
-        if st and st.completed:
-            completed.append(1)
-            current_streak = st.streak if st.streak is not None else current_streak + 1
-        else:
-            completed.append(0)
-            current_streak = 0
-
-        streak.append(current_streak)
-
-    return jsonify({
-        "practice_id": practice_id,
-        "dates": dates,
-        "completed": completed,
-        "streak": streak
-    })
-@app.route("/analytics")
-def analytics_page():
-    practices = Practice.query.all()
-
-    # Преобразуем объекты Practice в словари для JSON
-    practices_data = [
-        {
-            "id": p.id,
-            "title": p.title,
-            "color": p.color
-        }
-        for p in practices
-    ]
-
-    return render_template(
-        "analytics.html",
-        practices=practices,          # для цикла {% for practice in practices %}
-        practices_data=practices_data # для передачи в JS
-    )
+    # Объекты мастера уходят из поля зрения GC: его обходы в воркерах
+    # не трогают их заголовки, и страницы остаются общими (copy-on-write)
+    gc.freeze()
 
 
-@app.route("/history")
-def history_page():
-    today = date.today()
-    start = today - timedelta(days=29)
-
-    statuses = (
-        db.session.query(PracticeDailyStatus, Practice)
-        .join(Practice, PracticeDailyStatus.practice_id == Practice.id)
-        .filter(
-            PracticeDailyStatus.user_id == 1,
-            PracticeDailyStatus.date >= start,
-            PracticeDailyStatus.date <= today
-        )
-        .order_by(PracticeDailyStatus.date.desc())
-        .all()
-    )
-
-    history = {}
-    for s, p in statuses:
-        history.setdefault(s.date, []).append({
-            "practice_title": p.title,
-            "practice_color": p.color,
-            "completed": s.completed
-        })
+def after_fork(app):
+    """Воркер сразу после fork: пул начинается с чистого листа, сокеты мастера не закрываем."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
 
-    return render_template("history.html", history=history)
-
-# ---------------------------------------------------------
-# Контекстные процессоры
-# ---------------------------------------------------------
-
-@app.context_processor
-def inject_year():
-    return {"current_year": datetime.now().year}
 
+app = create_app()
 
-# ---------------------------------------------------------
-# Запуск
-# ---------------------------------------------------------
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,245 @@
+"""
+ASGI-режим: JSON API на async SQLAlchemy, остальное — то же Flask-приложение.
+
+Горячие JSON-эндпоинты (/api/progress, переключение практики, /api/analytics)
+обслуживают асинхронные обработчики Starlette поверх asyncpg / aiosqlite:
+пока запрос ждёт БД, воркер принимает следующие. SQL строят те же функции
+services/*, модели общие (models.py). Все остальные маршруты, включая вход
+и страницы, уходят во Flask через WSGI-адаптер.
+
+    uvicorn asgi:app --workers 4
+
+Пользователь берётся из подписанной Flask-сессии (или remember-куки
+Flask-Login), поэтому вход работает в обоих режимах одинаково; CSRF-токен
+изменяющих запросов тот же, что выдаёт Flask (services/csrf.py).
+"""
+from contextlib import asynccontextmanager
+from datetime import date
+from functools import wraps
+
+from a2wsgi import WSGIMiddleware
+from flask_login.utils import decode_cookie
+from itsdangerous import BadSignature
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from app import app as flask_app
+from models import Practice
+from services import archive, db_config, progress, summaries
+from services.csrf import ERROR_MESSAGE, HEADER_NAME, SAFE_METHODS, is_valid, user_token
+from services.daily_status import toggle_statement
+from services.page_cache import touch_statement
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url):
+    """Тот же DATABASE_URL, но с асинхронным драйвером."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"Нет асинхронного драйвера для {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+engine = create_async_engine(
+    async_url(flask_app.config["SQLALCHEMY_DATABASE_URI"]),
+    **db_config.engine_options(flask_app.config["SQLALCHEMY_DATABASE_URI"], is_async=True, name="async")
+)
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+# ---------------------------------------------------------
+# Авторизация по cookie Flask
+# ---------------------------------------------------------
+
+def current_user_id(request):
+    cookie = request.cookies.get(flask_app.config["SESSION_COOKIE_NAME"])
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+
+    if cookie and serializer:
+        max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        try:
+            user_id = serializer.loads(cookie, max_age=max_age).get("_user_id")
+        except BadSignature:
+            user_id = None
+        if user_id:
+            return int(user_id)
+
+    remember = request.cookies.get(flask_app.config.get("REMEMBER_COOKIE_NAME", "remember_token"))
+    if remember:
+        with flask_app.app_context():
+            user_id = decode_cookie(remember)
+        if user_id:
+            return int(user_id)
+
+    return None
+
+
+def csrf_passed(request, user_id):
+    if not flask_app.config["CSRF_ENABLED"]:
+        return True
+    expected = user_token(flask_app.config["SECRET_KEY"], user_id)
+    return is_valid(expected, request.headers.get(HEADER_NAME))
+
+
+def login_required(handler):
+    @wraps(handler)
+    async def wrapper(request):
+        user_id = current_user_id(request)
+        if user_id is None:
+            return JSONResponse({"error": "Требуется вход"}, status_code=401)
+        if request.method not in SAFE_METHODS and not csrf_passed(request, user_id):
+            return JSONResponse({"error": ERROR_MESSAGE}, status_code=403)
+        return await handler(request, user_id)
+    return wrapper
+
+
+async def all_practice_ids(session):
+    return list(await session.scalars(select(Practice.id).order_by(Practice.id)))
+
+
+def parse_ids(request):
+    return progress.parse_ids(request.query_params.get("ids"))
+
+
+# ---------------------------------------------------------
+# Прогресс
+# ---------------------------------------------------------
+
+async def build_series(session, user_id, practice_ids, days=progress.PROGRESS_DAYS):
+    start, today = progress.window(days)
+
+    by_date = {s.date: s for s in await session.scalars(summaries.range_query(user_id, start, today))}
+    rows = (await session.execute(progress.streaks_query(user_id, practice_ids, start, today))).all()
+
+    return progress.assemble(practice_ids, start, days, by_date, {(pid, dt): value for pid, dt, value in rows})
+
+
+@login_required
+async def api_progress(request, user_id):
+    practice_id = request.path_params["practice_id"]
+
+    async with Session() as session:
+        series = await build_series(session, user_id, [practice_id])
+
+    return JSONResponse(series[practice_id])
+
+
+@login_required
+async def api_progress_batch(request, user_id):
+    try:
+        practice_ids = parse_ids(request)
+    except ValueError:
+        return JSONResponse({"error": "ids должны быть целыми числами"}, status_code=400)
+
+    async with Session() as session:
+        if practice_ids is None:
+            practice_ids = await all_practice_ids(session)
+        series = await build_series(session, user_id, practice_ids)
+
+    return JSONResponse({"practices": [series[pid] for pid in practice_ids]})
+
+
+# ---------------------------------------------------------
+# Переключение практики
+# ---------------------------------------------------------
+
+@login_required
+async def toggle_practice(request, user_id):
+    practice_id = request.path_params["practice_id"]
+    today = date.today()
+    dialect = engine.dialect.name
+
+    # Тот же upsert и пересчёт сводки дня, что и в sync-режиме, одной транзакцией
+    async with Session.begin() as session:
+        if await session.scalar(select(Practice.id).where(Practice.id == practice_id)) is None:
+            return JSONResponse({"error": "Практика не найдена"}, status_code=404)
+
+        # Сначала блокировка строки пользователя — сводка не потеряет параллельную отметку
+        await session.execute(touch_statement(user_id))
+        status = (await session.execute(toggle_statement(dialect, user_id, practice_id, today))).one()
+
+        rows = (await session.execute(summaries.day_query(user_id, today))).all()
+        total = (await session.execute(summaries.total_practices_query())).scalar()
+        values = summaries.summary_values(user_id, today, rows, total)
+        await session.execute(summaries.upsert_statement(values, dialect))
+
+    return JSONResponse({
+        "completed": status.completed,
+        "streak": status.streak,
+        "progress_14": status.progress_14,
+        "progress_30": status.progress_30,
+        "progress_60": status.progress_60,
+        "practice_id": practice_id
+    })
+
+
+# ---------------------------------------------------------
+# Аналитика
+# ---------------------------------------------------------
+
+@login_required
+async def api_analytics(request, user_id):
+    # numpy — только при первом запросе аналитики, не при старте воркера
+    from services import analytics
+
+    metric = request.path_params["metric"]
+    if metric not in analytics.METRICS:
+        return JSONResponse({"error": f"Неизвестная метрика: {metric}"}, status_code=404)
+
+    try:
+        days = analytics.parse_days(request.query_params.get("days", "365"))
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    try:
+        practice_ids = parse_ids(request)
+    except ValueError:
+        return JSONResponse({"error": "ids должны быть целыми числами"}, status_code=400)
+
+    today = date.today()
+
+    async with Session() as session:
+        if practice_ids is None:
+            practice_ids = await all_practice_ids(session)
+        if days:
+            start = analytics.window_start(user_id, today, days)
+        else:
+            start = (await session.scalar(analytics.first_day_query(user_id))) or today
+        rows = (await session.execute(analytics.matrix_query(user_id, practice_ids, start, today))).all()
+        if start < archive.horizon(today):
+            archived = await session.execute(archive.month_query(user_id, practice_ids, start, today))
+            rows += archive.expand(archived.all(), start, today)
+
+    # numpy — в пуле потоков, чтобы не держать цикл событий
+    result = await run_in_threadpool(
+        lambda: analytics.summarize(metric, analytics.matrix_from_rows(practice_ids, start, today, rows), today)
+    )
+    return JSONResponse(result)
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    yield
+    await engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        Route("/api/progress/{practice_id:int}", api_progress),
+        Route("/api/progress", api_progress_batch),
+        Route("/practice/{practice_id:int}/toggle", toggle_practice, methods=["POST"]),
+        Route("/api/analytics/{metric}", api_analytics),
+        Mount("/", app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan,
+)
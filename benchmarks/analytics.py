@@ -0,0 +1,62 @@
+"""
+Масштабирование векторной аналитики (services.analytics) на многолетней истории.
+
+Строит синтетические строки (practice_id, date) без БД и замеряет сборку
+матрицы и каждую метрику для окон от года до десяти лет.
+
+    python benchmarks/analytics.py --practices 40 --years 1 3 5 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from services import analytics  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--practices", type=int, default=40)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--rate", type=float, default=0.7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    end = date.today()
+    practice_ids = list(range(1, args.practices + 1))
+
+    print(f"{'years':>5} {'rows':>9} {'matrix':>9} " + " ".join(f"{m:>9}" for m in analytics.METRICS))
+    for years in args.years:
+        start = end - timedelta(days=365 * years - 1)
+        days = (end - start).days + 1
+        rows = [
+            (pid, start + timedelta(days=d))
+            for pid in practice_ids
+            for d in range(days)
+            if rng.random() < args.rate
+        ]
+
+        build_ms = best_of(lambda: analytics.matrix_from_rows(practice_ids, start, end, rows), args.repeat)
+        matrix = analytics.matrix_from_rows(practice_ids, start, end, rows)
+        metric_ms = [best_of(lambda fn=fn: fn(matrix), args.repeat) for fn in analytics.METRICS.values()]
+
+        print(f"{years:>5} {len(rows):>9} {build_ms:>7.2f}ms " + " ".join(f"{ms:>7.2f}ms" for ms in metric_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Пропускная способность JSON API: sync (gunicorn) против async (uvicorn, asgi.py).
+
+Поднимает по очереди оба сервера на одной и той же БД с одинаковым числом
+воркеров и держит заданное число одновременных соединений от имени
+синтетических пользователей. По каждому маршруту печатает RPS, перцентили
+задержки и число ошибок, результат сохраняет в JSON.
+
+    python benchmarks/async_vs_sync.py --users 200 --concurrency 64 --duration 15
+    python benchmarks/async_vs_sync.py --database-url postgresql://... --skip-seed
+
+На SQLite оба режима упираются в сам файл БД; разница видна на Postgres,
+где запрос в основном ждёт сеть.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run import RESULTS_DIR, git_revision, percentile  # noqa: E402
+
+ROUTES = {
+    "api_progress": ("GET", "/api/progress/{practice_id}"),
+    "api_progress_batch": ("GET", "/api/progress"),
+    "toggle": ("POST", "/practice/{practice_id}/toggle"),
+    "api_analytics": ("GET", "/api/analytics/weekdays?days=365"),
+}
+
+SERVERS = {
+    "sync": lambda port, workers: [
+        sys.executable, "-m", "gunicorn", "app:app",
+        "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+    ],
+    "async": lambda port, workers: [
+        sys.executable, "-m", "uvicorn", "asgi:app",
+        "--workers", str(workers), "--port", str(port), "--log-level", "warning",
+    ],
+}
+
+
+def seed(args):
+    from app import app
+    from models import db, Practice, User
+    from services import synthetic
+
+    with app.app_context():
+        if not args.skip_seed:
+            db.create_all()
+            rows = synthetic.generate(
+                users=args.users, practices=args.practices, days=args.days, log=lambda *_: None
+            )
+            print(f"seed: {rows} строк")
+
+        usernames = [
+            u.username for u in User.query
+            .filter(User.username.like(f"{synthetic.SYNTHETIC_PREFIX}%"))
+            .limit(args.users)
+        ]
+        practice_ids = [p.id for p in Practice.query.order_by(Practice.id).limit(args.practices)]
+
+    return usernames, practice_ids
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/login")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"Сервер на порту {port} не поднялся")
+
+
+def login(port, username):
+    from services.synthetic import SYNTHETIC_PASSWORD
+
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request(
+        "POST", "/login",
+        body=urlencode({"username": username, "password": SYNTHETIC_PASSWORD}),
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    response = conn.getresponse()
+    response.read()
+    cookies = [
+        value.split(";", 1)[0]
+        for name, value in response.getheaders() if name.lower() == "set-cookie"
+    ]
+    return "; ".join(cookies)
+
+
+def hammer(port, method, path_template, cookies, practice_ids, concurrency, duration, seed):
+    """concurrency потоков, у каждого своё keep-alive соединение, duration секунд."""
+    timings, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(n):
+        rng = random.Random(seed + n)
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        local, failed = [], 0
+
+        while time.monotonic() < deadline:
+            path = path_template.format(practice_id=rng.choice(practice_ids))
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, headers={"Cookie": rng.choice(cookies)})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port)
+                ok = False
+
+            if ok:
+                local.append((time.perf_counter() - started) * 1000)
+            else:
+                failed += 1
+
+        with lock:
+            timings.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(timings),
+        "errors": errors[0],
+        "rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+    }
+
+
+def run_mode(mode, args, usernames, practice_ids):
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    server = subprocess.Popen(SERVERS[mode](args.port, args.workers), cwd=ROOT, env=env)
+
+    try:
+        wait_for_port(args.port)
+        rng = random.Random(args.seed)
+        cookies = [login(args.port, u) for u in rng.sample(usernames, min(args.sample, len(usernames)))]
+
+        report = {}
+        for name in args.routes:
+            method, path = ROUTES[name]
+            # Прогрев: соединения пула, справочный кэш
+            hammer(args.port, method, path, cookies, practice_ids, args.concurrency, 1, args.seed)
+            report[name] = hammer(
+                args.port, method, path, cookies, practice_ids, args.concurrency, args.duration, args.seed
+            )
+        return report
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def print_report(result):
+    print(f"\nrevision {result['revision']}, {result['params']}")
+    print(f"{'route':20} {'mode':6} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for name in result["params"]["routes"]:
+        for mode in SERVERS:
+            r = result["modes"][mode][name]
+            print(
+                f"{name:20} {mode:6} {r['rps']:8.1f} {r['p50_ms']:8.2f}ms {r['p95_ms']:8.2f}ms "
+                f"{r['p99_ms']:8.2f}ms {r['errors']:7d}"
+            )
+        sync_rps = result["modes"]["sync"][name]["rps"]
+        if sync_rps:
+            print(f"{'':20} async/sync: x{result['modes']['async'][name]['rps'] / sync_rps:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///" + os.path.join(ROOT, "bench.db"))
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--practices", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sample", type=int, default=50, help="Сколько пользователей участвует.")
+    parser.add_argument("--workers", type=int, default=2, help="Воркеров у каждого сервера.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных соединений.")
+    parser.add_argument("--duration", type=float, default=10, help="Секунд на маршрут.")
+    parser.add_argument("--port", type=int, default=8710)
+    parser.add_argument("--routes", default=",".join(ROUTES), help="Через запятую: " + ", ".join(ROUTES))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-seed", action="store_true", help="Использовать уже заполненную БД.")
+    parser.add_argument("--output", default=None, help="Куда сохранить JSON (по умолчанию benchmarks/results/).")
+    args = parser.parse_args()
+
+    args.routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    unknown = set(args.routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"Неизвестные маршруты: {', '.join(sorted(unknown))}")
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("CSRF_ENABLED", "0")
+    usernames, practice_ids = seed(args)
+
+    result = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "database": args.database_url.split(":", 1)[0],
+        "params": {
+            "users": args.users, "practices": args.practices, "days": args.days,
+            "workers": args.workers, "concurrency": args.concurrency,
+            "duration": args.duration, "routes": args.routes,
+        },
+        "modes": {mode: run_mode(mode, args, usernames, practice_ids) for mode in SERVERS},
+    }
+    print_report(result)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{result['revision']}-async.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nрезультат: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Список записей форм (PracticeEntry) на 10 000 строк.
+
+Заполняет SQLite-базу записями одной практики и сравнивает:
+  per-row  — текстовая колонка и json.loads на каждое обращение (как было);
+  orm-json — ORM-объекты с JSON-колонкой (разбор при загрузке каждой строки);
+  bulk     — services.entries.EntryList: текст + один json.loads на весь список;
+  render   — полный рендер practice_detail.html из EntryList;
+а также проверку формы скомпилированной схемой против разбора схемы на каждый запрос.
+
+    python benchmarks/entries.py --entries 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.analytics import best_of  # noqa: E402
+
+SCHEMA = [
+    {"key": "mood", "label": "Настроение", "type": "select", "options": ["плохо", "так себе", "хорошо"]},
+    {"key": "minutes", "label": "Минут", "type": "number", "min": 0, "max": 600},
+    {"key": "note", "label": "Заметка", "type": "text", "max_length": 500},
+]
+
+FORM = {"mood": "хорошо", "minutes": "25", "note": "Спокойно подышал перед сном"}
+
+
+def seed(app, entries):
+    from models import db, Practice, PracticeEntry, User
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(username="bench")
+        user.set_password("bench")
+        practice = Practice(title="Дыхание", form_schema_json=json.dumps(SCHEMA, ensure_ascii=False))
+        db.session.add_all([user, practice])
+        db.session.commit()
+
+        rng = random.Random(0)
+        start = date.today() - timedelta(days=entries)
+        db.session.execute(PracticeEntry.__table__.insert(), [
+            {
+                "user_id": user.id,
+                "practice_id": practice.id,
+                "entry_date": (start + timedelta(days=i)).isoformat(),
+                "fields": {
+                    "mood": rng.choice(SCHEMA[0]["options"]),
+                    "minutes": rng.randint(5, 60),
+                    "note": "запись " * rng.randint(1, 20),
+                },
+            }
+            for i in range(entries)
+        ])
+        db.session.commit()
+        return user.id, practice.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite:///" + os.path.join(ROOT, "bench_entries.db"))
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    from flask import render_template
+    from sqlalchemy import Text, cast, select
+
+    from app import app
+    from models import db, Practice, PracticeEntry
+    from services import entries, schemas
+
+    user_id, practice_id = seed(app, args.entries)
+
+    def per_row():
+        rows = db.session.execute(
+            select(PracticeEntry.entry_date, cast(PracticeEntry.fields, Text).label("fields_json"))
+            .where(PracticeEntry.user_id == user_id, PracticeEntry.practice_id == practice_id)
+        ).all()
+        # Старое свойство PracticeEntry.fields: json.loads на каждую строку
+        return [json.loads(r.fields_json) for r in rows]
+
+    def orm_json():
+        db.session.expunge_all()
+        rows = PracticeEntry.query.filter_by(user_id=user_id, practice_id=practice_id).all()
+        return [r.fields for r in rows]
+
+    def bulk():
+        rows = entries.list_entries(user_id, practice_id)
+        return [r.fields for r in rows]
+
+    with app.app_context():
+        practice = db.session.get(Practice, practice_id)
+        schema = schemas.for_practice(practice)
+
+        results = {
+            "per-row": best_of(per_row, args.repeat),
+            "orm-json": best_of(orm_json, args.repeat),
+            "bulk": best_of(bulk, args.repeat),
+        }
+
+        with app.test_request_context():
+            results["render"] = best_of(lambda: render_template(
+                "practice_detail.html",
+                practice=practice,
+                schema=schema.fields,
+                entries=entries.list_entries(user_id, practice_id)
+            ), args.repeat)
+
+        validations = 1000
+        results[f"validate x{validations} (каждый раз разбор)"] = best_of(
+            lambda: [schemas.compile_schema(practice.form_schema_json).validate(FORM) for _ in range(validations)],
+            args.repeat
+        )
+        results[f"validate x{validations} (кэш)"] = best_of(
+            lambda: [schemas.for_practice(practice).validate(FORM) for _ in range(validations)],
+            args.repeat
+        )
+
+    print(f"{args.entries} записей, {args.database_url.split(':', 1)[0]}")
+    for name, ms in results.items():
+        print(f"{name:>36} {ms:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Нагрузочный тест пула соединений.
+
+Держит --concurrency одновременных запросов к JSON API внутри одного
+процесса (как gthread-воркер gunicorn) с пулом из переменных окружения
+DB_POOL_* и проверяет, что соединения не кончаются: нет таймаутов пула,
+ошибок и пик занятых соединений не выше pool_size + max_overflow. Для
+Postgres параллельно снимается число соединений в pg_stat_activity.
+
+Дополнительно считает, сколько соединений откроет инстанс из --workers
+процессов, и сверяет с --max-connections сервера БД.
+
+    DB_POOL_SIZE=5 DB_MAX_OVERFLOW=5 python benchmarks/pool_load.py --concurrency 32
+    DB_EXTERNAL_POOLER=1 python benchmarks/pool_load.py --database-url postgresql://.../pgbouncer
+
+Код выхода 1 — если пул исчерпан или лимит сервера будет превышен.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run import percentile  # noqa: E402
+
+ROUTES = [
+    ("GET", "/api/progress/{practice_id}"),
+    ("GET", "/api/progress"),
+    ("POST", "/practice/{practice_id}/toggle"),
+    ("GET", "/api/analytics/weekdays?days=90"),
+]
+
+
+def server_connections(engine, stop, samples):
+    """Раз в 200 мс — число соединений к нашей БД на стороне Postgres."""
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        while not stop.is_set():
+            samples.append(conn.execute(
+                text("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")
+            ).scalar())
+            stop.wait(0.2)
+
+
+def run(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("CSRF_ENABLED", "0")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+
+    from app import app
+    from models import db, Practice, User
+    from services import db_config, synthetic
+    from services.db_config import pool_stats
+
+    with app.app_context():
+        if not args.skip_seed:
+            db.create_all()
+            synthetic.generate(users=args.users, practices=args.practices, days=args.days, log=lambda *_: None)
+
+        usernames = [
+            u.username for u in User.query
+            .filter(User.username.like(f"{synthetic.SYNTHETIC_PREFIX}%"))
+            .limit(args.users)
+        ]
+        practice_ids = [p.id for p in Practice.query.order_by(Practice.id).limit(args.practices)]
+
+    options = app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+    rng = random.Random(args.seed)
+
+    clients = []
+    for username in rng.sample(usernames, min(args.concurrency, len(usernames))):
+        client = app.test_client()
+        client.post("/login", data={"username": username, "password": synthetic.SYNTHETIC_PASSWORD})
+        clients.append(client)
+
+    pool_stats.reset()
+
+    stop = threading.Event()
+    pg_samples = []
+    watcher = None
+    if args.database_url.startswith("postgresql"):
+        watcher = threading.Thread(
+            target=server_connections,
+            args=(create_engine(args.database_url, poolclass=NullPool), stop, pg_samples)
+        )
+        watcher.start()
+
+    timings, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def worker(n):
+        local_rng = random.Random(args.seed + n)
+        client = clients[n % len(clients)]
+        local, failed = [], []
+
+        while time.monotonic() < deadline:
+            method, url = local_rng.choice(ROUTES)
+            started = time.perf_counter()
+            try:
+                response = client.open(url.format(practice_id=local_rng.choice(practice_ids)), method=method)
+                if response.status_code != 200:
+                    failed.append(f"{method} {url}: {response.status_code}")
+            except Exception as exc:  # таймаут пула и прочие сбои — тоже результат
+                failed.append(f"{method} {url}: {type(exc).__name__}: {exc}")
+            local.append((time.perf_counter() - started) * 1000)
+
+        with lock:
+            timings.extend(local)
+            errors.extend(failed)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    if watcher:
+        watcher.join()
+
+    pool = pool_stats.snapshot().get("default", {})
+    limit = options.get("pool_size", 0) + options.get("max_overflow", 0) if "pool_size" in options else None
+    per_instance = db_config.max_connections(options, args.workers)
+
+    return {
+        "database": args.database_url.split(":", 1)[0],
+        "pool": {k: v for k, v in options.items() if k.startswith("pool_") or k == "max_overflow"} | {
+            "poolclass": options.get("poolclass", type(None)).__name__,
+        },
+        "concurrency": args.concurrency,
+        "requests": len(timings),
+        "rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "pool_timeouts": pool.get("timeouts", 0),
+        "pool_invalidations": pool.get("invalidations", 0),
+        "pool_peak_checked_out": pool.get("peak_checked_out", 0),
+        "pool_limit": limit,
+        "pool_wait_max_ms": round(pool.get("wait_max_seconds", 0) * 1000, 3),
+        "pool_wait_avg_ms": round(pool.get("wait_seconds", 0) * 1000 / max(pool.get("checkouts", 0), 1), 3),
+        "server_connections_peak": max(pg_samples) if pg_samples else None,
+        "instance_max_connections": per_instance,
+        "workers": args.workers,
+        "max_connections": args.max_connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///" + os.path.join(ROOT, "bench.db"))
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--practices", type=int, default=10)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных запросов в процессе.")
+    parser.add_argument("--duration", type=float, default=15, help="Секунд нагрузки.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 4)),
+                        help="Процессов gunicorn на инстанс — для расчёта соединений.")
+    parser.add_argument("--max-connections", type=int, default=100, help="max_connections сервера БД.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-seed", action="store_true", help="Использовать уже заполненную БД.")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    problems = []
+    if result["pool_timeouts"]:
+        problems.append(f"таймаутов пула: {result['pool_timeouts']}")
+    if result["errors"]:
+        problems.append(f"ошибок: {result['errors']}")
+    if result["pool_limit"] is not None and result["pool_peak_checked_out"] > result["pool_limit"]:
+        problems.append(f"пик {result['pool_peak_checked_out']} выше лимита пула {result['pool_limit']}")
+    if result["instance_max_connections"] and result["instance_max_connections"] > args.max_connections:
+        problems.append(
+            f"{args.workers} воркеров × пул = {result['instance_max_connections']} "
+            f"соединений при max_connections {args.max_connections}"
+        )
+
+    if problems:
+        print("ПУЛ ИСЧЕРПАН: " + "; ".join(problems))
+        sys.exit(1)
+    print(f"OK: {args.concurrency} одновременных запросов без исчерпания пула")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Нагрузочный прогон всех основных маршрутов.
+
+Заполняет БД синтетическими пользователями и историей (services.synthetic),
+затем через тестовый клиент Flask гоняет /today, переключение практики,
+/api/progress/<id>, /history и /analytics от имени случайных пользователей.
+По каждому маршруту печатает пропускную способность, перцентили задержки
+и число SQL-запросов на запрос, а результат сохраняет в JSON, чтобы
+сравнивать прогоны между коммитами.
+
+    python benchmarks/run.py --users 300 --days 365
+    python benchmarks/run.py --skip-seed --cold --compare benchmarks/results/<прошлый>.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+ROUTES = [
+    ("today", "GET", "/today"),
+    ("toggle", "POST", "/practice/{practice_id}/toggle"),
+    ("api_progress", "GET", "/api/progress/{practice_id}"),
+    ("history", "GET", "/history"),
+    ("analytics", "GET", "/analytics"),
+]
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class QueryCounter:
+    """Считает SQL-запросы, выполненные движком."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def run(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("CSRF_ENABLED", "0")
+
+    from app import app
+    from models import db, Practice, User
+    from services import synthetic
+    from services.page_cache import page_cache
+
+    with app.app_context():
+        if not args.skip_seed:
+            db.create_all()
+            started = time.perf_counter()
+            rows = synthetic.generate(
+                users=args.users, practices=args.practices, days=args.days, log=lambda *_: None
+            )
+            print(f"seed: {rows} строк за {time.perf_counter() - started:.1f}s")
+
+        usernames = [
+            u.username for u in User.query
+            .filter(User.username.like(f"{synthetic.SYNTHETIC_PREFIX}%"))
+            .limit(args.users)
+        ]
+        practice_ids = [p.id for p in Practice.query.order_by(Practice.id).limit(args.practices)]
+        counter = QueryCounter(db.engine)
+
+    rng = random.Random(args.seed)
+    sample = rng.sample(usernames, min(args.sample, len(usernames)))
+
+    clients = []
+    for username in sample:
+        client = app.test_client()
+        client.post("/login", data={"username": username, "password": synthetic.SYNTHETIC_PASSWORD})
+        clients.append(client)
+
+    # Прогрев: компиляция шаблонов и справочный кэш
+    for name, method, url in ROUTES:
+        clients[0].open(url.format(practice_id=practice_ids[0]), method=method)
+
+    report = {}
+    for name, method, url in ROUTES:
+        timings, queries = [], []
+        started_route = time.perf_counter()
+
+        for i in range(args.requests):
+            client = clients[i % len(clients)]
+            target = url.format(practice_id=rng.choice(practice_ids))
+            if args.cold:
+                page_cache.clear()
+
+            before = counter.count
+            started = time.perf_counter()
+            response = client.open(target, method=method)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count - before)
+
+            if response.status_code != 200:
+                raise SystemExit(f"{method} {target}: {response.status_code}")
+
+        elapsed = time.perf_counter() - started_route
+        report[name] = {
+            "requests": len(timings),
+            "rps": round(len(timings) / elapsed, 1),
+            "p50_ms": round(percentile(timings, 0.50), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "p99_ms": round(percentile(timings, 0.99), 3),
+            "queries_avg": round(sum(queries) / len(queries), 2),
+            "queries_max": max(queries),
+        }
+
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "database": args.database_url.split(":", 1)[0],
+        "params": {
+            "users": args.users, "practices": args.practices, "days": args.days,
+            "requests": args.requests, "sample": len(sample), "cold": args.cold,
+        },
+        "routes": report,
+    }
+
+
+def print_report(result, baseline=None):
+    print(f"\nrevision {result['revision']}, {result['params']}")
+    print(f"{'route':14} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}")
+    for name, r in result["routes"].items():
+        line = (
+            f"{name:14} {r['rps']:8.1f} {r['p50_ms']:8.2f}ms {r['p95_ms']:8.2f}ms "
+            f"{r['p99_ms']:8.2f}ms {r['queries_avg']:8.2f}"
+        )
+        old = (baseline or {}).get("routes", {}).get(name)
+        if old and old["p50_ms"]:
+            line += f"   p50 {(r['p50_ms'] / old['p50_ms'] - 1) * 100:+.0f}% к {baseline['revision']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///" + os.path.join(ROOT, "bench.db"))
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--practices", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--requests", type=int, default=300, help="Запросов на маршрут.")
+    parser.add_argument("--sample", type=int, default=50, help="Сколько пользователей участвует.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cold", action="store_true", help="Сбрасывать кэш страниц перед каждым запросом.")
+    parser.add_argument("--skip-seed", action="store_true", help="Использовать уже заполненную БД.")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Порог p99; превышение — код выхода 1.")
+    parser.add_argument("--output", default=None, help="Куда сохранить JSON (по умолчанию benchmarks/results/).")
+    parser.add_argument("--compare", default=None, help="JSON прошлого прогона для сравнения.")
+    args = parser.parse_args()
+
+    result = run(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{result['revision']}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nрезультат: {output}")
+
+    if args.budget_ms is not None:
+        over = [name for name, r in result["routes"].items() if r["p99_ms"] > args.budget_ms]
+        if over:
+            print(f"p99 превысил бюджет {args.budget_ms}ms: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Сидинг справочного контента (services.init_practtices) на тысячах элементов.
+
+Генерирует файл контента заданного размера и замеряет три прогона
+на одной БД: первичную загрузку, повтор без изменений и повтор,
+в котором изменена доля --change практик и подсказок.
+
+    python benchmarks/seeding.py --practices 500 --per-practice 10 --hints 3000
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+
+def content(practices, per_practice, hints):
+    return {
+        "practices": [
+            {
+                "title": f"Практика {i}",
+                "description": f"Описание практики {i}",
+                "motivation": "Повторение делает привычку устойчивой.",
+                "form_schema": [{"key": "note", "label": "Заметка", "type": "text"}],
+                "tips": [f"Совет {j} к практике {i}" for j in range(per_practice)],
+                "examples": [f"Пример {j} к практике {i}" for j in range(per_practice)],
+            }
+            for i in range(practices)
+        ],
+        "hints": [f"Подсказка дня {i}" for i in range(hints)],
+        "examples": [f"Пример дня {i}" for i in range(hints)],
+    }
+
+
+def changed(data, share):
+    data = copy.deepcopy(data)
+    step = max(int(1 / share), 1) if share else 0
+    if step:
+        for item in data["practices"][::step]:
+            item["description"] += " (обновлено)"
+            item["tips"][0] += " (обновлено)"
+        data["hints"] = [h + " (обновлено)" if i % step == 0 else h for i, h in enumerate(data["hints"])]
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///" + os.path.join(ROOT, "bench_seed.db"))
+    parser.add_argument("--practices", type=int, default=500)
+    parser.add_argument("--per-practice", type=int, default=10, help="Советов и примеров на практику.")
+    parser.add_argument("--hints", type=int, default=3000, help="Подсказок и примеров дня.")
+    parser.add_argument("--change", type=float, default=0.1, help="Доля изменённого контента в третьем прогоне.")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    from app import app
+    from models import db
+    from services import init_practtices
+
+    data = content(args.practices, args.per_practice, args.hints)
+    items = args.practices * (1 + 2 * args.per_practice) + 2 * args.hints
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        print(f"{items} элементов контента, {args.database_url.split(':', 1)[0]}")
+        for name, payload, prune in (
+            ("первичная загрузка", data, False),
+            ("повтор без изменений", data, False),
+            (f"изменено {args.change:.0%}", changed(data, args.change), True),
+        ):
+            started = time.perf_counter()
+            init_practtices.seed(payload, prune=prune, log=lambda *_: None)
+            print(f"{name:>24} {time.perf_counter() - started:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
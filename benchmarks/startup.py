@@ -0,0 +1,126 @@
+"""
+Время старта приложения.
+
+Каждый замер — в новом процессе python, --repeat раз, берётся медиана:
+
+  import      — `import app` (фабрика + блюпринты, без тяжёлых модулей);
+  first       — import + первый запрос GET /login;
+  heavy       — первый запрос /api/analytics после входа: сюда
+                переезжает загрузка numpy, которой больше нет при старте;
+  flask_help  — `flask --help` (CLI без alembic);
+  flask_db    — `flask db --help` (CLI с Flask-Migrate).
+
+Дополнительно печатает, какие тяжёлые модули оказались загружены сразу
+после `import app`.
+
+    python benchmarks/startup.py --repeat 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Модули, появление которых при старте — регрессия
+WATCHED = ("numpy", "matplotlib", "alembic", "flask_migrate", "services.analytics", "services.export")
+
+
+def probe(kind):
+    """Выполняется в дочернем процессе; печатает JSON с замером."""
+    started = time.perf_counter()
+    import app as module
+
+    result = {"import": time.perf_counter() - started}
+    result["loaded"] = [name for name in WATCHED if name in sys.modules]
+
+    if kind == "import":
+        return result
+
+    from models import db
+
+    with module.app.app_context():
+        db.create_all()
+
+    client = module.app.test_client()
+    started = time.perf_counter()
+    assert client.get("/login").status_code == 200
+    result["first"] = result["import"] + time.perf_counter() - started
+
+    if kind == "heavy":
+        client.post("/register", data={"username": "bench", "password": "bench"})
+        started = time.perf_counter()
+        assert client.get("/api/analytics/weekdays?days=30").status_code == 200
+        result["heavy"] = time.perf_counter() - started
+
+    return result
+
+
+def child(kind, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, SECRET_KEY=os.getenv("SECRET_KEY", "benchmark"),
+               CSRF_ENABLED=os.getenv("CSRF_ENABLED", "0"))
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    output = subprocess.run(
+        [sys.executable, __file__, "--probe", kind],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def cli(args, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, SECRET_KEY=os.getenv("SECRET_KEY", "benchmark"), FLASK_APP="app")
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "flask", *args],
+        cwd=ROOT, env=env, check=True, capture_output=True
+    )
+    return time.perf_counter() - started
+
+
+def run(repeat):
+    timings = {key: [] for key in ("import", "first", "heavy", "flask_help", "flask_db")}
+    loaded = set()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in range(repeat):
+            # Новая БД на каждый прогон: регистрация в "heavy" не должна конфликтовать
+            url = "sqlite:///" + os.path.join(tmp, f"startup_{n}.db")
+
+            result = child("import", url)
+            timings["import"].append(result["import"])
+            loaded.update(result["loaded"])
+
+            result = child("heavy", url)
+            timings["first"].append(result["first"])
+            timings["heavy"].append(result["heavy"])
+
+            timings["flask_help"].append(cli(["--help"], url))
+            timings["flask_db"].append(cli(["db", "--help"], url))
+
+    summary = {key: round(statistics.median(values) * 1000, 1) for key, values in timings.items()}
+    summary = {f"{key}_ms": value for key, value in summary.items()}
+    summary["loaded_at_import"] = sorted(loaded)
+    summary["repeat"] = repeat
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Прогонов каждого замера.")
+    parser.add_argument("--probe", choices=["import", "heavy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        print(json.dumps(probe(args.probe)))
+        return
+
+    print(json.dumps(run(args.repeat), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
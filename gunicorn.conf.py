@@ -0,0 +1,30 @@
+"""
+Настройки gunicorn: gunicorn -c gunicorn.conf.py app:app
+
+GUNICORN_PRELOAD=1 (по умолчанию) — приложение импортируется один раз
+в мастере, воркеры получают его через fork и стартуют почти мгновенно.
+PRELOAD_HEAVY_MODULES=1 — заодно загрузить в мастере numpy и остальное
+из app.HEAVY_MODULES: память общая на все воркеры, первая аналитика
+без задержки, но мастер стартует дольше.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", 4))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    # Мастер, после загрузки приложения и до запуска воркеров
+    if preload_app:
+        from app import app, before_fork
+
+        before_fork(app, preload_heavy=os.getenv("PRELOAD_HEAVY_MODULES") == "1")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import app, after_fork
+
+        after_fork(app)
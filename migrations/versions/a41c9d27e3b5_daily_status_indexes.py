@@ -0,0 +1,46 @@
+"""daily status indexes
+
+Revision ID: a41c9d27e3b5
+Revises: 3d5c7cf6ff79
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c9d27e3b5'
+down_revision = '3d5c7cf6ff79'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Дубликаты (user_id, practice_id, date) могли появиться при быстрых
+    # повторных кликах — оставляем самую свежую запись
+    op.execute(
+        "DELETE FROM practice_daily_status "
+        "WHERE id NOT IN ("
+        "    SELECT MAX(id) FROM practice_daily_status "
+        "    GROUP BY user_id, practice_id, date"
+        ")"
+    )
+
+    op.create_index(
+        'uq_daily_status_user_practice_date',
+        'practice_daily_status',
+        ['user_id', 'practice_id', 'date'],
+        unique=True
+    )
+    op.create_index(
+        'ix_daily_status_user_date',
+        'practice_daily_status',
+        ['user_id', 'date'],
+        postgresql_include=['practice_id', 'completed', 'streak']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_daily_status_user_date', table_name='practice_daily_status')
+    op.drop_index('uq_daily_status_user_practice_date', table_name='practice_daily_status')
@@ -0,0 +1,56 @@
+"""entry fields json and schema version
+
+Revision ID: b6d2e8f4a0c3
+Revises: f1c4e7a29b35
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2e8f4a0c3'
+down_revision = 'f1c4e7a29b35'
+branch_labels = None
+depends_on = None
+
+
+def _fields_type():
+    return sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+
+def upgrade():
+    with op.batch_alter_table('practice') as batch_op:
+        batch_op.add_column(sa.Column('schema_version', sa.Integer(), nullable=False, server_default='1'))
+
+    with op.batch_alter_table('practice_entry') as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('fields', _fields_type(), nullable=True))
+
+    # Текст -> JSON один раз при миграции, а не при каждом чтении
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("UPDATE practice_entry SET fields = fields_json::jsonb WHERE fields_json IS NOT NULL AND fields_json <> ''")
+    else:
+        op.execute("UPDATE practice_entry SET fields = fields_json WHERE fields_json IS NOT NULL AND fields_json <> ''")
+
+    with op.batch_alter_table('practice_entry') as batch_op:
+        batch_op.drop_column('fields_json')
+        batch_op.alter_column('user_id', server_default=None)
+        batch_op.create_index('ix_practice_entry_user_practice_date', ['user_id', 'practice_id', 'entry_date'])
+
+
+def downgrade():
+    with op.batch_alter_table('practice_entry') as batch_op:
+        batch_op.add_column(sa.Column('fields_json', sa.Text(), nullable=True))
+
+    op.execute("UPDATE practice_entry SET fields_json = CAST(fields AS TEXT) WHERE fields IS NOT NULL")
+
+    with op.batch_alter_table('practice_entry') as batch_op:
+        batch_op.drop_index('ix_practice_entry_user_practice_date')
+        batch_op.drop_column('fields')
+        batch_op.drop_column('user_id')
+
+    with op.batch_alter_table('practice') as batch_op:
+        batch_op.drop_column('schema_version')
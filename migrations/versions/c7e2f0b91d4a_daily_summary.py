@@ -0,0 +1,71 @@
+"""daily summary
+
+Revision ID: c7e2f0b91d4a
+Revises: a41c9d27e3b5
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2f0b91d4a'
+down_revision = 'a41c9d27e3b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_summary',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('total_practices', sa.Integer(), nullable=False),
+    sa.Column('completed_bitmap', sa.Text(), nullable=False),
+    sa.Column('tracked_bitmap', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_daily_summary_user_date', 'daily_summary', ['user_id', 'date'], unique=True)
+
+    _backfill()
+
+
+def _bitmap(condition, max_id):
+    """Битовая строка services.summaries.build_bitmap в SQL: символ № id, хвостовые нули срезаны."""
+    chars = " || ".join(
+        f"CASE WHEN max(CASE WHEN practice_id = {pid} AND {condition} THEN 1 ELSE 0 END) = 1 "
+        f"THEN '1' ELSE '0' END"
+        for pid in range(max_id + 1)
+    )
+    return f"rtrim({chars}, '0')"
+
+
+def _backfill():
+    """Сводки по уже накопленной истории — одним INSERT ... SELECT по (user_id, date)."""
+    bind = op.get_bind()
+    # Битовые строки — до последней существующей практики, как в summaries.day_query
+    max_id = bind.execute(sa.text("SELECT max(id) FROM practice")).scalar()
+    if max_id is None:
+        return
+
+    op.execute(
+        "INSERT INTO daily_summary "
+        "(user_id, date, completed_count, total_practices, completed_bitmap, tracked_bitmap, updated_at) "
+        "SELECT user_id, date, "
+        "sum(CASE WHEN completed THEN 1 ELSE 0 END), "
+        "(SELECT count(*) FROM practice), "
+        f"{_bitmap('completed', max_id)}, "
+        f"{_bitmap('1 = 1', max_id)}, "
+        "CURRENT_TIMESTAMP "
+        "FROM practice_daily_status "
+        "WHERE practice_id IN (SELECT id FROM practice) "
+        "GROUP BY user_id, date"
+    )
+
+
+def downgrade():
+    op.drop_index('uq_daily_summary_user_date', table_name='daily_summary')
+    op.drop_table('daily_summary')
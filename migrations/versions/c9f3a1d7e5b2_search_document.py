@@ -0,0 +1,96 @@
+"""search document with tsvector / fts5 index
+
+Revision ID: c9f3a1d7e5b2
+Revises: b6d2e8f4a0c3
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9f3a1d7e5b2'
+down_revision = 'b6d2e8f4a0c3'
+branch_labels = None
+depends_on = None
+
+POSTGRES_DDL = [
+    "ALTER TABLE search_document ADD COLUMN tsv tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', title), 'A') || "
+    "setweight(to_tsvector('russian', body), 'B')) STORED",
+    "CREATE INDEX ix_search_document_tsv ON search_document USING gin (tsv)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE search_fts USING fts5("
+    "title, body, content='search_document', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+# Значения полей записи через перевод строки
+ENTRY_BODY = {
+    'postgresql': "(SELECT coalesce(string_agg(value, E'\\n'), '') FROM jsonb_each_text(e.fields))",
+    'sqlite': "(SELECT coalesce(group_concat(value, char(10)), '') FROM json_each(e.fields))",
+}
+
+NL = {'postgresql': "E'\\n'", 'sqlite': "char(10)"}
+
+
+def upgrade():
+    op.create_table('search_document',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('ref_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('practice_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_search_document_kind_ref', 'search_document', ['kind', 'ref_id'], unique=True)
+    op.create_index('ix_search_document_user', 'search_document', ['user_id'])
+
+    dialect = op.get_bind().dialect.name
+    for statement in POSTGRES_DDL if dialect == 'postgresql' else SQLITE_DDL:
+        op.execute(statement)
+
+    # Начальное наполнение; дальше индекс ведёт services.search
+    nl = NL[dialect]
+    op.execute(
+        "INSERT INTO search_document (kind, ref_id, practice_id, title, body, updated_at) "
+        "SELECT 'practice', id, id, title, "
+        f"coalesce(description, '') || {nl} || coalesce(quote, '') || {nl} || coalesce(motivation, ''), "
+        "CURRENT_TIMESTAMP FROM practice"
+    )
+    for kind, source in (('practice_tip', 'practice_tip'), ('practice_example', 'practice_example')):
+        op.execute(
+            "INSERT INTO search_document (kind, ref_id, practice_id, title, body, updated_at) "
+            f"SELECT '{kind}', id, practice_id, '', text, CURRENT_TIMESTAMP FROM {source}"
+        )
+    for kind in ('hint', 'example'):
+        op.execute(
+            "INSERT INTO search_document (kind, ref_id, title, body, updated_at) "
+            f"SELECT '{kind}', id, '', text, CURRENT_TIMESTAMP FROM {kind}"
+        )
+    op.execute(
+        "INSERT INTO search_document (kind, ref_id, user_id, practice_id, title, body, updated_at) "
+        f"SELECT 'entry', e.id, e.user_id, e.practice_id, e.entry_date, {ENTRY_BODY[dialect]}, CURRENT_TIMESTAMP "
+        "FROM practice_entry e"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS search_fts")
+    op.drop_index('ix_search_document_user', table_name='search_document')
+    op.drop_index('uq_search_document_kind_ref', table_name='search_document')
+    op.drop_table('search_document')
@@ -0,0 +1,41 @@
+"""digest
+
+Revision ID: d3a8b5c61f07
+Revises: c7e2f0b91d4a
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8b5c61f07'
+down_revision = 'c7e2f0b91d4a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('digest',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('completions', sa.Integer(), nullable=False),
+    sa.Column('active_days', sa.Integer(), nullable=False),
+    sa.Column('streak_change', sa.Integer(), nullable=False),
+    sa.Column('best_practice_id', sa.Integer(), nullable=True),
+    sa.Column('best_practice_completions', sa.Integer(), nullable=False),
+    sa.Column('per_practice_json', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['best_practice_id'], ['practice.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_digest_user_period', 'digest', ['user_id', 'period', 'period_start'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_digest_user_period', table_name='digest')
+    op.drop_table('digest')
@@ -0,0 +1,26 @@
+"""user data version for page cache and etags
+
+Revision ID: d8b4f2a6c1e9
+Revises: c9f3a1d7e5b2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b4f2a6c1e9'
+down_revision = 'c9f3a1d7e5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,139 @@
+"""partition daily status by month, month archive
+
+Revision ID: f1c4e7a29b35
+Revises: d3a8b5c61f07
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c4e7a29b35'
+down_revision = 'd3a8b5c61f07'
+branch_labels = None
+depends_on = None
+
+# Сколько месяцев вперёд создать сразу; дальше — flask ensure-partitions
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, n):
+    total = month.year * 12 + month.month - 1 + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _create_indexes():
+    op.create_index(
+        'uq_daily_status_user_practice_date',
+        'practice_daily_status',
+        ['user_id', 'practice_id', 'date'],
+        unique=True
+    )
+    op.create_index(
+        'ix_daily_status_user_date',
+        'practice_daily_status',
+        ['user_id', 'date'],
+        postgresql_include=['practice_id', 'completed', 'streak']
+    )
+
+
+def upgrade():
+    op.create_table('practice_month_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('practice_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('completed_bits', sa.Integer(), nullable=False),
+    sa.Column('tracked_bits', sa.Integer(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('first_day', sa.Date(), nullable=False),
+    sa.Column('streak_at_end', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['practice_id'], ['practice.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_month_archive_user_practice_month', 'practice_month_archive',
+                    ['user_id', 'practice_id', 'month'], unique=True)
+    op.create_index('ix_month_archive_user_month', 'practice_month_archive', ['user_id', 'month'])
+
+    # Секционирование — только Postgres; в SQLite таблица остаётся обычной
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_daily_status_user_date', table_name='practice_daily_status')
+    op.drop_index('uq_daily_status_user_practice_date', table_name='practice_daily_status')
+    op.execute("ALTER TABLE practice_daily_status RENAME TO practice_daily_status_plain")
+    op.execute(
+        "ALTER TABLE practice_daily_status_plain "
+        "RENAME CONSTRAINT practice_daily_status_pkey TO practice_daily_status_plain_pkey"
+    )
+
+    # Ключ секционирования обязан входить в первичный ключ
+    op.execute(
+        "CREATE TABLE practice_daily_status ("
+        "    LIKE practice_daily_status_plain INCLUDING DEFAULTS,"
+        "    PRIMARY KEY (id, date)"
+        ") PARTITION BY RANGE (date)"
+    )
+    op.execute(
+        "ALTER TABLE practice_daily_status "
+        "ADD FOREIGN KEY (practice_id) REFERENCES practice (id)"
+    )
+    op.execute("ALTER SEQUENCE practice_daily_status_id_seq OWNED BY practice_daily_status.id")
+
+    first = bind.execute(sa.text("SELECT MIN(date) FROM practice_daily_status_plain")).scalar()
+    month = (first or date.today()).replace(day=1)
+    last = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE practice_daily_status_p{month:%Y%m} "
+            f"PARTITION OF practice_daily_status "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    # Страховка: строки вне созданных месяцев не ломают вставку
+    op.execute("CREATE TABLE practice_daily_status_default PARTITION OF practice_daily_status DEFAULT")
+
+    op.execute("INSERT INTO practice_daily_status SELECT * FROM practice_daily_status_plain")
+    op.execute("DROP TABLE practice_daily_status_plain")
+
+    _create_indexes()
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_daily_status_user_date', table_name='practice_daily_status')
+        op.drop_index('uq_daily_status_user_practice_date', table_name='practice_daily_status')
+        op.execute("ALTER TABLE practice_daily_status RENAME TO practice_daily_status_parted")
+        op.execute(
+            "ALTER TABLE practice_daily_status_parted "
+            "RENAME CONSTRAINT practice_daily_status_pkey TO practice_daily_status_parted_pkey"
+        )
+        op.execute(
+            "CREATE TABLE practice_daily_status ("
+            "    LIKE practice_daily_status_parted INCLUDING DEFAULTS"
+            ")"
+        )
+        op.execute(
+            "ALTER TABLE practice_daily_status "
+            "ADD CONSTRAINT practice_daily_status_pkey PRIMARY KEY (id)"
+        )
+        op.execute(
+            "ALTER TABLE practice_daily_status "
+            "ADD FOREIGN KEY (practice_id) REFERENCES practice (id)"
+        )
+        op.execute("ALTER SEQUENCE practice_daily_status_id_seq OWNED BY practice_daily_status.id")
+        op.execute("INSERT INTO practice_daily_status SELECT * FROM practice_daily_status_parted")
+        op.execute("DROP TABLE practice_daily_status_parted")
+        _create_indexes()
+
+    op.drop_index('ix_month_archive_user_month', table_name='practice_month_archive')
+    op.drop_index('uq_month_archive_user_practice_month', table_name='practice_month_archive')
+    op.drop_table('practice_month_archive')
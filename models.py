@@ -3,6 +3,9 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm.base import NO_VALUE
 
 # Инициализируем db здесь, а в app.py вызываем db.init_app(app)
 db = SQLAlchemy()
@@ -14,6 +17,8 @@ class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
+    # Растёт при каждом изменении данных пользователя — ключ ETag и кэша страниц
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -32,6 +37,8 @@ class Practice(db.Model):
     description = db.Column(db.String(500))
     quote = db.Column(db.String(500))
     form_schema_json = db.Column(db.Text)
+    # Растёт при каждом изменении схемы — ключ кэша скомпилированных валидаторов
+    schema_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     # ЗАЧАТКИ НОВОЙ КОНЦЕПЦИИ (можем использовать позже, не ломая старое)
     color = db.Column(db.String(20))
@@ -50,63 +57,30 @@ class Practice(db.Model):
         return f"<Practice {self.title}>"
 
 
+@event.listens_for(Practice.form_schema_json, "set", active_history=True)
+def _bump_schema_version(target, value, oldvalue, initiator):
+    if oldvalue is not NO_VALUE and value != oldvalue:
+        target.schema_version = (target.schema_version or 1) + 1
+
+
 class PracticeEntry(db.Model):
     __tablename__ = "practice_entry"
+    __table_args__ = (
+        db.Index("ix_practice_entry_user_practice_date", "user_id", "practice_id", "entry_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, default=1)
     practice_id = db.Column(db.Integer, db.ForeignKey("practice.id"), nullable=False)
     entry_date = db.Column(db.String(20), nullable=False)
-    fields_json = db.Column(db.Text)
 
-    @property
-    def fields(self):
-        if not self.fields_json:
-            return {}
-        return json.loads(self.fields_json)
+    # Ответы формы, проверенные services.schemas: JSONB на Postgres, текст в SQLite
+    fields = db.Column(db.JSON().with_variant(JSONB(), "postgresql"))
 
     def __repr__(self):
         return f"<PracticeEntry practice_id={self.practice_id} date={self.entry_date}>"
 
 
-def init_practices():
-    """Создаёт базовые практики, если их нет."""
-    if Practice.query.count() > 0:
-        return
-
-    practices = [
-        Practice(
-            title="Осознанность",
-            description="Эта практика помогает выйти из автоматизма...",
-            quote="Ты становишься тем, на что направляешь внимание.",
-            form_schema_json=json.dumps([
-                {"key": "reflection", "label": "Что ты заметил?", "type": "text"},
-                {"key": "emotion", "label": "Какие эмоции возникли?", "type": "text"},
-            ], ensure_ascii=False)
-        ),
-        Practice(
-            title="Благодарность",
-            description="Практика благодарности переключает внимание...",
-            quote="Благодарность — это магнит для хорошего.",
-            form_schema_json=json.dumps([
-                {"key": "item1", "label": "Благодарность №1", "type": "text"},
-                {"key": "item2", "label": "Благодарность №2", "type": "text"},
-                {"key": "item3", "label": "Благодарность №3", "type": "text"},
-            ], ensure_ascii=False)
-        ),
-        Practice(
-            title="Цель дня",
-            description="Одна чёткая цель на день создаёт ясность...",
-            quote="Фокус создаёт результат.",
-            form_schema_json=json.dumps([
-                {"key": "goal", "label": "Главная цель дня", "type": "text"},
-            ], ensure_ascii=False)
-        ),
-    ]
-
-    db.session.add_all(practices)
-    db.session.commit()
-
-
 class PracticeExample(db.Model):
     __tablename__ = "practice_example"
 
@@ -131,10 +105,17 @@ class PracticeTip(db.Model):
 
 class PracticeDailyStatus(db.Model):
     __tablename__ = "practice_daily_status"
+    __table_args__ = (
+        # Одна запись на пользователя, практику и день
+        db.Index("uq_daily_status_user_practice_date", "user_id", "practice_id", "date", unique=True),
+        # Выборки «все практики пользователя за период» (сегодня, история)
+        db.Index("ix_daily_status_user_date", "user_id", "date",
+                 postgresql_include=["practice_id", "completed", "streak"]),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
-    # Авторизация отключена, но поле оставляем для будущего
+    # Все выборки идут по текущему пользователю — см. индексы выше
     user_id = db.Column(db.Integer, nullable=False, default=1)
 
     practice_id = db.Column(db.Integer, db.ForeignKey("practice.id"), nullable=False)
@@ -155,6 +136,174 @@ class PracticeDailyStatus(db.Model):
         return f"<DailyStatus practice={self.practice_id} date={self.date} completed={self.completed}>"
 
 
+class DailySummary(db.Model):
+    """
+    Сводка пользователя за день: сколько практик выполнено из скольких.
+    Битовые строки индексируются id практики: символ № id — '1' или '0'.
+    Поддерживается services.summaries при каждом переключении.
+    """
+    __tablename__ = "daily_summary"
+    __table_args__ = (
+        db.Index("uq_daily_summary_user_date", "user_id", "date", unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, default=1)
+    date = db.Column(db.Date, nullable=False)
+
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    total_practices = db.Column(db.Integer, nullable=False, default=0)
+
+    # Практики, выполненные в этот день
+    completed_bitmap = db.Column(db.Text, nullable=False, default="")
+    # Практики, у которых в этот день вообще есть запись
+    tracked_bitmap = db.Column(db.Text, nullable=False, default="")
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def is_completed(self, practice_id):
+        return practice_id < len(self.completed_bitmap) and self.completed_bitmap[practice_id] == "1"
+
+    def is_tracked(self, practice_id):
+        return practice_id < len(self.tracked_bitmap) and self.tracked_bitmap[practice_id] == "1"
+
+    def __repr__(self):
+        return f"<DailySummary user={self.user_id} date={self.date} {self.completed_count}/{self.total_practices}>"
+
+
+class PracticeMonthArchive(db.Model):
+    """
+    Сжатый месяц practice_daily_status: одна строка на пользователя,
+    практику и месяц вместо строки на каждый день. Бит № (день - 1)
+    в completed_bits / tracked_bits — выполнено / есть запись.
+    Пишется командой flask archive-statuses, см. services.archive.
+    """
+    __tablename__ = "practice_month_archive"
+    __table_args__ = (
+        db.Index("uq_month_archive_user_practice_month", "user_id", "practice_id", "month", unique=True),
+        db.Index("ix_month_archive_user_month", "user_id", "month"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    practice_id = db.Column(db.Integer, db.ForeignKey("practice.id"), nullable=False)
+
+    # Первое число месяца
+    month = db.Column(db.Date, nullable=False)
+
+    completed_bits = db.Column(db.Integer, nullable=False, default=0)
+    tracked_bits = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Первый день с записью и серия на последний день месяца
+    first_day = db.Column(db.Date, nullable=False)
+    streak_at_end = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MonthArchive user={self.user_id} practice={self.practice_id} {self.month:%Y-%m}>"
+
+
+class Digest(db.Model):
+    """
+    Готовые итоги пользователя за неделю или месяц.
+    Считаются фоновой командой flask build-digests, страница только читает.
+    """
+    __tablename__ = "digest"
+    __table_args__ = (
+        db.Index("uq_digest_user_period", "user_id", "period", "period_start", unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+
+    # "week" или "month"
+    period = db.Column(db.String(10), nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+
+    completions = db.Column(db.Integer, nullable=False, default=0)
+    active_days = db.Column(db.Integer, nullable=False, default=0)
+    streak_change = db.Column(db.Integer, nullable=False, default=0)
+
+    best_practice_id = db.Column(db.Integer, db.ForeignKey("practice.id"))
+    best_practice_completions = db.Column(db.Integer, nullable=False, default=0)
+
+    # Выполнения по практикам: {"practice_id": count}
+    per_practice_json = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    best_practice = db.relationship("Practice")
+
+    @property
+    def per_practice(self):
+        if not self.per_practice_json:
+            return {}
+        return {int(k): v for k, v in json.loads(self.per_practice_json).items()}
+
+    def __repr__(self):
+        return f"<Digest user={self.user_id} {self.period} {self.period_start}>"
+
+
+class SearchDocument(db.Model):
+    """
+    Строка поискового индекса (services.search): практика, подсказка,
+    пример или запись формы. user_id пуст у общего контента.
+    Полнотекстовый индекс поверх таблицы свой у каждой СУБД — см. DDL ниже.
+    """
+    __tablename__ = "search_document"
+    __table_args__ = (
+        db.Index("uq_search_document_kind_ref", "kind", "ref_id", unique=True),
+        db.Index("ix_search_document_user", "user_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    ref_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)
+    practice_id = db.Column(db.Integer)
+    title = db.Column(db.String(200), nullable=False, default="")
+    body = db.Column(db.Text, nullable=False, default="")
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SearchDocument {self.kind}:{self.ref_id}>"
+
+
+# Postgres: tsvector считается самой БД при каждой записи, поверх — GIN
+SEARCH_POSTGRES_DDL = [
+    "ALTER TABLE search_document ADD COLUMN tsv tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', title), 'A') || "
+    "setweight(to_tsvector('russian', body), 'B')) STORED",
+    "CREATE INDEX ix_search_document_tsv ON search_document USING gin (tsv)",
+]
+
+# SQLite: FTS5 с внешним содержимым, синхронизируется триггерами
+SEARCH_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE search_fts USING fts5("
+    "title, body, content='search_document', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+for _statement in SEARCH_POSTGRES_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SEARCH_SQLITE_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    SearchDocument.__table__, "after_drop",
+    DDL("DROP TABLE IF EXISTS search_fts").execute_if(dialect="sqlite")
+)
+
+
 class Hint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.Text, nullable=False)
@@ -0,0 +1,226 @@
+"""
+Долгосрочная аналитика на NumPy.
+
+История пользователя за окно загружается одним запросом в булеву
+матрицу практики × дни, дальше все метрики считаются векторно:
+доля выполнения по дням недели, скользящие средние 7/30 дней,
+самые длинные серии и тепловая карта по неделям.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func, select, union_all
+
+from models import db, PracticeDailyStatus, PracticeMonthArchive
+from services import archive
+
+# Верхняя граница окна: двадцать лет
+MAX_DAYS = 366 * 20
+
+WEEKDAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+
+
+class CompletionMatrix:
+    """Матрица выполнения: values[i, j] — практика practice_ids[i] выполнена в день start + j."""
+
+    def __init__(self, practice_ids, start, values):
+        self.practice_ids = list(practice_ids)
+        self.start = start
+        self.values = values
+
+    @property
+    def days(self):
+        return self.values.shape[1]
+
+    def dates(self):
+        return [(self.start + timedelta(days=i)).isoformat() for i in range(self.days)]
+
+
+def parse_days(value):
+    """?days=: число дней или all (None — вся история)."""
+    if value == "all":
+        return None
+    try:
+        days = int(value)
+    except ValueError:
+        raise ValueError("days — число дней или all")
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError("days вне допустимого диапазона")
+    return days
+
+
+def window_start(user_id, today, days=None):
+    """Начало окна: days дней назад или (days=None) первая запись пользователя."""
+    if days:
+        return today - timedelta(days=days - 1)
+
+    first = db.session.execute(first_day_query(user_id)).scalar()
+    return first or today
+
+
+def first_day_query(user_id):
+    """Первый день с записью — по живой таблице и архиву месяцев."""
+    live = select(func.min(PracticeDailyStatus.date).label("day")).where(PracticeDailyStatus.user_id == user_id)
+    archived = (
+        select(func.min(PracticeMonthArchive.first_day).label("day"))
+        .where(PracticeMonthArchive.user_id == user_id)
+    )
+    days = union_all(live, archived).subquery()
+    return select(func.min(days.c.day))
+
+
+def load_matrix(user_id, practice_ids, start, end):
+    rows = db.session.execute(matrix_query(user_id, practice_ids, start, end)).all()
+    if start < archive.horizon(end):
+        rows += archive.expand(db.session.execute(archive.month_query(user_id, practice_ids, start, end)), start, end)
+    return matrix_from_rows(practice_ids, start, end, rows)
+
+
+def matrix_query(user_id, practice_ids, start, end):
+    """Пары (practice_id, date) выполненных дней за окно."""
+    table = PracticeDailyStatus.__table__
+    return select(table.c.practice_id, table.c.date).where(
+        table.c.user_id == user_id,
+        table.c.practice_id.in_(practice_ids),
+        table.c.date >= start,
+        table.c.date <= end,
+        table.c.completed.is_(True)
+    )
+
+
+def matrix_from_rows(practice_ids, start, end, rows):
+    """rows — пары (practice_id, date) выполненных дней."""
+    days = (end - start).days + 1
+    values = np.zeros((len(practice_ids), days), dtype=bool)
+
+    if rows:
+        pids, dates = zip(*rows)
+        row_index = {pid: i for i, pid in enumerate(practice_ids)}
+        rows_idx = np.fromiter((row_index[pid] for pid in pids), dtype=np.intp, count=len(pids))
+        cols_idx = np.fromiter((d.toordinal() for d in dates), dtype=np.intp, count=len(dates)) - start.toordinal()
+        values[rows_idx, cols_idx] = True
+
+    return CompletionMatrix(practice_ids, start, values)
+
+
+def weekday_rates(matrix):
+    """Доля выполненных дней по дням недели: по каждой практике и в целом."""
+    weekday = (np.arange(matrix.days) + matrix.start.weekday()) % 7
+    days_per_weekday = np.bincount(weekday, minlength=7)
+
+    # Сумма выполнений по дням недели для каждой практики — одним умножением матриц
+    done = matrix.values.astype(float) @ np.eye(7)[weekday]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        per_practice = np.nan_to_num(done / days_per_weekday)
+        overall = np.nan_to_num(done.sum(axis=0) / (days_per_weekday * max(len(matrix.practice_ids), 1)))
+
+    return {
+        "weekdays": WEEKDAYS,
+        "overall": np.round(overall, 4).tolist(),
+        "practices": {
+            pid: np.round(per_practice[i], 4).tolist()
+            for i, pid in enumerate(matrix.practice_ids)
+        },
+    }
+
+
+def rolling_mean(values, window):
+    """Скользящее среднее по последней оси; в начале ряда окно короче."""
+    values = np.asarray(values, dtype=float)
+    csum = np.cumsum(values, axis=-1)
+    result = csum.copy()
+    result[..., window:] = csum[..., window:] - csum[..., :-window]
+
+    lengths = np.minimum(np.arange(1, values.shape[-1] + 1), window)
+    return result / lengths
+
+
+def rolling_averages(matrix, windows=(7, 30)):
+    daily = matrix.values.mean(axis=0) if matrix.practice_ids else np.zeros(matrix.days)
+    return {
+        "dates": matrix.dates(),
+        "daily": np.round(daily, 4).tolist(),
+        **{
+            f"rolling_{w}": np.round(rolling_mean(daily, w), 4).tolist()
+            for w in windows
+        },
+    }
+
+
+def streak_stats(matrix):
+    """Самая длинная и текущая серия по каждой практике — через разности, без циклов по дням."""
+    count, days = matrix.values.shape
+    padded = np.zeros((count, days + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix.values
+
+    edges = np.diff(padded, axis=1)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    # В каждой строке начал и концов поровну, поэтому пары совпадают по порядку
+    lengths = ends - starts
+    rows = starts // (days + 1)
+
+    longest = np.zeros(count, dtype=np.int64)
+    np.maximum.at(longest, rows, lengths)
+
+    # Текущая серия — хвост из единиц у правого края
+    reversed_values = matrix.values[:, ::-1]
+    current = np.where(
+        reversed_values.all(axis=1),
+        days,
+        np.argmin(reversed_values, axis=1)
+    )
+
+    return {
+        "practices": {
+            pid: {"longest": int(longest[i]), "current": int(current[i])}
+            for i, pid in enumerate(matrix.practice_ids)
+        },
+    }
+
+
+def weekly_heatmap(matrix):
+    """Тепловая карта: сколько дней недели (0–7) выполнена каждая практика."""
+    # Выравниваем начало по понедельнику, хвост добиваем нулями
+    lead = matrix.start.weekday()
+    total = lead + matrix.days
+    weeks = -(-total // 7)
+
+    padded = np.zeros((len(matrix.practice_ids), weeks * 7), dtype=np.int8)
+    padded[:, lead:total] = matrix.values
+    counts = padded.reshape(len(matrix.practice_ids), weeks, 7).sum(axis=2)
+
+    week_starts = [
+        (matrix.start - timedelta(days=lead) + timedelta(weeks=w)).isoformat()
+        for w in range(weeks)
+    ]
+    return {
+        "weeks": week_starts,
+        "practices": {pid: counts[i].tolist() for i, pid in enumerate(matrix.practice_ids)},
+    }
+
+
+METRICS = {
+    "weekdays": weekday_rates,
+    "rolling": rolling_averages,
+    "streaks": streak_stats,
+    "heatmap": weekly_heatmap,
+}
+
+
+def compute(metric, user_id, practice_ids, days=None, today=None):
+    today = today or date.today()
+    start = window_start(user_id, today, days)
+    matrix = load_matrix(user_id, practice_ids, start, today)
+    return summarize(metric, matrix, today)
+
+
+def summarize(metric, matrix, end):
+    return {
+        "metric": metric,
+        "start": matrix.start.isoformat(),
+        "end": end.isoformat(),
+        **METRICS[metric](matrix),
+    }
@@ -0,0 +1,209 @@
+"""
+Архивация старых месяцев practice_daily_status.
+
+Месяц сжимается в practice_month_archive (битовые маски дней + серия на
+конец месяца), после чего его сырые строки удаляются — на Postgres
+секция месяца отбрасывается целиком. Дневные сводки (daily_summary)
+не трогаются, поэтому история и графики /api/progress не меняются;
+серии и аналитика на архивных датах читаются из масок.
+
+Архивируются только месяцы старше MIN_KEEP_MONTHS: окно графиков
+(60 дней) и серия накануне него всегда остаются в живой таблице.
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import delete, func, select
+
+from models import db, PracticeDailyStatus, PracticeMonthArchive
+from services import partitions
+from services.daily_status import upsert_insert
+
+MIN_KEEP_MONTHS = 3
+
+
+def horizon(today):
+    """Раньше этого дня данные могут быть в архиве."""
+    return partitions.add_months(today.replace(day=1), -MIN_KEEP_MONTHS)
+
+
+def boundary():
+    """Первый неархивированный день (None — архив пуст)."""
+    last = db.session.execute(select(func.max(PracticeMonthArchive.month))).scalar()
+    return partitions.add_months(last, 1) if last else None
+
+
+def _compact(user_id, practice_id, month, rows):
+    """rows — (date, completed, streak) одной практики за месяц по возрастанию даты."""
+    completed_bits = tracked_bits = 0
+    first_day = None
+    streak_at_end = 0
+    last_day = partitions.add_months(month, 1) - timedelta(days=1)
+
+    for day, completed, streak in rows:
+        bit = 1 << (day.day - 1)
+        tracked_bits |= bit
+        if completed:
+            completed_bits |= bit
+        first_day = first_day or day
+        if day == last_day and completed:
+            streak_at_end = streak or 0
+
+    return {
+        "user_id": user_id,
+        "practice_id": practice_id,
+        "month": month,
+        "completed_bits": completed_bits,
+        "tracked_bits": tracked_bits,
+        "completed_count": bin(completed_bits).count("1"),
+        "first_day": first_day,
+        "streak_at_end": streak_at_end,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def _store(values):
+    table = PracticeMonthArchive.__table__
+    stmt = upsert_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.practice_id, table.c.month],
+        set_={
+            key: stmt.excluded[key]
+            for key in (
+                "completed_bits", "tracked_bits", "completed_count",
+                "first_day", "streak_at_end", "created_at",
+            )
+        }
+    )
+    db.session.execute(stmt, values)
+
+
+def archive_month(month, chunk_size=5000):
+    """Сжимает месяц в архив и удаляет его сырые строки. Возвращает (пар, строк)."""
+    table = PracticeDailyStatus.__table__
+    end = partitions.add_months(month, 1)
+    in_month = [table.c.date >= month, table.c.date < end]
+
+    result = db.session.execute(
+        select(table.c.user_id, table.c.practice_id, table.c.date, table.c.completed, table.c.streak)
+        .where(*in_month)
+        .order_by(table.c.user_id, table.c.practice_id, table.c.date)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    pairs = rows_total = 0
+    batch = []
+    for (user_id, practice_id), rows in groupby(result, key=lambda r: (r.user_id, r.practice_id)):
+        rows = [(r.date, r.completed, r.streak) for r in rows]
+        rows_total += len(rows)
+        batch.append(_compact(user_id, practice_id, month, rows))
+        if len(batch) >= chunk_size:
+            _store(batch)
+            pairs += len(batch)
+            batch = []
+
+    if batch:
+        _store(batch)
+        pairs += len(batch)
+
+    # Postgres: секция месяца удаляется целиком, DELETE дочищает DEFAULT
+    partitions.drop_month(month)
+    db.session.execute(delete(table).where(*in_month))
+
+    return pairs, rows_total
+
+
+def run(keep_months, today, log=print):
+    """Архивирует все месяцы старше keep_months (не меньше MIN_KEEP_MONTHS)."""
+    keep_months = max(keep_months, MIN_KEEP_MONTHS)
+    cutoff = partitions.add_months(today.replace(day=1), -keep_months)
+
+    first = db.session.execute(select(func.min(PracticeDailyStatus.date))).scalar()
+    if not first or first >= cutoff:
+        log("Архивировать нечего")
+        return 0
+
+    month = first.replace(day=1)
+    archived = 0
+    while month < cutoff:
+        pairs, rows = archive_month(month)
+        db.session.commit()
+        log(f"{month:%Y-%m}: {rows} строк -> {pairs} записей архива")
+        archived += rows
+        month = partitions.add_months(month, 1)
+
+    return archived
+
+
+# ---------------------------------------------------------
+# Чтение архива
+# ---------------------------------------------------------
+
+def month_query(user_id, practice_ids, start, end):
+    """Архивные месяцы, пересекающие [start, end]."""
+    return select(
+        PracticeMonthArchive.practice_id,
+        PracticeMonthArchive.month,
+        PracticeMonthArchive.completed_bits,
+    ).where(
+        PracticeMonthArchive.user_id == user_id,
+        PracticeMonthArchive.practice_id.in_(practice_ids),
+        PracticeMonthArchive.month >= start.replace(day=1),
+        PracticeMonthArchive.month <= end
+    )
+
+
+def expand(rows, start, end):
+    """Разворачивает маски в пары (practice_id, date) выполненных дней внутри [start, end]."""
+    for practice_id, month, bits in rows:
+        while bits:
+            low = bits & -bits
+            day = month + timedelta(days=low.bit_length() - 1)
+            if start <= day <= end:
+                yield practice_id, day
+            bits ^= low
+
+
+def streak_query(user_id, practice_ids, day):
+    """Архивные строки месяца day и предыдущего — для серии на день day."""
+    month = day.replace(day=1)
+    return select(
+        PracticeMonthArchive.practice_id,
+        PracticeMonthArchive.month,
+        PracticeMonthArchive.completed_bits,
+        PracticeMonthArchive.streak_at_end,
+    ).where(
+        PracticeMonthArchive.user_id == user_id,
+        PracticeMonthArchive.practice_id.in_(practice_ids),
+        PracticeMonthArchive.month.in_([month, partitions.add_months(month, -1)])
+    )
+
+
+def streaks_from(rows, day):
+    """{practice_id: серия на день day} по строкам streak_query; только выполненные."""
+    month = day.replace(day=1)
+    current, previous = {}, {}
+    for practice_id, row_month, bits, streak_at_end in rows:
+        if row_month == month:
+            current[practice_id] = bits
+        else:
+            previous[practice_id] = streak_at_end
+
+    result = {}
+    for practice_id, bits in current.items():
+        # Подряд идущие единицы, заканчивающиеся на бите дня day
+        run = 0
+        for bit in range(day.day - 1, -1, -1):
+            if not bits >> bit & 1:
+                break
+            run += 1
+        if run == day.day:
+            run += previous.get(practice_id, 0)
+        if run:
+            result[practice_id] = run
+
+    return result
+
+
+def streaks_on(user_id, practice_ids, day):
+    return streaks_from(db.session.execute(streak_query(user_id, practice_ids, day)).all(), day)
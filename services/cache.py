@@ -0,0 +1,127 @@
+"""
+Кэш почти неизменных данных (практики, подсказки, примеры) в памяти процесса.
+
+Записи живут не дольше ttl секунд, при переполнении вытесняются по LRU.
+Согласованность между воркерами gunicorn держится на версиях пространств
+имён в общем хранилище: инвалидация увеличивает версию, и все воркеры
+перестают отдавать свои локальные копии. Без CACHE_REDIS_URL версии
+хранятся в памяти процесса (LocalBackend) — этого достаточно для одного
+воркера и для тестов.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # redis — необязательная зависимость
+    redis = None
+
+
+class LocalBackend:
+    """Версии пространств имён в памяти процесса."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get_version(self, namespace):
+        return self._versions.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            return self._versions[namespace]
+
+
+class RedisBackend:
+    """Версии пространств имён в Redis — общие для всех воркеров."""
+
+    def __init__(self, url, prefix="tracker:cache:"):
+        if redis is None:
+            raise RuntimeError("Для CACHE_REDIS_URL нужен пакет redis")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get_version(self, namespace):
+        value = self._client.get(self._prefix + namespace)
+        return int(value) if value else 0
+
+    def bump(self, namespace):
+        return self._client.incr(self._prefix + namespace)
+
+
+class ReferenceCache:
+    def __init__(self, ttl=300, maxsize=256, backend=None, name="reference_cache", config_prefix="CACHE"):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.backend = backend or LocalBackend()
+        self.name = name
+        self.config_prefix = config_prefix
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get(f"{self.config_prefix}_TTL", self.ttl)
+        self.maxsize = app.config.get(f"{self.config_prefix}_MAXSIZE", self.maxsize)
+
+        redis_url = app.config.get("CACHE_REDIS_URL")
+        if redis_url:
+            self.backend = RedisBackend(redis_url)
+
+        app.extensions[self.name] = self
+
+    def get_or_load(self, namespace, key, loader, ttl=None):
+        """Значение из кэша или loader() с сохранением результата на ttl секунд."""
+        version = self.backend.get_version(namespace)
+        now = time.monotonic()
+        full_key = (namespace, key)
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                value, entry_version, expires_at = entry
+                if entry_version == version and expires_at > now:
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return value
+                del self._entries[full_key]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[full_key] = (value, version, now + (ttl or self.ttl))
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+    def invalidate(self, namespace):
+        """Сбрасывает пространство имён во всех воркерах."""
+        self.backend.bump(namespace)
+        with self._lock:
+            for full_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[full_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,82 @@
+"""
+Серверная отрисовка графиков прогресса (matplotlib).
+
+Рендер идёт в отдельном пуле процессов, чтобы не занимать поток запроса
+и не держать matplotlib в памяти воркера. Готовые картинки кэшируются
+в page_cache по версии данных пользователя.
+"""
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+# Предпочтительный порядок: fork не импортирует приложение заново, но есть
+# не везде (Windows) — там forkserver/spawn; дочерним процессам нужен только
+# этот модуль, matplotlib в родителе не загружен
+START_METHODS = ("fork", "forkserver", "spawn")
+
+_executor = None
+
+
+class ChartTimeout(RuntimeError):
+    """Рендер не уложился в timeout (пул перегружен или процесс завис)."""
+
+
+def start_method():
+    available = multiprocessing.get_all_start_methods()
+    return next(method for method in START_METHODS if method in available)
+
+
+def _get_executor(workers):
+    global _executor
+    if _executor is None:
+        context = multiprocessing.get_context(start_method())
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    return _executor
+
+
+def render_progress(series, fmt="png", title=None):
+    """Столбцы выполнения и линия серии за окно series["dates"]. Выполняется в дочернем процессе."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 3), dpi=100)
+    ax_done = fig.add_subplot()
+    ax_streak = ax_done.twinx()
+
+    x = range(len(series["dates"]))
+    ax_done.bar(x, series["completed"], color=(25 / 255, 135 / 255, 84 / 255, 0.4), width=1.0, label="Выполнение")
+    ax_streak.plot(x, series["streak"], color="#0d6efd", linewidth=2, label="Серия (streak)")
+
+    ax_done.set_ylim(0, 1)
+    ax_done.set_yticks([0, 1])
+    ax_streak.set_ylim(bottom=0)
+
+    step = max(len(series["dates"]) // 6, 1)
+    ax_done.set_xticks(list(x)[::step])
+    ax_done.set_xticklabels([d[5:] for d in series["dates"][::step]])
+
+    if title:
+        ax_done.set_title(title)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def render_in_pool(series, fmt, title=None, workers=2, timeout=30):
+    """Картинка из пула процессов; ChartTimeout, если не успела за timeout секунд."""
+    future = _get_executor(workers).submit(render_progress, series, fmt, title)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        # Ещё в очереди — снимаем, чтобы не рисовать картинку, которую никто не ждёт
+        future.cancel()
+        raise ChartTimeout(f"График не отрисован за {timeout} с") from None
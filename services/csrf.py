@@ -0,0 +1,87 @@
+"""
+Защита от CSRF для изменяющих запросов (POST/PUT/PATCH/DELETE).
+
+Формы отправляют токен скрытым полем csrf_token, fetch — заголовком
+X-CSRFToken (значение из <meta name="csrf-token"> в layout.html),
+sendBeacon — полем csrf_token в JSON-теле.
+
+Токен вошедшего пользователя — HMAC(SECRET_KEY, user_id): он одинаков во
+всех его сессиях, поэтому страницы из page_cache (ключ — пользователь, а не
+сессия) не отдают чужой токен, а ASGI-сервер проверяет его без сессии Flask.
+До входа (формы входа и регистрации) токен случайный и живёт в сессии.
+
+Отказ — 403: today.js отличает его от 400 (битая пачка) и не сбрасывает
+офлайн-очередь. CSRF_ENABLED=0 отключает проверку (нагрузочные тесты).
+"""
+import hashlib
+import hmac
+import secrets
+
+from flask import abort, current_app, jsonify, request, session
+from flask_login import current_user
+
+SESSION_KEY = "_csrf_token"
+FIELD_NAME = "csrf_token"
+HEADER_NAME = "X-CSRFToken"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE"})
+
+ERROR_MESSAGE = "Неверный или отсутствующий CSRF-токен"
+
+
+def user_token(secret_key, user_id):
+    """Токен пользователя; не зависит от сессии и контекста запроса."""
+    message = f"csrf:{user_id}".encode()
+    return hmac.new(str(secret_key).encode(), message, hashlib.sha256).hexdigest()
+
+
+def is_valid(expected, submitted):
+    return bool(expected and submitted) and hmac.compare_digest(str(expected), str(submitted))
+
+
+def generate_token():
+    """Токен для текущего запроса; в шаблонах — csrf_token()."""
+    if current_user.is_authenticated:
+        return user_token(current_app.config["SECRET_KEY"], current_user.get_id())
+
+    if SESSION_KEY not in session:
+        session[SESSION_KEY] = secrets.token_urlsafe(32)
+    return session[SESSION_KEY]
+
+
+def submitted_token():
+    token = request.headers.get(HEADER_NAME) or request.form.get(FIELD_NAME)
+    if token or not request.is_json:
+        return token
+
+    payload = request.get_json(silent=True)
+    return payload.get(FIELD_NAME) if isinstance(payload, dict) else None
+
+
+def expected_token():
+    """Токен, который должен прийти с запросом; None — ещё не выдавался."""
+    if current_user.is_authenticated:
+        return user_token(current_app.config["SECRET_KEY"], current_user.get_id())
+    return session.get(SESSION_KEY)
+
+
+class CSRFProtect:
+    def init_app(self, app):
+        app.config.setdefault("CSRF_ENABLED", True)
+        app.add_template_global(generate_token, "csrf_token")
+        app.before_request(self._check)
+
+    @staticmethod
+    def _check():
+        if not current_app.config["CSRF_ENABLED"] or request.method in SAFE_METHODS:
+            return None
+
+        if is_valid(expected_token(), submitted_token()):
+            return None
+
+        if request.path.startswith("/api/") or request.is_json:
+            return jsonify({"error": ERROR_MESSAGE}), 403
+        abort(403, description=ERROR_MESSAGE)
+
+
+csrf = CSRFProtect()
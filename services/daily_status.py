@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, PracticeDailyStatus
+
+
+# INSERT ... ON CONFLICT DO UPDATE ... RETURNING: Postgres и SQLite 3.35+
+_UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+# Скалярный минимум из двух значений
+_LEAST = {
+    "postgresql": func.least,
+    "sqlite": func.min,
+}
+
+
+def upsert_insert(table, dialect=None):
+    """INSERT с поддержкой ON CONFLICT для текущего (или заданного) диалекта."""
+    dialect = dialect or db.session.get_bind().dialect.name
+    if dialect not in _UPSERT_INSERTS:
+        raise RuntimeError(f"Upsert не поддерживается для диалекта {dialect}")
+    return _UPSERT_INSERTS[dialect](table)
+
+
+def progress_expr(dialect, streak, days):
+    """Процент от цели в days дней, не больше 100."""
+    return _LEAST[dialect](streak * 100 // days, 100)
+
+
+def toggle_status(user_id, practice_id, day):
+    """
+    Переключает выполнение практики за день одним атомарным запросом.
+
+    Вставка новой записи или инверсия completed у существующей,
+    streak от вчерашнего дня и progress_14/30/60 считаются прямо в SQL,
+    результат возвращается через RETURNING. Коммит — за вызывающим.
+    """
+    dialect = db.session.get_bind().dialect.name
+    return db.session.execute(toggle_statement(dialect, user_id, practice_id, day)).one()
+
+
+def toggle_statement(dialect, user_id, practice_id, day):
+    """Сам upsert переключения — общий для sync- и async-режима."""
+    table = PracticeDailyStatus.__table__
+    prev = table.alias("prev")
+
+    yesterday_streak = (
+        select(func.coalesce(prev.c.streak, 0))
+        .where(
+            prev.c.user_id == user_id,
+            prev.c.practice_id == practice_id,
+            prev.c.date == day - timedelta(days=1),
+            prev.c.completed.is_(True)
+        )
+        .scalar_subquery()
+    )
+    next_streak = func.coalesce(yesterday_streak, 0) + 1
+
+    # Для существующей строки: была выполнена — сбрасываем, иначе продолжаем серию
+    flipped_streak = case((table.c.completed.is_(True), 0), else_=next_streak)
+
+    stmt = upsert_insert(table, dialect).values(
+        user_id=user_id,
+        practice_id=practice_id,
+        date=day,
+        completed=True,
+        streak=next_streak,
+        progress_14=progress_expr(dialect, next_streak, 14),
+        progress_30=progress_expr(dialect, next_streak, 30),
+        progress_60=progress_expr(dialect, next_streak, 60),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.practice_id, table.c.date],
+        set_={
+            "completed": case((table.c.completed.is_(True), False), else_=True),
+            "streak": flipped_streak,
+            "progress_14": progress_expr(dialect, flipped_streak, 14),
+            "progress_30": progress_expr(dialect, flipped_streak, 30),
+            "progress_60": progress_expr(dialect, flipped_streak, 60),
+        }
+    ).returning(
+        table.c.completed,
+        table.c.streak,
+        table.c.progress_14,
+        table.c.progress_30,
+        table.c.progress_60,
+    )
+
+    return stmt
@@ -0,0 +1,192 @@
+"""
+Настройки подключения к БД из окружения и статистика пула.
+
+DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE /
+DB_POOL_PRE_PING задают пул SQLAlchemy каждого процесса: на инстанс
+приходится не больше workers × (pool_size + max_overflow) соединений.
+С DB_EXTERNAL_POOLER=1 (PgBouncer и т.п.) клиентский пул отключается —
+соединение берётся на время запроса и сразу возвращается пулеру.
+
+Пулы считают выдачи соединений, время ожидания, таймауты и инвалидации;
+живые значения (занято, overflow) читаются прямо из пула.
+"""
+import json
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from flask import g, has_request_context
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+DEFAULTS = {
+    "DB_POOL_SIZE": 5,
+    "DB_MAX_OVERFLOW": 5,
+    "DB_POOL_TIMEOUT": 10,
+    "DB_POOL_RECYCLE": 1800,
+    "DB_CONNECT_TIMEOUT": 5,
+}
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = defaultdict(int)
+        self.wait_seconds = defaultdict(float)
+        self.wait_max = defaultdict(float)
+        self.timeouts = defaultdict(int)
+        self.invalidations = defaultdict(int)
+        self.peak_checked_out = defaultdict(int)
+        self._pools = weakref.WeakValueDictionary()
+
+    def record(self, pool, waited, timed_out=False):
+        name = pool_name(pool)
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+        with self._lock:
+            self._pools[name] = pool
+            self.wait_seconds[name] += waited
+            self.wait_max[name] = max(self.wait_max[name], waited)
+            self.peak_checked_out[name] = max(self.peak_checked_out[name], checked_out)
+            # Неудачная попытка соединения не выдала — в checkouts её нет
+            if timed_out:
+                self.timeouts[name] += 1
+            else:
+                self.checkouts[name] += 1
+
+        # Ожидание соединения попадает в Server-Timing текущего запроса
+        if has_request_context() and "sql_stats" in g:
+            g.sql_stats["pool_wait"] = g.sql_stats.get("pool_wait", 0.0) + waited
+
+    def record_invalidation(self, pool):
+        with self._lock:
+            self.invalidations[pool_name(pool)] += 1
+
+    def snapshot(self):
+        """Счётчики и текущее состояние по каждому пулу."""
+        with self._lock:
+            pools = dict(self._pools)
+            result = {}
+            for name in sorted(set(self.checkouts) | set(self.timeouts) | set(self.invalidations)):
+                pool = pools.get(name)
+                result[name] = {
+                    "size": pool.size() if hasattr(pool, "size") else 0,
+                    "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else 0,
+                    "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0,
+                    "peak_checked_out": self.peak_checked_out[name],
+                    "checkouts": self.checkouts[name],
+                    "wait_seconds": self.wait_seconds[name],
+                    "wait_max_seconds": self.wait_max[name],
+                    "timeouts": self.timeouts[name],
+                    "invalidations": self.invalidations[name],
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            for counter in (
+                self.checkouts, self.wait_seconds, self.wait_max,
+                self.timeouts, self.invalidations, self.peak_checked_out,
+            ):
+                counter.clear()
+
+
+pool_stats = PoolStats()
+
+
+def pool_name(pool):
+    return getattr(pool, "_orig_logging_name", None) or "default"
+
+
+class _TimedConnect:
+    """Замеряет, сколько запрос ждал соединение из пула."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # recreate() переносит слушателей вместе с _dispatch — не дублируем
+        if "_dispatch" not in kwargs:
+            event.listen(self, "invalidate", self._on_invalidate)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        pool_stats.record_invalidation(self)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.record(self, time.perf_counter() - started, timed_out=True)
+            raise
+        pool_stats.record(self, time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedConnect, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedConnect, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedConnect, NullPool):
+    pass
+
+
+def _env_int(env, name):
+    return int(env.get(name, DEFAULTS[name]))
+
+
+def _json_dumps(value):
+    # JSON-колонки (PracticeEntry.fields) хранят кириллицу как есть, без \uXXXX
+    return json.dumps(value, ensure_ascii=False)
+
+
+def engine_options(url, env=None, is_async=False, name="default"):
+    """Параметры create_engine для DATABASE_URL по переменным окружения."""
+    env = os.environ if env is None else env
+    if not url:
+        return {}
+
+    url = make_url(url)
+    backend = url.get_backend_name()
+
+    # SQLite в памяти живёт в одном соединении — пул не настраиваем
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        return {"json_serializer": _json_dumps}
+
+    options = {"pool_logging_name": name, "json_serializer": _json_dumps}
+
+    if env.get("DB_EXTERNAL_POOLER") == "1":
+        options["poolclass"] = TimedNullPool
+    else:
+        options.update({
+            "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+            "pool_size": _env_int(env, "DB_POOL_SIZE"),
+            "max_overflow": _env_int(env, "DB_MAX_OVERFLOW"),
+            "pool_timeout": _env_int(env, "DB_POOL_TIMEOUT"),
+            "pool_recycle": _env_int(env, "DB_POOL_RECYCLE"),
+            "pool_pre_ping": env.get("DB_POOL_PRE_PING", "1") == "1",
+        })
+
+    if backend == "postgresql":
+        connect_timeout = _env_int(env, "DB_CONNECT_TIMEOUT")
+        if is_async:
+            options["connect_args"] = {"timeout": connect_timeout}
+            # Пулер в transaction-режиме не переносит подготовленные выражения asyncpg
+            if env.get("DB_EXTERNAL_POOLER") == "1":
+                options["connect_args"]["statement_cache_size"] = 0
+        else:
+            options["connect_args"] = {"connect_timeout": connect_timeout}
+
+    return options
+
+
+def max_connections(options, workers):
+    """Сколько соединений к БД может открыть инстанс из workers процессов."""
+    if "pool_size" not in options:
+        return None
+    return workers * (options["pool_size"] + options["max_overflow"])
@@ -0,0 +1,152 @@
+"""
+Недельные и месячные итоги пользователей.
+
+Фоновая команда обходит пользователей пачками в пуле потоков, читает
+practice_daily_status диапазонным запросом на всю пачку и сохраняет
+результат в таблицу digest. Каждая пачка коммитится отдельно, поэтому
+прерванный запуск можно просто повторить — готовые пользователи
+пропускаются.
+"""
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from models import db, Digest, PracticeDailyStatus, User
+from services.daily_status import upsert_insert
+
+PERIODS = ("week", "month")
+
+
+def period_bounds(period, day):
+    """Границы недели (пн–вс) или календарного месяца, содержащего day."""
+    if period == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+
+    start = day.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+def last_complete_period(period, today):
+    """Последняя целиком прошедшая неделя или месяц."""
+    if period == "week":
+        return period_bounds(period, today - timedelta(days=today.weekday() + 1))
+    return period_bounds(period, today.replace(day=1) - timedelta(days=1))
+
+
+def compute_chunk(user_ids, period, start, end):
+    """Итоги для пачки пользователей одним диапазонным запросом."""
+    table = PracticeDailyStatus.__table__
+    before = start - timedelta(days=1)
+
+    rows = db.session.execute(
+        select(table.c.user_id, table.c.practice_id, table.c.date, table.c.completed, table.c.streak)
+        .where(
+            table.c.user_id.in_(user_ids),
+            table.c.date >= before,
+            table.c.date <= end
+        )
+    )
+
+    per_practice = defaultdict(lambda: defaultdict(int))
+    active_days = defaultdict(set)
+    streak_before = defaultdict(int)
+    streak_end = defaultdict(int)
+
+    for user_id, practice_id, day, completed, streak in rows:
+        if not completed:
+            continue
+        if day == before:
+            streak_before[user_id] = max(streak_before[user_id], streak or 0)
+            continue
+
+        per_practice[user_id][practice_id] += 1
+        active_days[user_id].add(day)
+        if day == end:
+            streak_end[user_id] = max(streak_end[user_id], streak or 0)
+
+    now = datetime.utcnow()
+    result = []
+    for user_id in user_ids:
+        counts = per_practice.get(user_id, {})
+        best_id = max(counts, key=lambda pid: (counts[pid], -pid)) if counts else None
+
+        result.append({
+            "user_id": user_id,
+            "period": period,
+            "period_start": start,
+            "period_end": end,
+            "completions": sum(counts.values()),
+            "active_days": len(active_days.get(user_id, ())),
+            "streak_change": streak_end[user_id] - streak_before[user_id],
+            "best_practice_id": best_id,
+            "best_practice_completions": counts[best_id] if best_id else 0,
+            "per_practice_json": json.dumps({str(k): v for k, v in counts.items()}),
+            "created_at": now,
+        })
+
+    return result
+
+
+def store(values):
+    table = Digest.__table__
+    stmt = upsert_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.period, table.c.period_start],
+        set_={
+            key: stmt.excluded[key]
+            for key in (
+                "period_end", "completions", "active_days", "streak_change",
+                "best_practice_id", "best_practice_completions", "per_practice_json", "created_at",
+            )
+        }
+    )
+    db.session.execute(stmt, values)
+
+
+def pending_user_ids(period, start, force=False):
+    user_ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+    if force:
+        return user_ids
+
+    done = set(db.session.execute(
+        select(Digest.user_id).where(Digest.period == period, Digest.period_start == start)
+    ).scalars())
+    return [uid for uid in user_ids if uid not in done]
+
+
+def run(app, period, start, end, chunk_size=500, workers=4, force=False, log=print):
+    """Считает итоги за период для всех (ещё не обработанных) пользователей."""
+    with app.app_context():
+        user_ids = pending_user_ids(period, start, force)
+
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    log(f"Пользователей к обработке: {len(user_ids)}, пачек: {len(chunks)}")
+
+    def work(chunk):
+        # У каждого потока свой контекст приложения и своя сессия
+        with app.app_context():
+            store(compute_chunk(chunk, period, start, end))
+            db.session.commit()
+        return len(chunk)
+
+    processed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for count in executor.map(work, chunks):
+            processed += count
+            log(f"Готово: {processed}/{len(user_ids)}")
+
+    return processed
+
+
+def latest(user_id, period):
+    return (
+        Digest.query
+        .filter_by(user_id=user_id, period=period)
+        .order_by(Digest.period_start.desc())
+        .first()
+    )
@@ -0,0 +1,88 @@
+"""
+Записи форм практик (PracticeEntry).
+
+Список записей читает fields как сырой JSON-текст и разбирает его
+лениво и пачкой: при первом обращении к .fields любой записи весь
+список декодируется одним json.loads. Страница, которая показывает
+только даты, JSON не разбирает вовсе; страница с полями платит один
+вызов парсера вместо вызова на каждую строку.
+"""
+import json
+from collections.abc import Sequence
+from datetime import date
+from itertools import count, repeat
+
+from sqlalchemy import Text, cast, select
+
+from models import db, PracticeEntry
+from services import schemas
+
+
+class EntryView:
+    __slots__ = ("_row", "_owner", "_index")
+
+    def __init__(self, row, owner, index):
+        self._row, self._owner, self._index = row, owner, index
+
+    id = property(lambda self: self._row.id)
+    practice_id = property(lambda self: self._row.practice_id)
+    entry_date = property(lambda self: self._row.entry_date)
+
+    @property
+    def fields(self):
+        return self._owner.decoded()[self._index]
+
+
+class EntryList(Sequence):
+    """Записи по убыванию даты; fields разбираются все сразу при первом обращении."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._items = list(map(EntryView, rows, repeat(self), count()))
+        self._decoded = None
+
+    def decoded(self):
+        if self._decoded is None:
+            # Тексты уже валидный JSON — склеиваем в один массив
+            blob = "[" + ",".join(row.fields or "null" for row in self._rows) + "]"
+            self._decoded = [fields or {} for fields in json.loads(blob)]
+        return self._decoded
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+
+def list_query(user_id, practice_id):
+    return (
+        select(
+            PracticeEntry.id,
+            PracticeEntry.practice_id,
+            PracticeEntry.entry_date,
+            # Текстом, а не через JSON-тип: разбор откладывается до EntryList
+            cast(PracticeEntry.fields, Text).label("fields"),
+        )
+        .where(PracticeEntry.user_id == user_id, PracticeEntry.practice_id == practice_id)
+        .order_by(PracticeEntry.entry_date.desc(), PracticeEntry.id.desc())
+    )
+
+
+def list_entries(user_id, practice_id):
+    return EntryList(db.session.execute(list_query(user_id, practice_id)).all())
+
+
+def create(user_id, practice, form, day=None):
+    """Проверяет ответы формы по схеме практики и сохраняет запись."""
+    data = schemas.for_practice(practice).validate(form)
+
+    entry = PracticeEntry(
+        user_id=user_id,
+        practice_id=practice.id,
+        entry_date=(day or date.today()).isoformat(),
+        fields=data,
+    )
+    db.session.add(entry)
+    db.session.commit()
+    return entry
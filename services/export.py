@@ -0,0 +1,141 @@
+"""
+Потоковая выгрузка истории практик в CSV или NDJSON.
+
+Строки читаются серверным курсором (yield_per) и сразу превращаются
+в текст, поэтому память не растёт с объёмом истории.
+
+Выгружается только живая таблица: от архивированных месяцев остались
+помесячные маски без серий и прогресса. Граница — archive.boundary();
+importer такие дни и не принимает, поэтому выгрузку можно загрузить обратно.
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import String, Text, cast, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from models import db, Practice, PracticeDailyStatus, PracticeEntry
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+COLUMNS = [
+    "date", "practice_id", "practice_title", "completed", "streak",
+    "progress_14", "progress_30", "progress_60", "entries",
+]
+
+BATCH_SIZE = 1000
+CHUNK_CHARS = 64 * 1024
+
+
+def _entries_postgres(match):
+    return (
+        select(func.json_agg(aggregate_order_by(PracticeEntry.fields, PracticeEntry.id)))
+        .where(*match)
+        .scalar_subquery()
+    )
+
+
+def _entries_sqlite(match):
+    # ORDER BY внутри агрегата — только с SQLite 3.44; поиск идёт по индексу
+    # (user_id, practice_id, entry_date), и равные ключи в нём упорядочены по rowid = id.
+    # json_group_array без строк даёт '[]' — приводим к NULL, как json_agg
+    return (
+        select(func.nullif(func.json_group_array(func.json(PracticeEntry.fields)), "[]"))
+        .where(*match)
+        .scalar_subquery()
+    )
+
+
+_ENTRIES = {
+    "postgresql": _entries_postgres,
+    "sqlite": _entries_sqlite,
+}
+
+
+def iter_rows(user_id, start=None, end=None, practice_ids=None):
+    """
+    Строки истории пользователя: одна на статус дня. Записи форм за тот же
+    день собираются в JSON-массив коррелированным подзапросом — join дал
+    бы по строке статуса на каждую запись.
+    """
+    pds = PracticeDailyStatus.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in _ENTRIES:
+        raise RuntimeError(f"Выгрузка не поддерживается для диалекта {dialect}")
+
+    entries = _ENTRIES[dialect]([
+        PracticeEntry.user_id == pds.c.user_id,
+        PracticeEntry.practice_id == pds.c.practice_id,
+        PracticeEntry.entry_date == cast(pds.c.date, String),
+    ])
+
+    stmt = (
+        select(
+            pds.c.date,
+            pds.c.practice_id,
+            Practice.title,
+            pds.c.completed,
+            pds.c.streak,
+            pds.c.progress_14,
+            pds.c.progress_30,
+            pds.c.progress_60,
+            # Текстом: в CSV идёт как есть, в NDJSON разбирается один раз
+            cast(entries, Text).label("entries_json"),
+        )
+        .join(Practice, Practice.id == pds.c.practice_id)
+        .where(pds.c.user_id == user_id)
+        .order_by(pds.c.date, pds.c.practice_id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    if start:
+        stmt = stmt.where(pds.c.date >= start)
+    if end:
+        stmt = stmt.where(pds.c.date <= end)
+    if practice_ids:
+        stmt = stmt.where(pds.c.practice_id.in_(practice_ids))
+
+    yield from db.session.execute(stmt)
+
+
+def csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([
+            row.date.isoformat(), row.practice_id, row.title, int(bool(row.completed)), row.streak,
+            row.progress_14, row.progress_30, row.progress_60, row.entries_json or "",
+        ])
+        # Отдаём кусками, буфер не растёт дальше CHUNK_CHARS
+        if buffer.tell() >= CHUNK_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps({
+            "date": row.date.isoformat(),
+            "practice_id": row.practice_id,
+            "practice_title": row.title,
+            "completed": bool(row.completed),
+            "streak": row.streak,
+            "progress_14": row.progress_14,
+            "progress_30": row.progress_30,
+            "progress_60": row.progress_60,
+            "entries": json.loads(row.entries_json) if row.entries_json else [],
+        }, ensure_ascii=False) + "\n"
+
+
+def stream(fmt, user_id, start=None, end=None, practice_ids=None):
+    rows = iter_rows(user_id, start, end, practice_ids)
+    return csv_lines(rows) if fmt == "csv" else ndjson_lines(rows)
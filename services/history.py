@@ -0,0 +1,107 @@
+"""
+История выполнения с keyset-пагинацией.
+
+Элемент истории — пара (дата, практика); порядок — дата по убыванию,
+внутри дня practice_id по возрастанию. Курсор «ГГГГ-ММ-ДД:id» указывает
+на последний отданный элемент, следующая страница начинается строго
+после него. Данные берутся из daily_summary (одна строка на день, в том
+числе за архивированные месяцы), и запрос страницы — это диапазон по
+индексу (user_id, date) с LIMIT: цена не зависит от того, насколько
+далеко в прошлое листает пользователь.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from models import db, DailySummary
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def parse_cursor(cursor):
+    """'ГГГГ-ММ-ДД:practice_id' -> (date, practice_id); None — с начала."""
+    if not cursor:
+        return None
+    try:
+        day, practice_id = cursor.split(":")
+        return date.fromisoformat(day), int(practice_id)
+    except ValueError:
+        raise ValueError("Неверный курсор")
+
+
+def parse_range(start, end):
+    """Необязательные границы ?from= / ?to= -> (date | None, date | None)."""
+    try:
+        start, end = (date.fromisoformat(value) if value else None for value in (start, end))
+    except ValueError:
+        raise ValueError("Даты — в формате ГГГГ-ММ-ДД")
+    if start and end and start > end:
+        raise ValueError("from позже to")
+    return start, end
+
+
+def format_cursor(day, practice_id):
+    return f"{day.isoformat()}:{practice_id}"
+
+
+def page_query(user_id, before, start, days):
+    """Не больше days сводок с датой <= before (и >= start), новые первыми."""
+    stmt = (
+        select(DailySummary.date, DailySummary.completed_bitmap, DailySummary.tracked_bitmap)
+        .where(DailySummary.user_id == user_id, DailySummary.date <= before)
+        .order_by(DailySummary.date.desc())
+        .limit(days)
+    )
+    if start:
+        stmt = stmt.where(DailySummary.date >= start)
+    return stmt
+
+
+def _items(row):
+    """(practice_id, completed) всех практик, отмеченных в этот день."""
+    completed = row.completed_bitmap
+    for pid, tracked in enumerate(row.tracked_bitmap):
+        if tracked == "1":
+            yield pid, pid < len(completed) and completed[pid] == "1"
+
+
+def page(user_id, cursor=None, limit=PAGE_SIZE, start=None, end=None):
+    """
+    Страница истории: ([{"date", "done", "missed"}, ...], следующий курсор).
+    Дни отдаются компактно — списками id выполненных и пропущенных практик;
+    день на границе страниц может прийти двумя частями.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    position = parse_cursor(cursor)
+    before = end or date.today()
+    if position and position[0] < before:
+        before = position[0]
+
+    # В каждой сводке есть хотя бы одна отметка, так что limit дней (+1 на
+    # остаток дня под курсором) заполняют страницу одним запросом
+    batch = limit + 1
+    buckets, taken, last = [], 0, None
+
+    while True:
+        rows = db.session.execute(page_query(user_id, before, start, batch)).all()
+        for row in rows:
+            bucket = {"date": row.date.isoformat(), "done": [], "missed": []}
+            for pid, completed in _items(row):
+                if position and row.date == position[0] and pid <= position[1]:
+                    continue
+                if taken == limit:
+                    # Есть ещё хотя бы один элемент — отдаём курсор
+                    if bucket["done"] or bucket["missed"]:
+                        buckets.append(bucket)
+                    return buckets, format_cursor(*last)
+                bucket["done" if completed else "missed"].append(pid)
+                taken += 1
+                last = (row.date, pid)
+            if bucket["done"] or bucket["missed"]:
+                buckets.append(bucket)
+
+        if len(rows) < batch:
+            return buckets, None
+        before = rows[-1].date - timedelta(days=1)
+        position = None
@@ -0,0 +1,165 @@
+"""
+Массовый импорт истории выполнения из CSV или NDJSON.
+
+Файл читается кусками, каждый кусок пишется одним многострочным
+INSERT ... ON CONFLICT DO UPDATE (на Postgres — через COPY во временную
+таблицу). Повторный импорт того же файла ничего не меняет. Серии и
+прогресс пересчитываются после загрузки одним UPDATE на практику
+(services.streaks), сводки — пачкой по затронутым пользователям.
+
+Колонки: date, practice_id или practice_title, completed, user_id
+(может быть задан для всего файла параметром). Несуществующий practice_id —
+ошибка строки: на SQLite внешний ключ его не остановит, а сводки дня
+индексируются id практики.
+
+Дни архивированных месяцев (раньше archive.boundary()) не принимаются —
+так же, как в /api/sync: живые строки в архивном месяце не видны
+сводкам и при следующей архивации затёрли бы маски месяца.
+"""
+import csv
+import io
+import json
+import time
+from datetime import date, datetime
+from itertools import islice
+
+from sqlalchemy import text
+
+from models import db, PracticeDailyStatus
+from services import archive, reference, streaks, summaries
+from services.daily_status import upsert_insert
+
+CHUNK_SIZE = 2000
+
+_TRUE = {"1", "true", "yes", "да", "t", "y"}
+
+
+class ImportRowError(ValueError):
+    """Строку файла не удалось разобрать."""
+
+
+def _read_records(stream, fmt):
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _parse(record, line_no, default_user_id, practice_by_title):
+    try:
+        user_id = int(record.get("user_id") or default_user_id)
+
+        if record.get("practice_id") not in (None, ""):
+            practice_id = int(record["practice_id"])
+        else:
+            practice_id = practice_by_title[record["practice_title"]]
+
+        day = record["date"]
+        if not isinstance(day, date):
+            day = date.fromisoformat(str(day)[:10])
+
+        completed = record.get("completed")
+        if not isinstance(completed, bool):
+            completed = str(completed).strip().lower() in _TRUE
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ImportRowError(f"Строка {line_no}: {exc!r}") from exc
+
+    return {"user_id": user_id, "practice_id": practice_id, "date": day, "completed": completed}
+
+
+def _upsert_chunk(rows):
+    table = PracticeDailyStatus.__table__
+    now = datetime.utcnow()
+    values = [
+        {**row, "streak": 0, "progress_14": 0, "progress_30": 0, "progress_60": 0, "created_at": now}
+        for row in rows
+    ]
+
+    # executemany: SQLAlchemy сам склеивает пачку в многострочный VALUES
+    stmt = upsert_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.practice_id, table.c.date],
+        set_={"completed": stmt.excluded.completed}
+    )
+    db.session.execute(stmt, values)
+
+
+def _copy_chunk(rows):
+    """Postgres: COPY во временную таблицу и один INSERT ... SELECT."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row["user_id"], row["practice_id"], row["date"].isoformat(), row["completed"]])
+    buffer.seek(0)
+
+    db.session.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS import_staging "
+        "(user_id integer, practice_id integer, date date, completed boolean) ON COMMIT DROP"
+    ))
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert("COPY import_staging FROM STDIN WITH (FORMAT csv)", buffer)
+
+    db.session.execute(text(
+        "INSERT INTO practice_daily_status "
+        "(user_id, practice_id, date, completed, streak, progress_14, progress_30, progress_60, created_at) "
+        "SELECT user_id, practice_id, date, completed, 0, 0, 0, 0, now() FROM import_staging "
+        "ON CONFLICT (user_id, practice_id, date) DO UPDATE SET completed = EXCLUDED.completed"
+    ))
+    db.session.execute(text("TRUNCATE import_staging"))
+
+
+def run(stream, fmt="csv", default_user_id=None, chunk_size=CHUNK_SIZE, log=print):
+    """
+    Импортирует файл целиком в одной транзакции.
+    Возвращает (число строк, строк в секунду).
+    """
+    started = time.perf_counter()
+    practices = reference.get_practices()
+    practice_by_title = {p.title: p.id for p in practices}
+    practice_ids = {p.id for p in practices}
+    use_copy = db.session.get_bind().dialect.name == "postgresql"
+    first_live = archive.boundary()
+
+    # (user_id, practice_id) -> самая ранняя затронутая дата
+    earliest = {}
+    total = 0
+
+    records = enumerate(_read_records(stream, fmt), start=1)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        rows = {}
+        for line_no, record in chunk:
+            row = _parse(record, line_no, default_user_id, practice_by_title)
+            if row["practice_id"] not in practice_ids:
+                raise ImportRowError(f"Строка {line_no}: нет практики с id {row['practice_id']}")
+            if first_live and row["date"] < first_live:
+                raise ImportRowError(f"Строка {line_no}: дни до {first_live.isoformat()} уже в архиве")
+            # Внутри куска последняя строка для ключа побеждает — как при повторной вставке
+            rows[(row["user_id"], row["practice_id"], row["date"])] = row
+
+            key = (row["user_id"], row["practice_id"])
+            if key not in earliest or row["date"] < earliest[key]:
+                earliest[key] = row["date"]
+
+        (_copy_chunk if use_copy else _upsert_chunk)(list(rows.values()))
+        total += len(chunk)
+        log(f"Загружено строк: {total}")
+
+    # Серии: один set-based UPDATE на практику пользователя, от самой ранней даты
+    for (user_id, practice_id), since in earliest.items():
+        streaks.recompute_from(user_id, practice_id, since)
+
+    user_ids = sorted({user_id for user_id, _ in earliest})
+    for i in range(0, len(user_ids), 500):
+        summaries.rebuild(user_ids[i:i + 500])
+
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    return total, (total / elapsed if elapsed else 0.0)
@@ -1,64 +1,141 @@
-from app import db
-from models import Practice, PracticeExample, PracticeTip
-
-
-def init_practices():
-    practices_data = [
-        {
-            "name": "Осознанное дыхание",
-            "color": "#A7D8F0",
-            "description": "Мягкий способ вернуть себя в момент и снизить внутреннее напряжение.",
-            "category": "телесная",
-            "difficulty": 1,
-            "motivation": (
-                "Эта практика — якорь. Она всегда доступна, не требует условий "
-                "и даёт быстрый эффект. Чем чаще ты возвращаешься к дыханию, "
-                "тем устойчивее становится твоя система."
-            ),
-            "examples": [
-                "Сделай 3 глубоких вдоха, положив руку на грудь",
-                "Заметь, что чувствуешь в теле",
-                "Позволь себе выдохнуть чуть медленнее"
-            ],
-            "tips": [
-                "Можно делать в транспорте",
-                "Подходит перед сном",
-                "Работает даже за 10 секунд"
-            ]
-        }
-    ]
-
-    for p in practices_data:
-        practice = Practice.query.filter_by(name=p["name"]).first()
-
-        if not practice:
-            practice = Practice(
-                name=p["name"],
-                color=p["color"],
-                description=p["description"],
-                category=p["category"],
-                difficulty=p["difficulty"],
-                motivation=p["motivation"]
-            )
-            db.session.add(practice)
-            db.session.commit()
-
-        # Примеры
-        for ex in p["examples"]:
-            exists = PracticeExample.query.filter_by(
-                practice_id=practice.id,
-                text=ex
-            ).first()
-            if not exists:
-                db.session.add(PracticeExample(practice_id=practice.id, text=ex))
-
-        # Подсказки
-        for tip in p["tips"]:
-            exists = PracticeTip.query.filter_by(
-                practice_id=practice.id,
-                text=tip
-            ).first()
-            if not exists:
-                db.session.add(PracticeTip(practice_id=practice.id, text=tip))
+"""
+Сидинг справочного контента из data/content.json.
 
+Файл описывает практики (с советами, примерами и схемой формы),
+подсказки и примеры дня. seed() сравнивает файл с БД несколькими
+выборками целых таблиц, а изменения применяет пачками (upsert практик
+по title, многострочные INSERT / DELETE остального) в одной транзакции.
+Повторный запуск с тем же файлом ничего не пишет, поэтому сидинг можно
+запускать на каждом деплое: flask seed-content.
+
+Запись идёт в обход ORM, поэтому в конце явно сбрасываются кэш
+справочника и поисковый индекс затронутых видов контента.
+"""
+import json
+import os
+
+from sqlalchemy import delete, select, tuple_
+
+from models import db, Example, Hint, Practice, PracticeExample, PracticeTip
+from services import reference, search
+from services.daily_status import upsert_insert
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "content.json")
+
+# Поля практики, которые берутся из файла как есть
+PRACTICE_FIELDS = ("description", "quote", "color", "category", "difficulty", "motivation", "form_schema_json")
+
+
+def load(path=DEFAULT_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _practice_values(item):
+    schema = item.get("form_schema")
+    values = {field: item.get(field) for field in PRACTICE_FIELDS}
+    values["title"] = item["title"]
+    values["form_schema_json"] = json.dumps(schema, ensure_ascii=False) if schema is not None else None
+    return values
+
+
+def _seed_practices(items):
+    """Upsert изменившихся практик по title. Возвращает ({title: id}, вставлено, обновлено)."""
+    table = Practice.__table__
+    existing = {
+        row.title: row
+        for row in db.session.execute(select(table.c.id, table.c.title, table.c.schema_version, *(
+            table.c[field] for field in PRACTICE_FIELDS
+        )))
+    }
+
+    inserted, updated, changed = 0, 0, []
+    for item in items:
+        values = _practice_values(item)
+        row = existing.get(values["title"])
+        if row is None:
+            inserted += 1
+            changed.append({**values, "schema_version": 1})
+        elif any(getattr(row, field) != values[field] for field in PRACTICE_FIELDS):
+            updated += 1
+            # Core минует событие модели — версию схемы поднимаем сами
+            version = row.schema_version + (row.form_schema_json != values["form_schema_json"])
+            changed.append({**values, "schema_version": version})
+
+    if changed:
+        stmt = upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.title],
+            set_={key: stmt.excluded[key] for key in (*PRACTICE_FIELDS, "schema_version")}
+        )
+        db.session.execute(stmt, changed)
+
+    ids = dict(db.session.execute(select(table.c.title, table.c.id)).all()) if inserted else {
+        title: row.id for title, row in existing.items()
+    }
+    return ids, inserted, updated
+
+
+def _sync(model, wanted, prune, key_columns):
+    """
+    Приводит таблицу model к множеству wanted (кортежи значений key_columns):
+    недостающее вставляется, лишнее удаляется при prune. Возвращает (вставлено, удалено).
+    """
+    table = model.__table__
+    columns = [table.c[name] for name in key_columns]
+    existing = set(db.session.execute(select(*columns)).tuples())
+
+    missing = [dict(zip(key_columns, key)) for key in wanted if key not in existing]
+    if missing:
+        db.session.execute(table.insert(), missing)
+
+    extra = list(existing - set(wanted)) if prune else []
+    if extra:
+        db.session.execute(delete(table).where(tuple_(*columns).in_(extra)))
+
+    return len(missing), len(extra)
+
+
+def seed(data, prune=False, log=print):
+    """
+    Применяет контент data (как в data/content.json) одной транзакцией.
+    prune=True удаляет советы, примеры и подсказки, которых нет в файле;
+    практики не удаляются никогда — на них ссылается история.
+    """
+    items = data.get("practices", [])
+    ids, inserted, updated = _seed_practices(items)
+    log(f"practice: +{inserted} ~{updated}")
+    changed_kinds = {"practice"} if inserted or updated else set()
+
+    children = (
+        (PracticeTip, "tips", "practice_tip"),
+        (PracticeExample, "examples", "practice_example"),
+    )
+    for model, key, kind in children:
+        wanted = list(dict.fromkeys(
+            (ids[item["title"]], text) for item in items for text in item.get(key, [])
+        ))
+        added, removed = _sync(model, wanted, prune, ("practice_id", "text"))
+        log(f"{kind}: +{added} -{removed}")
+        if added or removed:
+            changed_kinds.add(kind)
+
+    for model, key, kind in ((Hint, "hints", "hint"), (Example, "examples", "example")):
+        wanted = list(dict.fromkeys((text,) for text in data.get(key, [])))
+        added, removed = _sync(model, wanted, prune, ("text",))
+        log(f"{kind}: +{added} -{removed}")
+        if added or removed:
+            changed_kinds.add(kind)
+
+    if changed_kinds:
+        search.reindex(changed_kinds, log=lambda *_: None)
     db.session.commit()
+
+    if changed_kinds:
+        reference.invalidate()
+    return changed_kinds
+
+
+def init_practices(path=DEFAULT_PATH, prune=False, log=print):
+    """Сидинг из файла — то, что раньше делали два отдельных init_practices."""
+    return seed(load(path), prune=prune, log=log)
@@ -0,0 +1,184 @@
+"""
+Профилирование SQL по запросам.
+
+События движка SQLAlchemy считают запросы и время в БД, хуки Flask
+раскладывают их по эндпоинтам. Каждый ответ получает заголовки
+X-DB-Queries / X-DB-Time-ms / Server-Timing, накопленные счётчики
+отдаются на /debug/metrics в текстовом формате Prometheus. С DEBUG_METRICS
+ответ дополнительно несёт X-DB-Slowest — самые медленные запросы этого
+HTTP-запроса.
+
+QUERY_BUDGETS задаёт лимит запросов на эндпоинт; с QUERY_BUDGET_STRICT
+превышение поднимает QueryBudgetExceeded (удобно в тестах), иначе
+только пишется предупреждение в лог.
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.db_config import pool_stats
+
+logger = logging.getLogger("tracker.sql")
+
+SLOWEST_PER_REQUEST = 3
+SLOWEST_HEADER_CHARS = 200
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+# Время старта живёт в контексте выполнения, а не в стеке на соединении:
+# упавший запрос (after_cursor_execute не вызывается) ничего не оставляет
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._tracker_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_tracker_started", None)
+    if started is None or not has_request_context() or "sql_stats" not in g:
+        return
+
+    elapsed = time.perf_counter() - started
+
+    stats = g.sql_stats
+    stats["count"] += 1
+    stats["time"] += elapsed
+
+    # Держим несколько самых медленных запросов за запрос
+    entry = (elapsed, stats["count"], statement)
+    if len(stats["slowest"]) < SLOWEST_PER_REQUEST:
+        heapq.heappush(stats["slowest"], entry)
+    else:
+        heapq.heappushpop(stats["slowest"], entry)
+
+
+class SQLMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.queries = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+        self.max_queries = defaultdict(int)
+        self.budget_violations = defaultdict(int)
+        self.caches = []
+
+    def init_app(self, app, caches=()):
+        app.config.setdefault("QUERY_BUDGETS", {})
+        app.config.setdefault("QUERY_BUDGET_STRICT", False)
+        app.config.setdefault("SLOW_QUERY_MS", 100)
+        app.config.setdefault("DEBUG_METRICS", app.debug)
+
+        self.caches = list(caches)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule("/debug/metrics", "debug_metrics", self._metrics_view)
+
+        app.extensions["sql_metrics"] = self
+
+    def _start_request(self):
+        g.sql_stats = {"count": 0, "time": 0.0, "slowest": []}
+
+    def _finish_request(self, response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or "unknown"
+        db_ms = stats["time"] * 1000
+
+        response.headers["X-DB-Queries"] = str(stats["count"])
+        response.headers["X-DB-Time-ms"] = f"{db_ms:.2f}"
+        response.headers.add("Server-Timing", f"db;dur={db_ms:.2f}")
+        if "pool_wait" in stats:
+            response.headers.add("Server-Timing", f"pool;dur={stats['pool_wait'] * 1000:.2f}")
+        if current_app.config["DEBUG_METRICS"]:
+            for elapsed, _, statement in sorted(stats["slowest"], reverse=True):
+                statement = " ".join(statement.split())[:SLOWEST_HEADER_CHARS]
+                response.headers.add("X-DB-Slowest", f"{elapsed * 1000:.2f}ms {statement}")
+
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.queries[endpoint] += stats["count"]
+            self.db_seconds[endpoint] += stats["time"]
+            self.max_queries[endpoint] = max(self.max_queries[endpoint], stats["count"])
+
+        slow_ms = current_app.config["SLOW_QUERY_MS"]
+        for elapsed, _, statement in sorted(stats["slowest"], reverse=True):
+            if elapsed * 1000 >= slow_ms:
+                logger.warning("Медленный запрос %.1fms в %s: %s", elapsed * 1000, endpoint, statement)
+
+        budget = current_app.config["QUERY_BUDGETS"].get(endpoint)
+        if budget is not None and stats["count"] > budget:
+            with self._lock:
+                self.budget_violations[endpoint] += 1
+            message = f"{endpoint}: {stats['count']} SQL-запросов при бюджете {budget}"
+            if current_app.config["QUERY_BUDGET_STRICT"]:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def _metrics_view(self):
+        if not current_app.config["DEBUG_METRICS"]:
+            return Response("Not Found", status=404)
+        return Response(self.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    def render_prometheus(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        with self._lock:
+            endpoints = sorted(self.requests)
+            metric("tracker_requests_total", "counter", "HTTP requests per endpoint.",
+                   [({"endpoint": e}, self.requests[e]) for e in endpoints])
+            metric("tracker_db_queries_total", "counter", "SQL statements per endpoint.",
+                   [({"endpoint": e}, self.queries[e]) for e in endpoints])
+            metric("tracker_db_seconds_total", "counter", "Time spent in the database per endpoint.",
+                   [({"endpoint": e}, f"{self.db_seconds[e]:.6f}") for e in endpoints])
+            metric("tracker_db_queries_max", "gauge", "Most SQL statements seen in one request.",
+                   [({"endpoint": e}, self.max_queries[e]) for e in endpoints])
+            metric("tracker_query_budget_violations_total", "counter", "Requests over their query budget.",
+                   [({"endpoint": e}, n) for e, n in sorted(self.budget_violations.items())])
+
+        for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+            suffix = "" if kind == "gauge" else "_total"
+            metric(f"tracker_cache_{field}{suffix}", kind, f"Cache {field}.",
+                   [({"cache": cache.name}, cache.stats()[field]) for cache in self.caches])
+
+        pools = pool_stats.snapshot()
+        for field, kind, help_text in (
+            ("size", "gauge", "Configured pool size."),
+            ("checked_out", "gauge", "Connections currently checked out."),
+            ("overflow", "gauge", "Connections open above pool size."),
+            ("peak_checked_out", "gauge", "Most connections checked out at once."),
+            ("checkouts", "counter", "Connections handed out by the pool."),
+            ("wait_seconds", "counter", "Time spent waiting for a connection."),
+            ("wait_max_seconds", "gauge", "Longest wait for a connection."),
+            ("timeouts", "counter", "Pool checkouts that timed out."),
+            ("invalidations", "counter", "Connections invalidated (stale or broken)."),
+        ):
+            suffix = "_total" if kind == "counter" else ""
+            metric(f"tracker_db_pool_{field}{suffix}", kind, help_text,
+                   [({"pool": name}, stats[field]) for name, stats in pools.items()])
+
+        return "\n".join(lines) + "\n"
+
+
+sql_metrics = SQLMetrics()
@@ -0,0 +1,107 @@
+"""
+Кэш отрендеренных страниц и фрагментов с поддержкой ETag.
+
+ETag страницы складывается из пользователя, версии его данных
+(user.data_version — растёт в той же транзакции, что и отметка, поэтому
+видна всем воркерам и CLI), версий справочных данных и текущей даты. Совпал If-None-Match — отвечаем 304 без рендера;
+иначе отдаём HTML из кэша или рендерим и сохраняем.
+"""
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import make_response, render_template, request
+from flask_login import current_user
+from markupsafe import Markup
+from sqlalchemy import update
+
+from models import db, User
+
+from services.cache import ReferenceCache, reference_cache
+
+page_cache = ReferenceCache(ttl=600, maxsize=512, name="page_cache", config_prefix="PAGE_CACHE")
+
+# Справочные пространства имён, от которых зависят страницы
+_REFERENCE_NAMESPACES = ("practices", "hints", "examples")
+
+
+def touch_statement(user_id=None):
+    """UPDATE версии данных: одного пользователя или (user_id=None) всех."""
+    stmt = update(User).values(data_version=User.data_version + 1)
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    return stmt
+
+
+def touch_user(user_id):
+    """
+    Данные пользователя изменились — его страницы и ETag устарели. Коммитит вызывающий.
+    Вызывать до чтения его статусов: UPDATE блокирует строку пользователя до коммита.
+    """
+    db.session.execute(touch_statement(user_id))
+
+
+def touch_all():
+    """Массовые изменения (пересборки, импорт) — устарели страницы всех пользователей."""
+    db.session.execute(touch_statement())
+
+
+def data_version(user):
+    backend = reference_cache.backend
+    parts = [
+        str(user.id),
+        date.today().isoformat(),
+        str(user.data_version),
+        *(str(backend.get_version(ns)) for ns in _REFERENCE_NAMESPACES),
+    ]
+    return hashlib.sha1(":".join(parts).encode()).hexdigest()[:16]
+
+
+def cached_page(view):
+    """Декоратор страницы: ETag/304 и кэш HTML по версии данных пользователя."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = f"{request.endpoint}-{data_version(current_user)}"
+
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            body = page_cache.get_or_load(
+                "pages",
+                (request.full_path, etag),
+                lambda: view(*args, **kwargs)
+            )
+            response = make_response(body)
+
+        response.set_etag(etag)
+        # Браузер хранит страницу, но каждый раз сверяет ETag
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Cookie")
+        return response
+
+    return wrapper
+
+
+def render_fragment(template, key, **context):
+    """Рендер фрагмента (например, карточки практики) с кэшем по ключу."""
+    return page_cache.get_or_load(
+        "fragments",
+        (template, key),
+        lambda: render_template(template, **context)
+    )
+
+
+def practice_card(practice, status, tip=None, example=None):
+    """Карточка практики на /today: перерисовывается только при смене её данных."""
+    key = (
+        practice.id,
+        reference_cache.backend.get_version("practices"),
+        status and (status.completed, status.streak, status.progress_14, status.progress_30, status.progress_60),
+        tip.id if tip else None,
+        example.id if example else None,
+    )
+    return Markup(render_fragment(
+        "_practice_card.html", key,
+        practice=practice, status=status, tip=tip, example=example
+    ))
@@ -0,0 +1,91 @@
+"""
+Помесячные секции practice_daily_status (только Postgres).
+
+Таблица секционирована по date (миграция f1c4e7a29b35): секция
+practice_daily_status_pГГГГММ на каждый месяц плюс DEFAULT на всё
+остальное. Запросы с условием по дате (сегодня, окно 60 дней, пересчёт
+серий с дня N) читают только свои месяцы.
+
+ensure() заранее создаёт секции на months_ahead месяцев вперёд — её
+запускает flask ensure-partitions по расписанию (и архивация). Если строки
+нужного месяца уже попали в DEFAULT, они переносятся в новую секцию.
+На других СУБД всё это ничего не делает.
+"""
+from datetime import date
+
+from sqlalchemy import text
+
+from models import db
+
+PARENT = "practice_daily_status"
+DEFAULT = f"{PARENT}_default"
+
+
+def add_months(month, n):
+    total = month.year * 12 + month.month - 1 + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def is_partitioned():
+    if db.session.get_bind().dialect.name != "postgresql":
+        return False
+    return db.session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+    ), {"name": PARENT}).scalar() is not None
+
+
+def _exists(name):
+    return db.session.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+
+def create_month(month):
+    """Секция на месяц month; строки этого месяца из DEFAULT переезжают в неё."""
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+
+    # Отдельная таблица -> перенос строк -> ATTACH: прямой CREATE ... PARTITION OF
+    # упал бы, если DEFAULT уже содержит строки этого месяца
+    db.session.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+    db.session.execute(text(
+        f"WITH moved AS ("
+        f"    DELETE FROM {DEFAULT} WHERE date >= :start AND date < :end RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), {"start": start, "end": end})
+    db.session.execute(text(
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+
+
+def ensure(months_ahead=3, today=None):
+    """Создаёт недостающие секции с текущего месяца на months_ahead вперёд."""
+    if not is_partitioned():
+        return []
+
+    current = (today or date.today()).replace(day=1)
+    created = []
+    for n in range(months_ahead + 1):
+        month = add_months(current, n)
+        if not _exists(partition_name(month)):
+            create_month(month)
+            created.append(partition_name(month))
+
+    db.session.commit()
+    return created
+
+
+def drop_month(month):
+    """Удаляет секцию месяца целиком. True — если секция была."""
+    name = partition_name(month)
+    if not is_partitioned() or not _exists(name):
+        return False
+
+    db.session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    db.session.execute(text(f"DROP TABLE {name}"))
+    return True
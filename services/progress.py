@@ -0,0 +1,82 @@
+"""
+Ряды прогресса для графиков: выполнение и серия по дням за последние N дней.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from models import db, PracticeDailyStatus
+from services import summaries
+
+PROGRESS_DAYS = 60
+
+
+def window(days=PROGRESS_DAYS, today=None):
+    today = today or date.today()
+    return today - timedelta(days=days - 1), today
+
+
+def parse_ids(raw):
+    """
+    Значение ?ids=1,2 -> [1, 2]; ValueError, если там не целые числа.
+    Без параметра — None (все практики); пустой ?ids= или ?ids=, — пустой список.
+    """
+    if raw is None:
+        return None
+    return [int(x) for x in raw.split(",") if x.strip()]
+
+
+def streaks_query(user_id, practice_ids, start, end):
+    """Сохранённые серии выполненных дней окна — единственный источник streak."""
+    table = PracticeDailyStatus.__table__
+    return select(table.c.practice_id, table.c.date, table.c.streak).where(
+        table.c.user_id == user_id,
+        table.c.practice_id.in_(practice_ids),
+        table.c.date >= start,
+        table.c.date <= end,
+        table.c.completed.is_(True)
+    )
+
+
+def assemble(practice_ids, start, days, by_date, streaks):
+    """Собирает ряды из сводок {date: DailySummary} и серий {(practice_id, date): streak}."""
+    day_list = [start + timedelta(days=i) for i in range(days)]
+    dates = [dt.isoformat() for dt in day_list]
+
+    series = {}
+    for pid in practice_ids:
+        completed, streak = [], []
+
+        for dt in day_list:
+            summary = by_date.get(dt)
+            if summary and summary.is_completed(pid):
+                completed.append(1)
+                streak.append(streaks.get((pid, dt)) or 0)
+            else:
+                completed.append(0)
+                streak.append(0)
+
+        series[pid] = {
+            "practice_id": pid,
+            "dates": dates,
+            "completed": completed,
+            "streak": streak
+        }
+
+    return series
+
+
+def build_series(user_id, practice_ids, days=PROGRESS_DAYS):
+    """
+    Ряды для графиков сразу по нескольким практикам.
+    Выполнение берём из дневных сводок (одна строка на день), серию —
+    как она сохранена в practice_daily_status (services.streaks), без
+    пересчёта. Окно целиком в живой таблице: архивируются только месяцы
+    старше archive.MIN_KEEP_MONTHS.
+    """
+    start, today = window(days)
+
+    by_date = summaries.load_range(user_id, start, today)
+    rows = db.session.execute(streaks_query(user_id, practice_ids, start, today)).all()
+
+    return assemble(practice_ids, start, days, by_date, {(pid, dt): value for pid, dt, value in rows})
@@ -0,0 +1,123 @@
+"""
+Справочные данные (практики, подсказки, примеры) через reference_cache.
+
+Объекты отдаются отсоединёнными от сессии, со всеми нужными шаблонам
+связями, поэтому их можно безопасно переиспользовать между запросами.
+Изменения этих моделей через ORM сбрасывают кэш после коммита.
+"""
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, selectinload
+
+from models import db, Practice, PracticeExample, PracticeTip, Hint, Example
+from services.cache import reference_cache
+
+# Модель -> пространство имён кэша, которое она затрагивает
+_NAMESPACES = {
+    Practice: "practices",
+    PracticeExample: "practices",
+    PracticeTip: "practices",
+    Hint: "hints",
+    Example: "examples",
+}
+
+
+def _detached(objects):
+    for obj in objects:
+        db.session.expunge(obj)
+    return objects
+
+
+def _load_practices():
+    return _detached(
+        Practice.query
+        .options(selectinload(Practice.examples), selectinload(Practice.tips))
+        .order_by(Practice.id)
+        .all()
+    )
+
+
+def get_practices():
+    return reference_cache.get_or_load("practices", "all", _load_practices)
+
+
+def get_practice(practice_id):
+    for p in get_practices():
+        if p.id == practice_id:
+            return p
+    return None
+
+
+def _seconds_until_tomorrow():
+    now = datetime.now()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), time.min)
+    return max(int((tomorrow - now).total_seconds()), 1)
+
+
+def _load_of_day(model, day, *filters):
+    """Одна строка по номеру дня: COUNT, затем OFFSET без загрузки таблицы."""
+    total = db.session.query(func.count(model.id)).filter(*filters).scalar()
+    if not total:
+        return None
+
+    row = (
+        model.query
+        .filter(*filters)
+        .order_by(model.id)
+        .offset(day.toordinal() % total)
+        .limit(1)
+        .first()
+    )
+    return _detached([row])[0] if row else None
+
+
+def get_hint_of_day(day):
+    return reference_cache.get_or_load(
+        "hints", f"day:{day.isoformat()}",
+        lambda: _load_of_day(Hint, day),
+        ttl=_seconds_until_tomorrow()
+    )
+
+
+def get_example_of_day(day):
+    return reference_cache.get_or_load(
+        "examples", f"day:{day.isoformat()}",
+        lambda: _load_of_day(Example, day),
+        ttl=_seconds_until_tomorrow()
+    )
+
+
+def pick_of_day(items, day):
+    """Детерминированный выбор из уже загруженного списка (подсказки практики)."""
+    return items[day.toordinal() % len(items)] if items else None
+
+
+def invalidate(*namespaces):
+    """Явный сброс — для массовых операций в обход ORM (сидинг, импорт)."""
+    for namespace in namespaces or set(_NAMESPACES.values()):
+        reference_cache.invalidate(namespace)
+
+
+# ---------------------------------------------------------
+# Инвалидация по событиям сессии
+# ---------------------------------------------------------
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    changed = session.info.setdefault("reference_changed", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        namespace = _NAMESPACES.get(type(obj))
+        if namespace:
+            changed.add(namespace)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed(session):
+    for namespace in session.info.pop("reference_changed", ()):
+        reference_cache.invalidate(namespace)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop("reference_changed", None)
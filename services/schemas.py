@@ -0,0 +1,182 @@
+"""
+Схемы форм практик.
+
+Practice.form_schema_json — список полей вида
+{"key": ..., "label": ..., "type": "text" | "number" | "select", ...}
+с необязательными required, max_length, min / max, options.
+Схема один раз разбирается и компилируется в набор проверок;
+скомпилированное кэшируется в процессе по (id практики, schema_version),
+поэтому повторные отправки формы не трогают JSON вовсе.
+"""
+import json
+import logging
+import math
+import threading
+
+logger = logging.getLogger("tracker.schemas")
+
+DEFAULT_MAX_LENGTH = 2000
+
+FIELD_TYPES = ("text", "number", "select", "string")
+
+
+class SchemaError(ValueError):
+    """Схема практики записана неверно."""
+
+
+class EntryValidationError(ValueError):
+    """Ответы формы не прошли проверку; errors — {key: сообщение}."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{k}: {v}" for k, v in errors.items()))
+        self.errors = errors
+
+
+def _text_check(field):
+    required = field.get("required", False)
+    max_length = int(field.get("max_length", DEFAULT_MAX_LENGTH))
+
+    def check(value):
+        value = (value or "").strip()
+        if required and not value:
+            raise ValueError("Обязательное поле")
+        if len(value) > max_length:
+            raise ValueError(f"Не длиннее {max_length} символов")
+        return value
+
+    return check
+
+
+def _range_message(low, high):
+    if low is not None and high is not None:
+        return f"Число от {low} до {high}"
+    if low is not None:
+        return f"Число не меньше {low}"
+    return f"Число не больше {high}"
+
+
+def _number_check(field):
+    required = field.get("required", False)
+    low, high = field.get("min"), field.get("max")
+    out_of_range = _range_message(low, high)
+
+    def check(value):
+        value = (value or "").strip().replace(",", ".")
+        if not value:
+            if required:
+                raise ValueError("Обязательное поле")
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError("Нужно число")
+        # nan и inf float() принимает, но в JSON (и JSONB) их не записать
+        if not math.isfinite(number):
+            raise ValueError("Нужно число")
+        if low is not None and number < low or high is not None and number > high:
+            raise ValueError(out_of_range)
+        return int(number) if number.is_integer() else number
+
+    return check
+
+
+def _select_check(field):
+    options = field.get("options")
+    if not isinstance(options, list) or not options:
+        raise SchemaError(f"Поле {field['key']}: у select должен быть список options")
+    allowed = {str(option) for option in options}
+    required = field.get("required", False)
+
+    def check(value):
+        value = (value or "").strip()
+        if not value and not required:
+            return None
+        if value not in allowed:
+            raise ValueError("Выберите вариант из списка")
+        return value
+
+    return check
+
+
+_CHECKS = {
+    "text": _text_check,
+    "string": _text_check,
+    "number": _number_check,
+    "select": _select_check,
+}
+
+
+class CompiledSchema:
+    """Разобранная схема: поля для шаблонов и готовые проверки для validate()."""
+
+    __slots__ = ("fields", "_checks")
+
+    def __init__(self, fields):
+        self.fields = fields
+        self._checks = [(field["key"], _CHECKS[field["type"]](field)) for field in fields]
+
+    def validate(self, form):
+        """Ответы формы -> словарь для PracticeEntry.fields; иначе EntryValidationError."""
+        data, errors = {}, {}
+        for key, check in self._checks:
+            try:
+                data[key] = check(form.get(key))
+            except ValueError as exc:
+                errors[key] = str(exc)
+
+        if errors:
+            raise EntryValidationError(errors)
+        return data
+
+
+def compile_schema(schema_json):
+    try:
+        fields = json.loads(schema_json) if schema_json else []
+    except ValueError as exc:
+        raise SchemaError(f"Схема не JSON: {exc}")
+
+    if not isinstance(fields, list):
+        raise SchemaError("Схема должна быть списком полей")
+
+    keys = set()
+    normalized = []
+    for field in fields:
+        if not isinstance(field, dict) or not field.get("key"):
+            raise SchemaError("У каждого поля должен быть key")
+        if field["key"] in keys:
+            raise SchemaError(f"Поле {field['key']} повторяется")
+        keys.add(field["key"])
+
+        field = {"label": field["key"], "type": "text", **field}
+        if field["type"] not in FIELD_TYPES:
+            # Опечатка в типе не должна ронять страницу практики — поле становится текстом
+            logger.warning("Поле %s: неизвестный тип %r, проверяется как text", field["key"], field["type"])
+            field["type"] = "text"
+        normalized.append(field)
+
+    return CompiledSchema(normalized)
+
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def for_practice(practice):
+    """Скомпилированная схема практики; компилируется один раз на версию."""
+    key = practice.id
+    version = practice.schema_version or 1
+
+    cached = _compiled.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    schema = compile_schema(practice.form_schema_json)
+    with _lock:
+        # Старая версия той же практики просто вытесняется
+        _compiled[key] = (version, schema)
+    return schema
+
+
+def clear():
+    with _lock:
+        _compiled.clear()
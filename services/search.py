@@ -0,0 +1,270 @@
+"""
+Полнотекстовый поиск по практикам, подсказкам, примерам и записям форм.
+
+Всё, что ищется, лежит в одной таблице search_document (kind, ref_id,
+title, body). На Postgres по ней строится tsvector (russian) с GIN-индексом,
+в SQLite — внешняя таблица FTS5; обе обновляет сама БД при записи строки.
+Строки search_document пишутся в той же транзакции, что и исходные
+объекты: после каждого flush изменённые практики, подсказки и записи
+переиндексируются, удалённые — удаляются из индекса. Массовые вставки
+в обход ORM (сидинг, импорт) досинхронизирует reindex() /
+flask search-reindex.
+
+Выдача — по релевантности с keyset-пагинацией: курсор хранит
+(релевантность, id) последней строки страницы, следующая страница
+начинается строго после неё без OFFSET.
+"""
+import base64
+import json
+import re
+from datetime import datetime
+
+from markupsafe import Markup, escape
+from sqlalchemy import Float, cast, column, delete, event, func, literal_column, or_, select, table, tuple_
+from sqlalchemy.orm import Session
+
+from models import (
+    db, Example, Hint, Practice, PracticeEntry, PracticeExample, PracticeTip, SearchDocument,
+)
+from services.daily_status import upsert_insert
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+MAX_TERMS = 8
+
+# Границы совпадения в сниппете; в HTML превращаются в <mark> после экранирования
+MARK_OPEN, MARK_CLOSE = "\ue000", "\ue001"
+
+
+def _practice(p):
+    return {"title": p.title, "body": "\n".join(filter(None, (p.description, p.quote, p.motivation))),
+            "practice_id": p.id}
+
+
+def _practice_text(obj):
+    return {"body": obj.text, "practice_id": obj.practice_id}
+
+
+def _text(obj):
+    return {"body": obj.text}
+
+
+def _entry(entry):
+    values = (entry.fields or {}).values()
+    return {
+        "title": entry.entry_date,
+        "body": "\n".join(str(v) for v in values if v not in (None, "")),
+        "practice_id": entry.practice_id,
+        "user_id": entry.user_id,
+    }
+
+
+LABELS = {
+    "practice": "Практика",
+    "practice_tip": "Совет",
+    "practice_example": "Пример",
+    "hint": "Подсказка",
+    "example": "Пример дня",
+    "entry": "Запись",
+}
+
+
+# Модель -> (kind, построитель документа)
+_DOCUMENTS = {
+    Practice: ("practice", _practice),
+    PracticeTip: ("practice_tip", _practice_text),
+    PracticeExample: ("practice_example", _practice_text),
+    Hint: ("hint", _text),
+    Example: ("example", _text),
+    PracticeEntry: ("entry", _entry),
+}
+
+
+def document(obj):
+    kind, build = _DOCUMENTS[type(obj)]
+    return {
+        "kind": kind,
+        "ref_id": obj.id,
+        "user_id": None,
+        "practice_id": None,
+        "title": "",
+        "updated_at": datetime.utcnow(),
+        **build(obj),
+    }
+
+
+def _upsert(connection, documents):
+    table_ = SearchDocument.__table__
+    stmt = upsert_insert(table_, connection.dialect.name)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table_.c.kind, table_.c.ref_id],
+        set_={key: stmt.excluded[key] for key in ("user_id", "practice_id", "title", "body", "updated_at")}
+    )
+    connection.execute(stmt, documents)
+
+
+def _remove(connection, keys):
+    connection.execute(delete(SearchDocument).where(
+        tuple_(SearchDocument.kind, SearchDocument.ref_id).in_(keys)
+    ))
+
+
+def reindex(kinds=None, log=print):
+    """Пересборка индекса (всего или только kinds) из исходных таблиц. Коммит — за вызывающим."""
+    kinds = set(kinds or (kind for kind, _ in _DOCUMENTS.values()))
+    db.session.execute(delete(SearchDocument).where(SearchDocument.kind.in_(kinds)))
+
+    total = 0
+    for model, (kind, _) in _DOCUMENTS.items():
+        if kind not in kinds:
+            continue
+        documents = [document(obj) for obj in db.session.scalars(select(model))]
+        if documents:
+            _upsert(db.session.connection(), documents)
+        log(f"{kind}: {len(documents)}")
+        total += len(documents)
+    return total
+
+
+# ---------------------------------------------------------
+# Инкрементальное обновление по событиям сессии
+# ---------------------------------------------------------
+
+@event.listens_for(Session, "after_flush")
+def _index_changes(session, flush_context):
+    documents, removed = {}, set()
+
+    for obj in (*session.new, *session.dirty):
+        if type(obj) in _DOCUMENTS and (obj in session.new or session.is_modified(obj)):
+            doc = document(obj)
+            documents[doc["kind"], doc["ref_id"]] = doc
+
+    for obj in session.deleted:
+        if type(obj) in _DOCUMENTS:
+            removed.add((_DOCUMENTS[type(obj)][0], obj.id))
+
+    # Core-выражения на соединении сессии: та же транзакция, без нового flush
+    if documents:
+        _upsert(session.connection(), list(documents.values()))
+    if removed:
+        _remove(session.connection(), list(removed))
+
+
+# ---------------------------------------------------------
+# Поиск
+# ---------------------------------------------------------
+
+def terms(q):
+    """Слова запроса; каждое ищется как префикс, все — обязательны."""
+    return re.findall(r"\w+", (q or "").lower())[:MAX_TERMS]
+
+
+def encode_cursor(score, doc_id):
+    raw = json.dumps([score, doc_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        score, doc_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(score), int(doc_id)
+    except (ValueError, TypeError):
+        raise ValueError("Неверный курсор")
+
+
+def _visible(user_id):
+    if user_id is None:
+        return SearchDocument.user_id.is_(None)
+    return or_(SearchDocument.user_id.is_(None), SearchDocument.user_id == user_id)
+
+
+def _postgres_query(words, user_id):
+    tsquery = func.to_tsquery("russian", " & ".join(f"{w}:*" for w in words))
+    tsv = literal_column("search_document.tsv")
+
+    ranked = (
+        # ts_rank — float4: в курсоре (через float8 Python и JSON) он не совпал бы с собой
+        # при сравнении, и строки с равным рангом повторялись бы или терялись
+        select(SearchDocument, cast(func.ts_rank(tsv, tsquery), Float(53)).label("score"))
+        .where(tsv.op("@@")(tsquery), _visible(user_id))
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        "russian", ranked.c.body, tsquery,
+        f"StartSel={MARK_OPEN}, StopSel={MARK_CLOSE}, MaxWords=25, MinWords=10"
+    )
+    # Чем больше ts_rank, тем выше
+    return ranked, snippet, True
+
+
+def _sqlite_query(words, user_id):
+    fts = table("search_fts", column("rowid"))
+    match = " ".join(f'"{w}"*' for w in words)
+
+    ranked = (
+        select(
+            SearchDocument,
+            # Совпадение в заголовке весит больше, чем в тексте
+            func.bm25(literal_column("search_fts"), 5.0, 1.0).label("score"),
+            func.snippet(literal_column("search_fts"), 1, MARK_OPEN, MARK_CLOSE, "…", 16).label("snippet"),
+        )
+        .join(fts, fts.c.rowid == SearchDocument.id)
+        .where(literal_column("search_fts").op("MATCH")(match), _visible(user_id))
+        .subquery()
+    )
+    # bm25 в FTS5 отрицательный: чем меньше, тем выше
+    return ranked, ranked.c.snippet, False
+
+
+_QUERIES = {
+    "postgresql": _postgres_query,
+    "sqlite": _sqlite_query,
+}
+
+
+def search_query(dialect, q, user_id=None, cursor=None, limit=PAGE_SIZE):
+    words = terms(q)
+    if not words:
+        return None
+    if dialect not in _QUERIES:
+        raise RuntimeError(f"Поиск не поддерживается для диалекта {dialect}")
+
+    ranked, snippet, descending = _QUERIES[dialect](words, user_id)
+    key = tuple_(ranked.c.score, ranked.c.id)
+    stmt = (
+        select(
+            ranked.c.id, ranked.c.kind, ranked.c.ref_id, ranked.c.practice_id,
+            ranked.c.title, ranked.c.score, snippet.label("snippet"),
+        )
+        .order_by(*(c.desc() for c in key.clauses) if descending else key.clauses)
+        .limit(limit + 1)
+    )
+
+    position = decode_cursor(cursor)
+    if position:
+        # Строго после последней строки предыдущей страницы в том же порядке
+        stmt = stmt.where(key < tuple_(*position) if descending else key > tuple_(*position))
+    return stmt
+
+
+def search(q, user_id=None, cursor=None, limit=PAGE_SIZE):
+    """Страница результатов и курсор следующей (None — страниц больше нет)."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    stmt = search_query(db.session.get_bind().dialect.name, q, user_id, cursor, limit)
+    if stmt is None:
+        return [], None
+
+    rows = db.session.execute(stmt).all()
+    next_cursor = encode_cursor(rows[limit - 1].score, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def highlight(snippet):
+    """Сниппет как безопасный HTML: текст экранирован, совпадения в <mark>."""
+    return Markup(
+        str(escape(snippet or ""))
+        .replace(MARK_OPEN, "<mark>")
+        .replace(MARK_CLOSE, "</mark>")
+    )
@@ -0,0 +1,145 @@
+"""
+Движок серий (streak).
+
+Серия — число подряд идущих выполненных дней, заканчивающихся данным днём.
+Пересчёт идёт одним UPDATE на стороне БД: «острова» подряд выполненных дней
+выделяются оконной функцией по date (номер дня минус row_number).
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import Integer, case, cast, func, literal, select, update
+
+from models import db, PracticeDailyStatus, PracticeMonthArchive
+from services import archive, partitions
+from services.daily_status import progress_expr
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _day_number(dialect, value):
+    """Порядковый номер дня — чтобы вычитать из даты row_number."""
+    if dialect == "postgresql":
+        return value - literal(_EPOCH)
+    return cast(func.julianday(value), Integer)
+
+
+def _recompute(filters, since=None, base_streak=0):
+    """
+    Пересчитывает streak и progress_14/30/60 у строк, подходящих под filters.
+
+    since — первый изменившийся день: серия, начинающаяся ровно в этот день,
+    продолжает base_streak (серию накануне). Переписываются только строки,
+    у которых значение действительно изменилось.
+    """
+    dialect = db.session.get_bind().dialect.name
+    table = PracticeDailyStatus.__table__
+
+    if since is not None:
+        filters = [*filters, table.c.date >= since]
+
+    day_no = _day_number(dialect, table.c.date)
+    rn = func.row_number().over(
+        partition_by=[table.c.user_id, table.c.practice_id, table.c.completed],
+        order_by=table.c.date
+    )
+    islands = (
+        select(
+            table.c.id,
+            table.c.user_id,
+            table.c.practice_id,
+            table.c.date,
+            table.c.completed,
+            (day_no - rn).label("grp")
+        )
+        .where(*filters)
+        .subquery("islands")
+    )
+
+    position = func.row_number().over(
+        partition_by=[islands.c.user_id, islands.c.practice_id, islands.c.completed, islands.c.grp],
+        order_by=islands.c.date
+    )
+    offset = literal(0)
+    if since is not None and base_streak:
+        # Остров, начинающийся в since, продолжает вчерашнюю серию
+        offset = case((islands.c.grp == _day_number(dialect, literal(since)) - 1, base_streak), else_=0)
+
+    fresh = (
+        select(
+            islands.c.id,
+            islands.c.date,
+            case((islands.c.completed.is_(True), position + offset), else_=0).label("streak")
+        )
+        .subquery("fresh")
+    )
+
+    # Дата в условии соединения — чтобы на секционированной таблице
+    # UPDATE трогал только месяцы начиная с since
+    matches = [table.c.id == fresh.c.id, table.c.date == fresh.c.date]
+    if since is not None:
+        matches.append(table.c.date >= since)
+
+    stmt = (
+        update(table)
+        .where(
+            *matches,
+            table.c.streak.is_distinct_from(fresh.c.streak)
+        )
+        .values(
+            streak=fresh.c.streak,
+            progress_14=progress_expr(dialect, fresh.c.streak, 14),
+            progress_30=progress_expr(dialect, fresh.c.streak, 30),
+            progress_60=progress_expr(dialect, fresh.c.streak, 60),
+        )
+    )
+
+    return db.session.execute(stmt).rowcount
+
+
+def recompute_from(user_id, practice_id, day):
+    """
+    Пересчитывает серии после изменения дня day (в том числе задним числом).
+    Затрагивает только day и следующие за ним дни этой практики.
+    """
+    table = PracticeDailyStatus.__table__
+
+    prev_streak = db.session.execute(
+        select(table.c.streak).where(
+            table.c.user_id == user_id,
+            table.c.practice_id == practice_id,
+            table.c.date == day - timedelta(days=1),
+            table.c.completed.is_(True)
+        )
+    ).scalar()
+
+    # Накануне — уже архивный месяц
+    if prev_streak is None and day - timedelta(days=1) < archive.horizon(date.today()):
+        prev_streak = archive.streaks_on(user_id, [practice_id], day - timedelta(days=1)).get(practice_id)
+
+    return _recompute(
+        [table.c.user_id == user_id, table.c.practice_id == practice_id],
+        since=day,
+        base_streak=prev_streak or 0
+    )
+
+
+def backfill(user_id=None):
+    """Полный пересчёт серий по всем практикам (или одного пользователя)."""
+    table = PracticeDailyStatus.__table__
+    filters = [table.c.user_id == user_id] if user_id is not None else []
+    updated = _recompute(filters)
+
+    # Серии, шедшие на конец последнего архивного месяца, продолжаются в живых данных
+    first_live = archive.boundary()
+    if first_live:
+        carried = select(PracticeMonthArchive.user_id, PracticeMonthArchive.practice_id).where(
+            PracticeMonthArchive.month == partitions.add_months(first_live, -1),
+            PracticeMonthArchive.streak_at_end > 0
+        )
+        if user_id is not None:
+            carried = carried.where(PracticeMonthArchive.user_id == user_id)
+
+        for carried_user_id, practice_id in db.session.execute(carried).all():
+            updated += recompute_from(carried_user_id, practice_id, first_live)
+
+    return updated
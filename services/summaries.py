@@ -0,0 +1,175 @@
+"""
+Сводки по дням (daily_summary).
+
+Одна строка на пользователя и день вместо строки на каждую практику:
+история и графики читают O(дней) строк, а не O(дней × практик).
+"""
+from itertools import groupby
+
+from sqlalchemy import delete, func, select
+
+from models import db, DailySummary, Practice, PracticeDailyStatus
+from services import archive
+from services.daily_status import upsert_insert
+
+
+def build_bitmap(practice_ids):
+    """Битовая строка: символ № id равен '1' для каждого id из practice_ids."""
+    ids = set(practice_ids)
+    if not ids:
+        return ""
+    return "".join("1" if i in ids else "0" for i in range(max(ids) + 1))
+
+
+def summary_values(user_id, day, rows, total_practices):
+    """rows — пары (practice_id, completed) одного пользователя за один день."""
+    rows = list(rows)
+    done = [pid for pid, completed in rows if completed]
+    return {
+        "user_id": user_id,
+        "date": day,
+        "completed_count": len(done),
+        "total_practices": total_practices,
+        "completed_bitmap": build_bitmap(done),
+        "tracked_bitmap": build_bitmap(pid for pid, _ in rows),
+    }
+
+
+def _from_raw(filters, total_practices):
+    """Считает сводки по сырой таблице, потоково по (user_id, date)."""
+    table = PracticeDailyStatus.__table__
+    result = db.session.execute(
+        select(table.c.user_id, table.c.date, table.c.practice_id, table.c.completed)
+        .join(Practice.__table__, Practice.id == table.c.practice_id)
+        .where(*filters)
+        .order_by(table.c.user_id, table.c.date)
+        .execution_options(yield_per=5000)
+    )
+
+    for (user_id, day), rows in groupby(result, key=lambda r: (r.user_id, r.date)):
+        yield summary_values(user_id, day, ((r.practice_id, r.completed) for r in rows), total_practices)
+
+
+def _total_practices():
+    return db.session.execute(total_practices_query()).scalar()
+
+
+def total_practices_query():
+    return select(func.count(Practice.id))
+
+
+def day_query(user_id, day):
+    """
+    Пары (practice_id, completed) пользователя за день — сырьё для сводки.
+    Только существующие практики: длина битовой строки не больше max(practice.id).
+    """
+    table = PracticeDailyStatus.__table__
+    return (
+        select(table.c.practice_id, table.c.completed)
+        .join(Practice.__table__, Practice.id == table.c.practice_id)
+        .where(table.c.user_id == user_id, table.c.date == day)
+    )
+
+
+def upsert_statement(values, dialect=None):
+    """Upsert одной сводки — общий для sync- и async-режима."""
+    summary = DailySummary.__table__
+
+    stmt = upsert_insert(summary, dialect).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[summary.c.user_id, summary.c.date],
+        set_={
+            key: stmt.excluded[key]
+            for key in ("completed_count", "total_practices", "completed_bitmap", "tracked_bitmap", "updated_at")
+        }
+    )
+
+
+def refresh_day(user_id, day):
+    """Пересчитывает сводку одного дня (после переключения). Коммит — за вызывающим."""
+    rows = db.session.execute(day_query(user_id, day)).all()
+    values = summary_values(user_id, day, rows, _total_practices())
+    db.session.execute(upsert_statement(values))
+
+
+def rebuild(user_ids=None, chunk_size=1000):
+    """Полностью пересобирает сводки (всех или указанных пользователей) пачками вставок."""
+    filters = [PracticeDailyStatus.user_id.in_(user_ids)] if user_ids is not None else []
+    summary_filters = [DailySummary.user_id.in_(user_ids)] if user_ids is not None else []
+
+    # Архивные месяцы: сырых строк уже нет, их сводки остаются как есть
+    first_live = archive.boundary()
+    if first_live:
+        filters.append(PracticeDailyStatus.date >= first_live)
+        summary_filters.append(DailySummary.date >= first_live)
+
+    db.session.execute(delete(DailySummary).where(*summary_filters))
+
+    total = _total_practices()
+    count = 0
+    chunk = []
+    for values in _from_raw(filters, total):
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            db.session.execute(DailySummary.__table__.insert(), chunk)
+            count += len(chunk)
+            chunk = []
+
+    if chunk:
+        db.session.execute(DailySummary.__table__.insert(), chunk)
+        count += len(chunk)
+
+    return count
+
+
+def check(user_id=None):
+    """
+    Сверяет сводки с сырой таблицей.
+    Возвращает список расхождений (user_id, date, описание).
+    """
+    filters = [PracticeDailyStatus.user_id == user_id] if user_id is not None else []
+    summary_filters = [DailySummary.user_id == user_id] if user_id is not None else []
+
+    # Архивные месяцы: сырых строк уже нет, их сводки остаются как есть
+    first_live = archive.boundary()
+    if first_live:
+        filters.append(PracticeDailyStatus.date >= first_live)
+        summary_filters.append(DailySummary.date >= first_live)
+
+    stored = {
+        (s.user_id, s.date): s
+        for s in DailySummary.query.filter(*summary_filters).all()
+    }
+
+    problems = []
+    for values in _from_raw(filters, _total_practices()):
+        key = (values["user_id"], values["date"])
+        s = stored.pop(key, None)
+        if s is None:
+            problems.append((*key, "нет сводки"))
+            continue
+        diff = [
+            field for field in ("completed_count", "completed_bitmap", "tracked_bitmap")
+            if getattr(s, field) != values[field]
+        ]
+        if diff:
+            problems.append((*key, "расходятся поля: " + ", ".join(diff)))
+
+    for key in stored:
+        problems.append((*key, "лишняя сводка"))
+
+    return problems
+
+
+def load_range(user_id, start, end):
+    """Сводки пользователя за период: {date: DailySummary}."""
+    rows = db.session.execute(range_query(user_id, start, end)).scalars()
+    return {s.date: s for s in rows}
+
+
+def range_query(user_id, start, end):
+    return select(DailySummary).where(
+        DailySummary.user_id == user_id,
+        DailySummary.date >= start,
+        DailySummary.date <= end
+    )
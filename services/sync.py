@@ -0,0 +1,120 @@
+"""
+Пакетная синхронизация отметок с клиента.
+
+Клиент копит переключения офлайн и присылает итоговое состояние
+(practice_id, date, completed). Все операции применяются одной транзакцией:
+один upsert на всю пачку, пересчёт серий от самого раннего изменённого дня
+каждой практики и обновление дневных сводок.
+"""
+from datetime import date
+
+from sqlalchemy import select
+
+from models import db, PracticeDailyStatus
+from services import archive, streaks, summaries
+from services.daily_status import upsert_insert
+
+# Ограничение на размер одной пачки
+MAX_OPS = 500
+
+
+class SyncError(ValueError):
+    """Пачка операций не прошла проверку."""
+
+
+def parse_ops(ops, practice_ids, today):
+    """
+    Проверяет операции и схлопывает повторы: для пары (практика, день)
+    остаётся последнее состояние. Возвращает {(practice_id, date): completed}.
+    """
+    if not isinstance(ops, list):
+        raise SyncError("ops должен быть списком")
+    if len(ops) > MAX_OPS:
+        raise SyncError(f"Не больше {MAX_OPS} операций за раз")
+
+    result = {}
+    for op in ops:
+        try:
+            practice_id = int(op["practice_id"])
+            day = date.fromisoformat(op["date"])
+            completed = op["completed"]
+        except (KeyError, TypeError, ValueError):
+            raise SyncError("Операция: practice_id, date (ГГГГ-ММ-ДД), completed")
+
+        if not isinstance(completed, bool):
+            raise SyncError("completed должен быть true или false")
+        if practice_id not in practice_ids:
+            raise SyncError(f"Неизвестная практика {practice_id}")
+        if day > today:
+            raise SyncError("Нельзя отметить будущий день")
+
+        result[(practice_id, day)] = completed
+
+    # Даты из архивных месяцев менять нельзя — их сырых строк уже нет
+    earliest = min((day for _, day in result), default=today)
+    if earliest < archive.horizon(today):
+        first_live = archive.boundary()
+        if first_live and earliest < first_live:
+            raise SyncError(f"Дни до {first_live.isoformat()} уже в архиве")
+
+    return result
+
+
+def apply(user_id, states):
+    """
+    Применяет {(practice_id, date): completed} и возвращает итоговые строки.
+    Коммит — за вызывающим.
+    """
+    if not states:
+        return []
+
+    table = PracticeDailyStatus.__table__
+
+    # Серия и прогресс здесь — заглушки, их сразу пересчитывает streaks
+    stmt = upsert_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.practice_id, table.c.date],
+        set_={"completed": stmt.excluded.completed},
+        where=table.c.completed.is_distinct_from(stmt.excluded.completed)
+    )
+    db.session.execute(stmt, [
+        {
+            "user_id": user_id,
+            "practice_id": practice_id,
+            "date": day,
+            "completed": completed,
+            "streak": 0,
+            "progress_14": 0,
+            "progress_30": 0,
+            "progress_60": 0,
+        }
+        for (practice_id, day), completed in states.items()
+    ])
+
+    earliest = {}
+    for practice_id, day in states:
+        earliest[practice_id] = min(day, earliest.get(practice_id, day))
+
+    for practice_id, day in earliest.items():
+        streaks.recompute_from(user_id, practice_id, day)
+
+    for day in {day for _, day in states}:
+        summaries.refresh_day(user_id, day)
+
+    rows = db.session.execute(
+        select(
+            table.c.practice_id,
+            table.c.date,
+            table.c.completed,
+            table.c.streak,
+            table.c.progress_14,
+            table.c.progress_30,
+            table.c.progress_60,
+        )
+        .where(
+            table.c.user_id == user_id,
+            table.c.practice_id.in_(earliest),
+            table.c.date.in_({day for _, day in states})
+        )
+    )
+    return [row for row in rows if (row.practice_id, row.date) in states]
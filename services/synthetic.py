@@ -0,0 +1,114 @@
+"""
+Синтетические данные для нагрузочных проверок: пользователи, практики
+и история practice_daily_status за заданное число дней.
+
+Строки пишутся пачками многострочных INSERT, streak и прогресс считаются
+сразу при генерации, сводки пересобираются в конце.
+"""
+import random
+from datetime import date, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from models import db, Practice, PracticeDailyStatus, User
+from services import summaries
+
+SYNTHETIC_PREFIX = "synthetic_"
+SYNTHETIC_PASSWORD = "synthetic"
+
+
+def _ensure_practices(count):
+    existing = Practice.query.order_by(Practice.id).all()
+    for i in range(len(existing), count):
+        db.session.add(Practice(
+            title=f"Синтетическая практика {i + 1}",
+            description="Сгенерирована для нагрузочного теста.",
+            color="#6c757d"
+        ))
+    db.session.flush()
+    return [p.id for p in Practice.query.order_by(Practice.id).limit(count)]
+
+
+def _ensure_users(count):
+    # Хэш пароля один на всех — генерация хэша на каждого заняла бы минуты
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+    existing = {
+        u.username: u.id
+        for u in User.query.filter(User.username.like(f"{SYNTHETIC_PREFIX}%"))
+    }
+
+    new_users = [
+        {"username": f"{SYNTHETIC_PREFIX}{i}", "password_hash": password_hash}
+        for i in range(count)
+        if f"{SYNTHETIC_PREFIX}{i}" not in existing
+    ]
+    if new_users:
+        db.session.execute(User.__table__.insert(), new_users)
+
+    return [
+        u.id for u in User.query
+        .filter(User.username.in_([f"{SYNTHETIC_PREFIX}{i}" for i in range(count)]))
+        .order_by(User.id)
+    ]
+
+
+def _history_rows(user_id, practice_ids, start, days, rate, rng):
+    for pid in practice_ids:
+        streak = 0
+        for i in range(days):
+            # Не каждый день есть запись: пропуск без отметки тоже бывает
+            if rng.random() > 0.9:
+                streak = 0
+                continue
+
+            completed = rng.random() < rate
+            streak = streak + 1 if completed else 0
+            yield {
+                "user_id": user_id,
+                "practice_id": pid,
+                "date": start + timedelta(days=i),
+                "completed": completed,
+                "streak": streak,
+                "progress_14": min(streak * 100 // 14, 100),
+                "progress_30": min(streak * 100 // 30, 100),
+                "progress_60": min(streak * 100 // 60, 100),
+            }
+
+
+def generate(users=100, practices=10, days=365, rate=0.7, seed=0, chunk_size=5000, log=print):
+    """
+    Заполняет БД синтетической историей. Повторный запуск для тех же
+    пользователей сначала удаляет их старую историю.
+    """
+    rng = random.Random(seed)
+    practice_ids = _ensure_practices(practices)
+    user_ids = _ensure_users(users)
+
+    db.session.query(PracticeDailyStatus).filter(
+        PracticeDailyStatus.user_id.in_(user_ids)
+    ).delete(synchronize_session=False)
+
+    start = date.today() - timedelta(days=days - 1)
+    table = PracticeDailyStatus.__table__
+    chunk, total = [], 0
+
+    for n, user_id in enumerate(user_ids, 1):
+        for row in _history_rows(user_id, practice_ids, start, days, rate, rng):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                db.session.execute(table.insert(), chunk)
+                total += len(chunk)
+                chunk = []
+
+        if n % 100 == 0:
+            log(f"Пользователей: {n}/{len(user_ids)}, строк: {total + len(chunk)}")
+
+    if chunk:
+        db.session.execute(table.insert(), chunk)
+        total += len(chunk)
+
+    for i in range(0, len(user_ids), 500):
+        summaries.rebuild(user_ids[i:i + 500])
+
+    db.session.commit()
+    return total
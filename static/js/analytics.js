@@ -1,7 +1,8 @@
-async function loadProgress(practiceId) {
-    const res = await fetch(`/api/progress/${practiceId}`);
-    if (!res.ok) return null;
-    return res.json();
+async function loadAllProgress(practiceIds) {
+    const res = await fetch(`/api/progress?ids=${practiceIds.join(",")}`);
+    if (!res.ok) return [];
+    const data = await res.json();
+    return data.practices;
 }
 
 function renderChart(canvasId, data) {
@@ -60,10 +61,14 @@ function renderChart(canvasId, data) {
 }
 
 document.addEventListener("DOMContentLoaded", async () => {
-    for (const practice of window.ANALYTICS_PRACTICES) {
-        const data = await loadProgress(practice.id);
-        if (data) {
-            renderChart(`chart-${practice.id}`, data);
-        }
+    // Данные обычно уже встроены в страницу; иначе — один общий запрос
+    let series = window.ANALYTICS_PROGRESS;
+    if (!series) {
+        const ids = window.ANALYTICS_PRACTICES.map(p => p.id);
+        series = ids.length ? await loadAllProgress(ids) : [];
+    }
+
+    for (const data of series) {
+        renderChart(`chart-${data.practice_id}`, data);
     }
 });
\ No newline at end of file
@@ -0,0 +1,90 @@
+// Бесконечная прокрутка истории: следующая страница /api/history
+// подгружается, когда индикатор внизу появляется в окне.
+
+(function () {
+    const container = document.getElementById("history-days");
+    const more = document.getElementById("history-more");
+    if (!container || !more) return;
+
+    const practices = JSON.parse(container.dataset.practices || "{}");
+    let cursor = container.dataset.nextCursor;
+    let loading = false;
+
+    function formatDate(iso) {
+        const [y, m, d] = iso.split("-");
+        return `${d}.${m}.${y}`;
+    }
+
+    function statusItem(pid, completed) {
+        const practice = practices[pid];
+        const li = document.createElement("li");
+        li.className = "list-group-item d-flex justify-content-between align-items-center";
+
+        const title = document.createElement("span");
+        title.style.color = practice.color || "";
+        title.textContent = practice.title;
+
+        const badge = document.createElement("span");
+        badge.className = completed ? "badge bg-success" : "badge bg-secondary";
+        badge.textContent = completed ? "Выполнено" : "Пропущено";
+
+        li.append(title, badge);
+        return li;
+    }
+
+    function dayCard(date) {
+        // День на границе страниц приходит двумя частями — дописываем в ту же карточку
+        const last = container.lastElementChild;
+        if (last && last.dataset.date === date) return last.querySelector("ul");
+
+        const card = document.createElement("div");
+        card.className = "card mb-3 shadow-sm border-0";
+        card.dataset.date = date;
+        card.innerHTML = '<div class="card-body"><h5 class="card-title"></h5>' +
+            '<ul class="list-group list-group-flush"></ul></div>';
+        card.querySelector("h5").textContent = formatDate(date);
+        container.append(card);
+        return card.querySelector("ul");
+    }
+
+    function render(days) {
+        for (const day of days) {
+            const list = dayCard(day.date);
+            day.done.filter(pid => pid in practices).forEach(pid => list.append(statusItem(pid, true)));
+            day.missed.filter(pid => pid in practices).forEach(pid => list.append(statusItem(pid, false)));
+        }
+    }
+
+    async function loadMore() {
+        if (loading || !cursor) return;
+        loading = true;
+
+        try {
+            const res = await fetch(`/api/history?cursor=${encodeURIComponent(cursor)}`);
+            if (!res.ok) throw new Error(res.status);
+            const data = await res.json();
+            render(data.days);
+            cursor = data.next_cursor;
+        } catch (err) {
+            // Повторим при следующем появлении индикатора
+            console.warn("history: не удалось загрузить страницу", err);
+        } finally {
+            loading = false;
+        }
+
+        if (!cursor) {
+            observer.disconnect();
+            more.classList.add("d-none");
+        } else {
+            // Индикатор всё ещё виден (короткая страница) — наблюдение заново вызовет loadMore
+            observer.unobserve(more);
+            observer.observe(more);
+        }
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadMore();
+    }, { rootMargin: "400px" });
+
+    if (cursor) observer.observe(more);
+})();
@@ -1,24 +1,206 @@
+
+// Очередь отметок: копится локально (переживает офлайн и перезагрузку),
+// повторные нажатия по одной практике схлопываются, на сервер уходит
+// одна пачка в /api/sync.
+const QUEUE_KEY = "tracker.syncQueue";
+const FLUSH_DELAY = 500;
+const MAX_RETRY_DELAY = 30000;
+
+let flushTimer = null;
+let inFlight = false;
+let retryDelay = 1000;
+
+
 document.addEventListener("DOMContentLoaded", () => {
 
+    const container = document.getElementById("today-practices");
+    const today = container ? container.dataset.date : null;
+
     const buttons = document.querySelectorAll(".toggle-btn");
 
     buttons.forEach(btn => {
-        btn.addEventListener("click", async () => {
+        // Последнее подтверждённое сервером состояние
+        btn.dataset.synced = btn.dataset.completed;
+
+        btn.addEventListener("click", () => {
+            const completed = btn.dataset.completed !== "1";
+
+            updateButton(btn, { completed });
+            enqueue(btn.dataset.practiceId, today, completed, btn.dataset.synced === "1");
+        });
+    });
+
+    // Неотправленные с прошлого раза отметки — сразу показываем
+    const queue = loadQueue();
+    Object.entries(queue).forEach(([key, completed]) => {
+        const [practiceId, day] = key.split("|");
+        const btn = findButton(practiceId);
+
+        if (day === today && btn) {
+            updateButton(btn, { completed });
+        }
+    });
+
+    window.addEventListener("online", () => flush());
+    window.addEventListener("pagehide", sendBeacon);
+
+    flush();
+});
+
+
+function loadQueue() {
+    try {
+        return JSON.parse(localStorage.getItem(QUEUE_KEY)) || {};
+    } catch (e) {
+        return {};
+    }
+}
 
-            const practiceId = btn.dataset.practiceId;
 
-            const response = await fetch(`/practice/${practiceId}/toggle`, {
-                method: "POST"
-            });
+function saveQueue(queue) {
+    if (Object.keys(queue).length) {
+        localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+    } else {
+        localStorage.removeItem(QUEUE_KEY);
+    }
+}
+
+
+function enqueue(practiceId, day, completed, synced) {
+    const queue = loadQueue();
+    const key = `${practiceId}|${day}`;
+
+    // Вернулись к состоянию сервера — отправлять нечего
+    if (completed === synced) {
+        delete queue[key];
+    } else {
+        queue[key] = completed;
+    }
+
+    saveQueue(queue);
+    scheduleFlush(FLUSH_DELAY);
+}
+
+
+function scheduleFlush(delay) {
+    clearTimeout(flushTimer);
+    flushTimer = setTimeout(flush, delay);
+}
+
+
+function toOps(queue) {
+    return Object.entries(queue).map(([key, completed]) => {
+        const [practiceId, day] = key.split("|");
+        return { practice_id: Number(practiceId), date: day, completed };
+    });
+}
+
 
-            const data = await response.json();
+async function flush() {
+    const queue = loadQueue();
 
+    if (inFlight || !Object.keys(queue).length || !navigator.onLine) return;
+
+    inFlight = true;
+
+    try {
+        const response = await fetch("/api/sync", {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json",
+                "X-CSRFToken": csrfToken()
+            },
+            body: JSON.stringify({ ops: toOps(queue) })
+        });
+
+        if (response.status === 401) {
+            window.location.href = "/login";
+            return;
+        }
+
+        if (response.status === 403) {
+            // Устаревший CSRF-токен: очередь сохраняем, новая страница отправит её
+            window.location.reload();
+            return;
+        }
+
+        if (response.status === 400) {
+            // Пачку сервер не примет и при повторе — сбрасываем её
+            console.warn("sync:", (await response.json()).error);
+            saveQueue({});
+            window.location.reload();
+            return;
+        }
+
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+        const data = await response.json();
+        applyResults(data.results, queue);
+        retryDelay = 1000;
+
+    } catch (e) {
+        // Сеть или сервер недоступны — повтор с нарастающей паузой
+        scheduleFlush(retryDelay);
+        retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY);
+        return;
+
+    } finally {
+        inFlight = false;
+    }
+
+    // Пока шёл запрос, могли появиться новые нажатия
+    if (Object.keys(loadQueue()).length) scheduleFlush(FLUSH_DELAY);
+}
+
+
+function applyResults(results, sent) {
+    const queue = loadQueue();
+
+    results.forEach(data => {
+        const key = `${data.practice_id}|${data.date}`;
+
+        // Убираем из очереди только то, что не менялось во время запроса
+        if (queue[key] === sent[key]) delete queue[key];
+
+        const btn = findButton(data.practice_id);
+        if (!btn) return;
+
+        btn.dataset.synced = data.completed ? "1" : "0";
+
+        if (!(key in queue)) {
             updateButton(btn, data);
             updateStreak(data);
             updateProgress(data);
-        });
+        }
     });
-});
+
+    saveQueue(queue);
+}
+
+
+function sendBeacon() {
+    // Уходим со страницы — последняя попытка. Операции задают состояние,
+    // а не переключают его, поэтому повторная отправка безопасна.
+    const queue = loadQueue();
+
+    if (!Object.keys(queue).length || !navigator.sendBeacon) return;
+
+    // Заголовков у beacon нет — CSRF-токен едет в теле
+    const payload = { ops: toOps(queue), csrf_token: csrfToken() };
+    const body = new Blob([JSON.stringify(payload)], { type: "application/json" });
+    navigator.sendBeacon("/api/sync", body);
+}
+
+
+function csrfToken() {
+    const meta = document.querySelector('meta[name="csrf-token"]');
+    return meta ? meta.content : "";
+}
+
+
+function findButton(practiceId) {
+    return document.querySelector(`.toggle-btn[data-practice-id="${practiceId}"]`);
+}
 
 
 function updateButton(btn, data) {
@@ -39,7 +221,6 @@ function updateButton(btn, data) {
     updateCard(btn, completed);
 }
 
-
 function updateCard(btn, completed) {
     const card = btn.closest(".card");
 
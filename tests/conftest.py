@@ -0,0 +1,66 @@
+"""
+Общие фикстуры: приложение на файле SQLite во временном каталоге.
+
+Файл, а не :memory: — тестам конкурентности нужны настоящие отдельные
+соединения из разных потоков.
+"""
+import os
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Модуль app собирает приложение при импорте — ему нужны ключ и адрес БД
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import create_app  # noqa: E402
+from models import db, Practice, User  # noqa: E402
+
+PASSWORD = "test-password"
+
+CSRF_TOKEN = re.compile(r'name="csrf[-_]token" (?:value|content)="([^"]+)"')
+
+
+def csrf_token(response):
+    """CSRF-токен из скрытого поля формы или <meta name="csrf-token">."""
+    return CSRF_TOKEN.search(response.get_data(as_text=True)).group(1)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "CSRF_ENABLED": False,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "test.db"),
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username="tester")
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.add(Practice(title="Практика", description="Описание"))
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def login(app):
+    """Новый клиент с сессией пользователя tester."""
+    def make():
+        client = app.test_client()
+        token = csrf_token(client.get("/login"))
+        client.post("/login", data={"username": "tester", "password": PASSWORD, "csrf_token": token})
+        return client
+    return make
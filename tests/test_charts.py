@@ -0,0 +1,27 @@
+"""
+Пул рендера графиков (user-015): способ запуска процессов и таймаут.
+"""
+import multiprocessing
+
+from models import Practice
+from services import charts
+
+
+def test_start_method_falls_back_without_fork(monkeypatch):
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    assert charts.start_method() == "spawn"
+
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["fork", "spawn", "forkserver"])
+    assert charts.start_method() == "fork"
+
+
+def test_chart_timeout_is_503(app, user, login, monkeypatch):
+    def slow(*args, **kwargs):
+        raise charts.ChartTimeout("График не отрисован за 30 с")
+
+    monkeypatch.setattr(charts, "render_in_pool", slow)
+    response = login().get(f"/chart/progress/{Practice.query.one().id}.png")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    assert "error" in response.get_json()
@@ -0,0 +1,55 @@
+"""
+CSRF-токены и cookie сессии (user-009).
+
+Изменяющие запросы без токена отклоняются 403; формы получают токен
+скрытым полем, fetch — из <meta name="csrf-token">, beacon — в теле.
+"""
+from datetime import date
+
+import pytest
+
+from models import Practice
+from tests.conftest import PASSWORD, csrf_token
+
+
+@pytest.fixture
+def csrf(app):
+    app.config["CSRF_ENABLED"] = True
+
+
+def sync_payload():
+    practice_id = Practice.query.one().id
+    return {"ops": [{"practice_id": practice_id, "date": date.today().isoformat(), "completed": True}]}
+
+
+def test_login_form_requires_token(app, user, csrf):
+    client = app.test_client()
+    credentials = {"username": "tester", "password": PASSWORD}
+
+    assert client.post("/login", data=credentials).status_code == 403
+
+    token = csrf_token(client.get("/login"))
+    assert client.post("/login", data=dict(credentials, csrf_token=token)).status_code == 302
+
+
+def test_sync_requires_header_or_body_token(app, user, login, csrf):
+    client = login()
+    token = csrf_token(client.get("/today"))
+
+    response = client.post("/api/sync", json=sync_payload())
+    assert response.status_code == 403
+    assert "error" in response.get_json()
+
+    assert client.post("/api/sync", json=sync_payload(), headers={"X-CSRFToken": "forged"}).status_code == 403
+    assert client.post("/api/sync", json=sync_payload(), headers={"X-CSRFToken": token}).status_code == 200
+    assert client.post("/api/sync", json=dict(sync_payload(), csrf_token=token)).status_code == 200
+
+
+def test_user_token_is_shared_between_sessions(app, user, login, csrf):
+    # /today отдаётся из кэша страниц на пользователя — токен не должен зависеть от сессии
+    assert csrf_token(login().get("/today")) == csrf_token(login().get("/today"))
+
+
+def test_session_cookie_flags(app):
+    assert app.config["SESSION_COOKIE_SAMESITE"] == "Lax"
+    assert app.config["REMEMBER_COOKIE_SAMESITE"] == "Lax"
@@ -0,0 +1,85 @@
+"""
+Планы запросов к practice_daily_status и daily_summary (user-002).
+
+Каждый SQL-запрос маршрута перед выполнением прогоняется через
+EXPLAIN QUERY PLAN на том же курсоре SQLite. Ни один из них не должен
+читать эти таблицы полным проходом (SCAN) — только через индексы
+(user_id, practice_id, date), (user_id, date) и сводок (user_id, date).
+"""
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from models import db, Practice, PracticeDailyStatus
+from services import summaries
+
+TABLES = ("practice_daily_status", "daily_summary")
+
+# Алиасы тех же таблиц в запросах (prev — вчерашняя строка в upsert переключения)
+ALIASES = TABLES + ("prev",)
+
+_TABLE_STEP = re.compile(r"^(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?")
+
+
+@contextmanager
+def query_plans():
+    """Собирает (таблица, SCAN|SEARCH, индекс) по всем запросам внутри блока."""
+    steps = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not statement.lstrip().upper().startswith("EXPLAIN"):
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            for row in cursor.fetchall():
+                match = _TABLE_STEP.match(row[-1])
+                if match and match.group(2) in ALIASES:
+                    steps.append((match.group(2), match.group(1), match.group(3)))
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", explain)
+    try:
+        yield steps
+    finally:
+        event.remove(engine, "before_cursor_execute", explain)
+
+
+@pytest.fixture
+def history(app, user):
+    """Месяц истории по трём практикам, чтобы планировщику было что выбирать."""
+    for title in ("Вторая", "Третья"):
+        db.session.add(Practice(title=title, description="Описание"))
+    db.session.flush()
+
+    today = date.today()
+    for practice in Practice.query.all():
+        for n in range(1, 31):
+            db.session.add(PracticeDailyStatus(
+                user_id=user.id, practice_id=practice.id, date=today - timedelta(days=n),
+                completed=n % 3 != 0, streak=0
+            ))
+    db.session.flush()
+    summaries.rebuild([user.id])
+    db.session.commit()
+    return Practice.query.first().id
+
+
+@pytest.mark.parametrize("method, url, expected", [
+    ("POST", "/practice/{pid}/toggle", {"uq_daily_status_user_practice_date", "ix_daily_status_user_date"}),
+    ("GET", "/today", {"ix_daily_status_user_date"}),
+    ("GET", "/api/progress/{pid}", {"uq_daily_summary_user_date", "uq_daily_status_user_practice_date"}),
+    ("GET", "/history", {"uq_daily_summary_user_date"}),
+    ("GET", "/api/history", {"uq_daily_summary_user_date"}),
+])
+def test_route_queries_use_indexes(app, history, login, method, url, expected):
+    client = login()
+
+    with query_plans() as steps:
+        response = client.open(url.format(pid=history), method=method)
+    assert response.status_code == 200
+
+    assert steps, "маршрут не обратился к таблицам статусов"
+    scans = [step for step in steps if step[1] == "SCAN"]
+    assert scans == []
+    assert expected <= {index for _, _, index in steps}
@@ -0,0 +1,50 @@
+"""
+Выгрузка истории (user-012): ровно одна строка на статус дня,
+записи форм за этот день — массивом в колонке entries.
+"""
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from models import db, Practice, PracticeDailyStatus, PracticeEntry
+
+
+@pytest.fixture
+def day_with_two_entries(app, user):
+    practice_id = Practice.query.one().id
+    today = date.today()
+
+    for n in (2, 1):
+        db.session.add(PracticeDailyStatus(
+            user_id=user.id, practice_id=practice_id, date=today - timedelta(days=n), completed=True, streak=3 - n
+        ))
+    for note in ("первая", "вторая"):
+        db.session.add(PracticeEntry(
+            user_id=user.id, practice_id=practice_id, entry_date=(today - timedelta(days=1)).isoformat(),
+            fields={"note": note}
+        ))
+    db.session.commit()
+    return today - timedelta(days=1)
+
+
+def test_csv_has_one_row_per_status(login, day_with_two_entries):
+    response = login().get("/api/export?format=csv")
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+    assert [row["date"] for row in rows] == [
+        (day_with_two_entries - timedelta(days=1)).isoformat(), day_with_two_entries.isoformat()
+    ]
+    assert rows[0]["entries"] == ""
+    assert json.loads(rows[1]["entries"]) == [{"note": "первая"}, {"note": "вторая"}]
+
+
+def test_ndjson_has_one_row_per_status(login, day_with_two_entries):
+    response = login().get("/api/export?format=ndjson")
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert len(rows) == 2
+    assert rows[0]["entries"] == []
+    assert rows[1]["entries"] == [{"note": "первая"}, {"note": "вторая"}]
@@ -0,0 +1,42 @@
+"""
+?ids= в sync (Flask) и async (Starlette) режимах разбирается одинаково (user-018).
+
+ASGI-обработчики работают через свой async-движок; здесь он смотрит в тот же
+файл SQLite, что и фикстура app, а cookie сессии берётся у Flask-клиента.
+"""
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("a2wsgi")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+QUERIES = ["", "?ids=", "?ids=,", "?ids=1", "?ids=1,,"]
+PATHS = ["/api/progress", "/api/analytics/weekdays"]
+
+
+@pytest.fixture
+def asgi_client(app, monkeypatch):
+    import asgi
+
+    engine = create_async_engine(asgi.async_url(app.config["SQLALCHEMY_DATABASE_URI"]))
+    monkeypatch.setattr(asgi, "Session", async_sessionmaker(engine, expire_on_commit=False))
+    with TestClient(asgi.app) as client:
+        yield client
+
+
+def test_ids_are_parsed_the_same_in_both_modes(app, user, login, asgi_client):
+    flask_client = login()
+    asgi_client.cookies.set("session", flask_client.get_cookie("session").value)
+
+    for path in PATHS:
+        for query in QUERIES:
+            expected = flask_client.get(path + query)
+            actual = asgi_client.get(path + query)
+
+            assert actual.status_code == expected.status_code == 200, path + query
+            assert actual.json() == expected.get_json(), path + query
+
+    assert flask_client.get("/api/progress?ids=,").get_json() == {"practices": []}
+    assert len(flask_client.get("/api/progress").get_json()["practices"]) == 1
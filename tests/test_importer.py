@@ -0,0 +1,32 @@
+"""
+Импорт истории (user-013): строки с несуществующей практикой отклоняются.
+"""
+import io
+from datetime import date
+
+import pytest
+
+from models import Practice, PracticeDailyStatus
+from services import importer
+
+
+def run_csv(user, lines):
+    body = "date,practice_id,completed\n" + "\n".join(lines) + "\n"
+    return importer.run(io.StringIO(body), "csv", default_user_id=user.id, log=lambda *_: None)
+
+
+def test_unknown_practice_id_is_a_row_error(app, user):
+    today = date.today().isoformat()
+    practice_id = Practice.query.one().id
+
+    with pytest.raises(importer.ImportRowError, match="Строка 2: нет практики с id 5000000"):
+        run_csv(user, [f"{today},{practice_id},1", f"{today},5000000,1"])
+
+
+def test_known_practice_id_is_imported(app, user):
+    practice_id = Practice.query.one().id
+
+    rows, _ = run_csv(user, [f"{date.today().isoformat()},{practice_id},1"])
+
+    assert rows == 1
+    assert PracticeDailyStatus.query.filter_by(user_id=user.id, practice_id=practice_id).one().completed
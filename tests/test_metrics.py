@@ -0,0 +1,35 @@
+"""
+Профилирование SQL по запросам (user-011).
+"""
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db
+from services.metrics import sql_metrics
+
+
+def test_failed_statement_does_not_skew_timings(app):
+    with app.test_request_context():
+        sql_metrics._start_request()
+        with db.engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+
+            assert "query_started" not in conn.info
+
+        assert g.sql_stats["count"] == 1
+        assert len(g.sql_stats["slowest"]) == 1
+
+
+def test_slowest_statements_header_only_in_debug(app, user, login):
+    client = login()
+    assert "X-DB-Slowest" not in client.get("/api/progress").headers
+
+    app.config["DEBUG_METRICS"] = True
+    slowest = client.get("/api/progress").headers.getlist("X-DB-Slowest")
+
+    assert slowest
+    assert all(value.split("ms ", 1)[1].startswith(("SELECT", "UPDATE", "INSERT")) for value in slowest)
@@ -0,0 +1,39 @@
+"""
+Компиляция схем форм практик (user-021).
+"""
+import json
+import logging
+
+import pytest
+
+from services import schemas
+
+
+def compile_fields(*fields):
+    return schemas.compile_schema(json.dumps(list(fields)))
+
+
+def test_unknown_field_type_falls_back_to_text(caplog):
+    with caplog.at_level(logging.WARNING, logger="tracker.schemas"):
+        schema = compile_fields({"key": "mood", "type": "slider", "max_length": 5})
+
+    assert schema.fields[0]["type"] == "text"
+    assert "slider" in caplog.text
+    assert schema.validate({"mood": " ok "}) == {"mood": "ok"}
+
+    with pytest.raises(schemas.EntryValidationError):
+        schema.validate({"mood": "too long"})
+
+
+@pytest.mark.parametrize("bounds, value, message", [
+    ({"min": 1, "max": 10}, "11", "Число от 1 до 10"),
+    ({"min": 1}, "0", "Число не меньше 1"),
+    ({"max": 10}, "11", "Число не больше 10"),
+])
+def test_number_range_message_names_only_set_bounds(bounds, value, message):
+    schema = compile_fields({"key": "count", "type": "number", **bounds})
+
+    with pytest.raises(schemas.EntryValidationError) as exc:
+        schema.validate({"count": value})
+
+    assert exc.value.errors == {"count": message}
@@ -0,0 +1,36 @@
+"""
+Дневные сводки и id практик (user-005).
+
+Битовые строки сводки индексируются id практики, поэтому в них
+попадают только существующие практики: несуществующий id не должен
+ни записываться переключением, ни раздувать строку сводки.
+"""
+from datetime import date
+
+from models import db, Practice, PracticeDailyStatus
+from services import summaries
+
+
+def test_toggle_of_unknown_practice_is_404(app, user, login):
+    response = login().post("/practice/5000000/toggle")
+
+    assert response.status_code == 404
+    assert PracticeDailyStatus.query.count() == 0
+
+
+def test_summary_bitmap_ignores_statuses_of_missing_practices(app, user):
+    practice_id = Practice.query.one().id
+    today = date.today()
+
+    # Сирота: на SQLite внешние ключи не проверяются
+    db.session.add(PracticeDailyStatus(user_id=user.id, practice_id=practice_id, date=today, completed=True))
+    db.session.add(PracticeDailyStatus(user_id=user.id, practice_id=5000000, date=today, completed=True))
+    db.session.flush()
+    summaries.refresh_day(user.id, today)
+    db.session.commit()
+
+    summary = summaries.load_range(user.id, today, today)[today]
+    assert summary.completed_count == 1
+    assert len(summary.completed_bitmap) == practice_id + 1
+    assert len(summary.tracked_bitmap) == practice_id + 1
+    assert summaries.check(user.id) == []
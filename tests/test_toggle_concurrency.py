@@ -0,0 +1,83 @@
+"""
+Параллельные переключения (user-003, user-005).
+
+Потоки одновременно жмут «выполнено» через POST /practice/<id>/toggle.
+Одна практика: upsert атомарен, поэтому в итоге одна строка, completed
+соответствует чётности числа нажатий, а серия и прогресс — вчерашнему дню.
+Разные практики: сводка дня не теряет ни одной отметки.
+"""
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from models import db, Practice, PracticeDailyStatus
+from services import summaries
+
+THREADS = 16
+
+
+def toggle_in_parallel(clicks):
+    """clicks — пары (клиент, practice_id); все нажатия отпускаются разом."""
+    barrier = threading.Barrier(len(clicks))
+    statuses = []
+
+    def click(client, practice_id):
+        barrier.wait()
+        statuses.append(client.post(f"/practice/{practice_id}/toggle").status_code)
+
+    threads = [threading.Thread(target=click, args=pair) for pair in clicks]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return statuses
+
+
+@pytest.mark.parametrize("clicks", [THREADS, THREADS + 1])
+def test_parallel_toggles_leave_one_consistent_row(app, user, login, clicks):
+    practice_id = Practice.query.one().id
+    today = date.today()
+
+    # Вчера выполнено с серией 3: сегодняшняя отметка продолжает её
+    db.session.add(PracticeDailyStatus(
+        user_id=user.id, practice_id=practice_id, date=today - timedelta(days=1), completed=True, streak=3
+    ))
+    db.session.flush()
+    summaries.refresh_day(user.id, today - timedelta(days=1))
+    db.session.commit()
+
+    statuses = toggle_in_parallel([(login(), practice_id) for _ in range(clicks)])
+    assert statuses == [200] * clicks
+
+    db.session.expire_all()
+    rows = PracticeDailyStatus.query.filter_by(user_id=user.id, practice_id=practice_id, date=today).all()
+    assert len(rows) == 1
+
+    row = rows[0]
+    completed = clicks % 2 == 1
+    streak = 4 if completed else 0
+    assert row.completed is completed
+    assert row.streak == streak
+    assert (row.progress_14, row.progress_30, row.progress_60) == (
+        min(streak * 100 // 14, 100), streak * 100 // 30, streak * 100 // 60
+    )
+
+    # Сводка дня пересчитана последним переключением
+    assert summaries.check(user.id) == []
+
+
+def test_parallel_toggles_of_different_practices_keep_the_summary(app, user, login):
+    for n in range(1, THREADS):
+        db.session.add(Practice(title=f"Практика {n}", description="Описание"))
+    db.session.commit()
+    practice_ids = [p.id for p in Practice.query.order_by(Practice.id)]
+
+    statuses = toggle_in_parallel([(login(), pid) for pid in practice_ids])
+    assert statuses == [200] * len(practice_ids)
+
+    db.session.expire_all()
+    summary = summaries.load_range(user.id, date.today(), date.today())[date.today()]
+    assert summary.completed_count == len(practice_ids)
+    assert all(summary.is_completed(pid) for pid in practice_ids)
+    assert summaries.check(user.id) == []
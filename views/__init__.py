@@ -0,0 +1,3 @@
+"""
+Блюпринты приложения; регистрирует их app.create_app().
+"""
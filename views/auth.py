@@ -0,0 +1,65 @@
+"""
+Вход, регистрация и выход.
+"""
+from urllib.parse import urlsplit
+
+from flask import Blueprint, redirect, render_template, request, url_for
+from flask_login import login_user, logout_user
+
+from models import db, User
+
+bp = Blueprint("auth", __name__)
+
+
+def safe_next(url):
+    """Путь внутри сайта или None: //host, /\\host и адреса со схемой не пропускаем."""
+    if not url or not url.startswith("/") or url.startswith("//") or "\\" in url:
+        return None
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc:
+        return None
+    return url
+
+
+@bp.route("/login", methods=["GET", "POST"])
+def login_page():
+    if request.method == "POST":
+        user = User.query.filter_by(username=request.form.get("username", "").strip()).first()
+
+        if user and user.check_password(request.form.get("password", "")):
+            login_user(user, remember=True)
+            return redirect(safe_next(request.args.get("next")) or url_for("practices.today_page"))
+
+        return render_template("login.html", error="Неверный логин или пароль"), 401
+
+    return render_template("login.html")
+
+
+@bp.route("/register", methods=["GET", "POST"])
+def register_page():
+    if request.method == "POST":
+        username = request.form.get("username", "").strip()
+        password = request.form.get("password", "")
+
+        if not username or not password:
+            return render_template("register.html", error="Заполни логин и пароль"), 400
+
+        if User.query.filter_by(username=username).first():
+            return render_template("register.html", error="Такой логин уже занят"), 400
+
+        user = User(username=username)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+        login_user(user, remember=True)
+        return redirect(url_for("practices.today_page"))
+
+    return render_template("register.html")
+
+
+@bp.route("/logout", methods=["POST"])
+def logout_page():
+    logout_user()
+    return redirect(url_for("practices.welcome_page"))
+
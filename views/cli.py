@@ -0,0 +1,187 @@
+"""
+CLI-команды (flask <команда>): обслуживание сводок, импорт/экспорт,
+итоги, секции, сидинг и поиск. Зависимости команд импортируются внутри
+самих команд — `flask db ...` не тянет за собой аналитику и графики.
+"""
+from datetime import date
+
+import click
+from flask import Blueprint, current_app
+
+from models import db
+from services import search, streaks, summaries
+from services.page_cache import touch_all
+
+# cli_group=None — команды регистрируются на верхнем уровне, как раньше
+bp = Blueprint("cli", __name__, cli_group=None)
+
+
+@bp.cli.command("rebuild-summaries")
+@click.option("--user-id", type=int, default=None, help="Только для одного пользователя.")
+def rebuild_summaries_command(user_id):
+    """Пересобирает дневные сводки по practice_daily_status."""
+    count = summaries.rebuild([user_id] if user_id is not None else None)
+    touch_all()
+    db.session.commit()
+    click.echo(f"Сводок записано: {count}")
+
+
+@bp.cli.command("check-summaries")
+@click.option("--user-id", type=int, default=None, help="Только для одного пользователя.")
+def check_summaries_command(user_id):
+    """Сверяет дневные сводки с practice_daily_status."""
+    problems = summaries.check(user_id)
+    for uid, dt, message in problems:
+        click.echo(f"user={uid} {dt.isoformat()}: {message}")
+
+    if problems:
+        raise SystemExit(1)
+
+    click.echo("Сводки совпадают с исходными данными.")
+
+
+@bp.cli.command("export-history")
+@click.option("--user-id", type=int, required=True)
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default="csv", show_default=True)
+@click.option("--start", type=click.DateTime(["%Y-%m-%d"]), default=None)
+@click.option("--end", type=click.DateTime(["%Y-%m-%d"]), default=None)
+@click.option("--practice-id", "practice_ids", type=int, multiple=True)
+@click.option("--output", type=click.File("w", encoding="utf-8"), default="-")
+def export_history_command(user_id, fmt, start, end, practice_ids, output):
+    """Выгружает историю пользователя в CSV или NDJSON потоком (без архивированных месяцев)."""
+    from services import archive, export
+
+    first_live = archive.boundary()
+    if first_live:
+        click.echo(f"Дни до {first_live.isoformat()} в архиве и в выгрузку не входят", err=True)
+
+    for chunk in export.stream(
+        fmt, user_id,
+        start.date() if start else None,
+        end.date() if end else None,
+        list(practice_ids)
+    ):
+        output.write(chunk)
+
+
+@bp.cli.command("import-history")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None,
+              help="По умолчанию — по расширению файла.")
+@click.option("--user-id", type=int, default=None, help="Пользователь для строк без user_id.")
+@click.option("--chunk-size", type=int, default=2000, show_default=True)
+def import_history_command(source, fmt, user_id, chunk_size):
+    """Импортирует историю выполнения из CSV/NDJSON (повторный запуск безопасен)."""
+    from services import importer
+
+    if fmt is None:
+        fmt = "ndjson" if source.name.endswith((".ndjson", ".jsonl")) else "csv"
+
+    try:
+        rows, rate = importer.run(source, fmt, user_id, chunk_size, log=click.echo)
+    except importer.ImportRowError as exc:
+        db.session.rollback()
+        raise click.ClickException(str(exc))
+
+    touch_all()
+    db.session.commit()
+    click.echo(f"Импортировано строк: {rows} ({rate:.0f} строк/с)")
+
+
+@bp.cli.command("build-digests")
+@click.option("--period", type=click.Choice(["week", "month"]), default="week", show_default=True)
+@click.option("--date", "day", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="Любой день периода; по умолчанию — последний завершённый период.")
+@click.option("--chunk-size", type=int, default=500, show_default=True)
+@click.option("--workers", type=int, default=4, show_default=True)
+@click.option("--force", is_flag=True, help="Пересчитать и уже готовые итоги.")
+def build_digests_command(period, day, chunk_size, workers, force):
+    """Считает итоги за неделю/месяц для всех пользователей (можно прерывать и перезапускать)."""
+    from services import digests
+
+    if day:
+        start, end = digests.period_bounds(period, day.date())
+    else:
+        start, end = digests.last_complete_period(period, date.today())
+
+    click.echo(f"Период {period}: {start.isoformat()} — {end.isoformat()}")
+    processed = digests.run(current_app._get_current_object(), period, start, end, chunk_size, workers, force, log=click.echo)
+    click.echo(f"Обработано пользователей: {processed}")
+
+
+@bp.cli.command("ensure-partitions")
+@click.option("--months-ahead", type=int, default=3, show_default=True)
+def ensure_partitions_command(months_ahead):
+    """Создаёт помесячные секции practice_daily_status наперёд (Postgres; запускать по расписанию)."""
+    from services import partitions
+
+    created = partitions.ensure(months_ahead)
+    if not partitions.is_partitioned():
+        click.echo("Таблица не секционирована — пропускаем")
+        return
+    click.echo(f"Создано секций: {len(created)}" + (f" ({', '.join(created)})" if created else ""))
+
+
+@bp.cli.command("archive-statuses")
+@click.option("--keep-months", type=int, default=12, show_default=True,
+              help="Сколько последних месяцев оставить в живой таблице (не меньше 3).")
+def archive_statuses_command(keep_months):
+    """Сжимает старые месяцы practice_daily_status в месячные маски и удаляет сырые строки."""
+    from services import archive, partitions
+
+    archived = archive.run(keep_months, date.today(), log=click.echo)
+    partitions.ensure()
+    touch_all()
+    db.session.commit()
+    click.echo(f"В архив ушло строк: {archived}")
+
+
+@bp.cli.command("seed-content")
+@click.option("--file", "path", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="По умолчанию — data/content.json.")
+@click.option("--prune", is_flag=True, help="Удалить советы, примеры и подсказки, которых нет в файле.")
+def seed_content_command(path, prune):
+    """Загружает практики, советы, примеры и подсказки из файла (идемпотентно)."""
+    from services import init_practtices
+
+    changed = init_practtices.init_practices(path or init_practtices.DEFAULT_PATH, prune=prune, log=click.echo)
+    if changed:
+        # init_practices уже сбросил справочный кэш; ETag и кэш страниц — по версии данных
+        touch_all()
+        db.session.commit()
+    click.echo("Изменено: " + (", ".join(sorted(changed)) or "ничего"))
+
+
+@bp.cli.command("search-reindex")
+def search_reindex_command():
+    """Пересобирает поисковый индекс (после массовых вставок в обход ORM)."""
+    total = search.reindex(log=click.echo)
+    db.session.commit()
+    click.echo(f"Проиндексировано документов: {total}")
+
+
+@bp.cli.command("generate-synthetic")
+@click.option("--users", type=int, default=100, show_default=True)
+@click.option("--practices", type=int, default=10, show_default=True)
+@click.option("--days", type=int, default=365, show_default=True)
+@click.option("--rate", type=float, default=0.7, show_default=True, help="Доля выполненных дней.")
+@click.option("--seed", type=int, default=0, show_default=True)
+def generate_synthetic_command(users, practices, days, rate, seed):
+    """Заполняет БД синтетическими пользователями и историей для нагрузочных тестов."""
+    from services import synthetic
+
+    rows = synthetic.generate(users=users, practices=practices, days=days, rate=rate, seed=seed, log=click.echo)
+    touch_all()
+    db.session.commit()
+    click.echo(f"Записано строк истории: {rows}")
+
+
+@bp.cli.command("backfill-streaks")
+@click.option("--user-id", type=int, default=None, help="Только для одного пользователя.")
+def backfill_streaks_command(user_id):
+    """Пересчитывает streak и прогресс по всей истории одним запросом."""
+    updated = streaks.backfill(user_id)
+    touch_all()
+    db.session.commit()
+    click.echo(f"Обновлено строк: {updated}")
+
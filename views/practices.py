@@ -0,0 +1,208 @@
+"""
+Практики: главная, «Сегодня», справочник, формы записей и отметки выполнения.
+"""
+from datetime import date
+
+from flask import Blueprint, abort, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from models import db, PracticeDailyStatus
+from services import entries, reference, schemas, summaries, sync
+from services.daily_status import toggle_status
+from services.page_cache import cached_page, touch_user
+
+bp = Blueprint("practices", __name__)
+
+
+# ---------------------------------------------------------
+# Мотивационный блок
+# ---------------------------------------------------------
+
+
+def generate_motivation(statuses, practices):
+    completed_count = sum(1 for s in statuses.values() if s.completed)
+    total = len(practices)
+
+    if completed_count == 0:
+        return "Начни с самой простой практики — движение запускается с первого шага."
+
+    if completed_count == 1:
+        return "Отлично. Одна практика — это уже точка опоры. Закрепи её."
+
+    if total > 0 and completed_count >= total * 0.5 and completed_count < total:
+        return "Ты уже в процессе. Держи темп — прогресс строится на повторении."
+
+    if total > 0 and completed_count == total:
+        return "Сегодня ты закрыл весь список. Это и есть дисциплина в действии."
+
+    max_streak = max((s.streak for s in statuses.values()), default=0)
+
+    if max_streak >= 7:
+        return f"Серия {max_streak} дней — это уже привычка. Продолжай укреплять."
+
+    if max_streak >= 3:
+        return f"Серия {max_streak} дней — хороший старт. Не обрывай ритм."
+
+    return "Каждое выполненное действие — кирпич в твою систему. Продолжай."
+
+
+# ---------------------------------------------------------
+# Маршруты
+# ---------------------------------------------------------
+
+@bp.route("/")
+def welcome_page():
+    return render_template(
+        "welcome.html",
+        today=url_for(".today_page"),
+        practices=url_for(".practice_list_page"),
+        guide=url_for(".guide_page"),
+    )
+
+
+@bp.route("/today")
+@login_required
+@cached_page
+def today_page():
+    today = date.today()
+
+    practices = reference.get_practices()
+
+    statuses = {
+        s.practice_id: s
+        for s in PracticeDailyStatus.query.filter_by(
+            user_id=current_user.id,
+            date=today
+        ).all()
+    }
+
+    hint_of_day = reference.get_hint_of_day(today)
+    example_of_day = reference.get_example_of_day(today)
+
+    # Подсказки и примеры практик уже загружены вместе с практиками
+    practice_tips = {p.id: reference.pick_of_day(p.tips, today) for p in practices}
+    practice_examples = {p.id: reference.pick_of_day(p.examples, today) for p in practices}
+
+    motivation = generate_motivation(statuses, practices)
+
+    return render_template(
+        "today.html",
+        practices=practices,
+        statuses=statuses,
+        hint_of_day=hint_of_day,
+        example_of_day=example_of_day,
+        practice_tips=practice_tips,
+        practice_examples=practice_examples,
+        motivation=motivation,
+        today=today
+    )
+
+
+@bp.route("/guide")
+def guide_page():
+    practices = reference.get_practices()
+    return render_template("guide.html", practices=practices)
+
+
+@bp.route("/practices")
+def practice_list_page():
+    practices = reference.get_practices()
+    return render_template("practice_list.html", practices=practices)
+
+
+@bp.route("/practice/<int:pid>")
+@login_required
+def practice_detail(pid):
+    practice = reference.get_practice(pid) or abort(404)
+
+    return render_template(
+        "practice_detail.html",
+        practice=practice,
+        schema=schemas.for_practice(practice).fields,
+        entries=entries.list_entries(current_user.id, pid)
+    )
+
+
+@bp.route("/practice/<int:pid>/form", methods=["GET", "POST"])
+@login_required
+def practice_form(pid):
+    practice = reference.get_practice(pid) or abort(404)
+    schema = schemas.for_practice(practice)
+
+    if request.method == "POST":
+        try:
+            entries.create(current_user.id, practice, request.form)
+        except schemas.EntryValidationError as exc:
+            return render_template(
+                "practice_form.html", practice=practice, schema=schema.fields,
+                errors=exc.errors, values=request.form
+            ), 400
+        return redirect(url_for(".practice_detail", pid=pid))
+
+    return render_template("practice_form.html", practice=practice, schema=schema.fields)
+
+
+@bp.route("/practice/<int:pid>/toggle", methods=["POST"])
+@login_required
+def toggle_practice(pid):
+    today = date.today()
+
+    # Несуществующий id: на Postgres — IntegrityError, на SQLite — сирота в статусах
+    if reference.get_practice(pid) is None:
+        return jsonify({"error": "Практика не найдена"}), 404
+
+    # Первым — UPDATE строки пользователя: её блокировка выстраивает его
+    # переключения в очередь, и сводка дня читается уже после чужого коммита
+    touch_user(current_user.id)
+
+    # Один атомарный upsert: переключение, streak и прогресс за один запрос
+    status = toggle_status(current_user.id, pid, today)
+    summaries.refresh_day(current_user.id, today)
+    db.session.commit()
+
+    return jsonify({
+        "completed": status.completed,
+        "streak": status.streak,
+        "progress_14": status.progress_14,
+        "progress_30": status.progress_30,
+        "progress_60": status.progress_60,
+        "practice_id": pid
+    })
+
+
+@bp.route("/api/sync", methods=["POST"])
+@login_required
+def api_sync():
+    """
+    Пакет отметок из офлайн-очереди клиента:
+    {"ops": [{"practice_id": 1, "date": "ГГГГ-ММ-ДД", "completed": true}, ...]}.
+    Всё применяется одной транзакцией, ответ — итоговое состояние каждой пары.
+    """
+    payload = request.get_json(silent=True) or {}
+    practice_ids = {p.id for p in reference.get_practices()}
+
+    try:
+        states = sync.parse_ops(payload.get("ops"), practice_ids, date.today())
+    except sync.SyncError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    # Блокировка строки пользователя до чтения статусов — как в toggle_practice
+    touch_user(current_user.id)
+    rows = sync.apply(current_user.id, states)
+    db.session.commit()
+
+    return jsonify({
+        "results": [
+            {
+                "practice_id": row.practice_id,
+                "date": row.date.isoformat(),
+                "completed": row.completed,
+                "streak": row.streak,
+                "progress_14": row.progress_14,
+                "progress_30": row.progress_30,
+                "progress_60": row.progress_60,
+            }
+            for row in rows
+        ]
+    })
+
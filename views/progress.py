@@ -0,0 +1,109 @@
+"""
+Прогресс, история и итоги: страницы и JSON для графиков.
+"""
+from flask import Blueprint, jsonify, render_template, request
+from flask_login import current_user, login_required
+
+from services import history, progress, reference
+from services.page_cache import cached_page
+
+bp = Blueprint("progress", __name__)
+
+
+@bp.route("/progress")
+@login_required
+@cached_page
+def progress_page():
+    """
+    Страница визуализации прогресса: выбор практики и график.
+    """
+    practices = reference.get_practices()
+    practice_id = request.args.get("practice_id", type=int)
+    selected = None
+    if practice_id:
+        selected = reference.get_practice(practice_id)
+    return render_template(
+        "progress.html",
+        practices=practices,
+        selected_practice=selected
+    )
+
+
+@bp.route("/api/progress/<int:practice_id>")
+@login_required
+def api_progress(practice_id):
+    """
+    JSON-данные для графика: последние 60 дней.
+    """
+    return jsonify(progress.build_series(current_user.id, [practice_id])[practice_id])
+
+
+@bp.route("/api/progress")
+@login_required
+def api_progress_batch():
+    """
+    JSON-данные для графиков по нескольким практикам: ?ids=1,2,3.
+    Без ids — по всем практикам.
+    """
+    try:
+        practice_ids = progress.parse_ids(request.args.get("ids"))
+    except ValueError:
+        return jsonify({"error": "ids должны быть целыми числами"}), 400
+    if practice_ids is None:
+        practice_ids = [p.id for p in reference.get_practices()]
+
+    series = progress.build_series(current_user.id, practice_ids)
+
+    return jsonify({"practices": [series[pid] for pid in practice_ids]})
+
+
+@bp.route("/history")
+@login_required
+@cached_page
+def history_page():
+    practices = reference.get_practices()
+    days, next_cursor = history.page(current_user.id)
+
+    return render_template(
+        "history.html",
+        days=days,
+        next_cursor=next_cursor,
+        practices={p.id: {"title": p.title, "color": p.color} for p in practices}
+    )
+
+
+@bp.route("/api/history")
+@login_required
+def api_history():
+    """
+    Следующая страница истории: ?cursor=ГГГГ-ММ-ДД:id&limit=100,
+    необязательный диапазон ?from=ГГГГ-ММ-ДД&to=ГГГГ-ММ-ДД.
+    """
+    try:
+        start, end = history.parse_range(request.args.get("from"), request.args.get("to"))
+        days, next_cursor = history.page(
+            current_user.id,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", history.PAGE_SIZE, type=int),
+            start=start,
+            end=end
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify({"days": days, "next_cursor": next_cursor})
+
+
+@bp.route("/digest")
+@login_required
+def digest_page():
+    """Готовые недельные и месячные итоги — только чтение из таблицы digest."""
+    from services import digests
+
+    return render_template(
+        "digest.html",
+        week=digests.latest(current_user.id, "week"),
+        month=digests.latest(current_user.id, "month"),
+        practices={p.id: p for p in reference.get_practices()}
+    )
+
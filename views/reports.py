@@ -0,0 +1,154 @@
+"""
+Аналитика, графики картинкой и выгрузка истории.
+
+Здесь живут тяжёлые зависимости (numpy, matplotlib): services.analytics,
+services.charts и services.export импортируются внутри обработчиков,
+только когда маршрут впервые вызван. Ни старт воркера, ни flask-команды
+их не загружают.
+"""
+from datetime import date
+
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, stream_with_context
+from flask_login import current_user, login_required
+
+from services import archive, progress, reference
+from services.page_cache import data_version, page_cache
+
+bp = Blueprint("reports", __name__)
+
+
+@bp.route("/analytics")
+@login_required
+def analytics_page():
+    practices = reference.get_practices()
+
+    # Лёгкий режим: готовые картинки с сервера вместо Chart.js
+    if request.args.get("view") == "images":
+        return render_template("analytics.html", practices=practices, images=True)
+
+    # Преобразуем объекты Practice в словари для JSON
+    practices_data = [
+        {
+            "id": p.id,
+            "title": p.title,
+            "color": p.color
+        }
+        for p in practices
+    ]
+
+    # Данные графиков встраиваем сразу в страницу — без отдельных запросов
+    series = progress.build_series(current_user.id, [p.id for p in practices])
+    progress_data = [series[p.id] for p in practices]
+
+    return render_template(
+        "analytics.html",
+        practices=practices,          # для цикла {% for practice in practices %}
+        practices_data=practices_data, # для передачи в JS
+        progress_data=progress_data
+    )
+
+
+@bp.route("/api/analytics/<metric>")
+@login_required
+def api_analytics(metric):
+    """
+    Долгосрочные метрики: weekdays, rolling, streaks, heatmap.
+    ?days=365 — окно в днях, ?days=all — вся история; ?ids=1,2 — практики.
+    """
+    from services import analytics
+
+    if metric not in analytics.METRICS:
+        return jsonify({"error": f"Неизвестная метрика: {metric}"}), 404
+
+    try:
+        days = analytics.parse_days(request.args.get("days", "365"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    try:
+        practice_ids = progress.parse_ids(request.args.get("ids"))
+    except ValueError:
+        return jsonify({"error": "ids должны быть целыми числами"}), 400
+    if practice_ids is None:
+        practice_ids = [p.id for p in reference.get_practices()]
+
+    return jsonify(analytics.compute(metric, current_user.id, practice_ids, days))
+
+
+@bp.route("/chart/progress/<int:practice_id>.<fmt>")
+@login_required
+def chart_progress(practice_id, fmt):
+    """
+    График прогресса картинкой (PNG/SVG): рендер в пуле процессов,
+    кэш и ETag по версии данных пользователя.
+    """
+    from services import charts
+
+    if fmt not in charts.FORMATS:
+        return jsonify({"error": "Формат: png или svg"}), 404
+
+    practice = reference.get_practice(practice_id)
+    if practice is None:
+        return jsonify({"error": "Практика не найдена"}), 404
+
+    etag = f"chart-{practice_id}-{fmt}-{data_version(current_user)}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        try:
+            image = page_cache.get_or_load(
+                "charts",
+                etag,
+                lambda: charts.render_in_pool(
+                    progress.build_series(current_user.id, [practice_id])[practice_id],
+                    fmt,
+                    practice.title,
+                    workers=current_app.config["CHART_WORKERS"]
+                )
+            )
+        except charts.ChartTimeout as exc:
+            # Пул занят: клиент повторит позже, воркер не висит дольше timeout
+            response = jsonify({"error": str(exc)})
+            response.status_code = 503
+            response.headers["Retry-After"] = "5"
+            return response
+        response = Response(image, mimetype=charts.FORMATS[fmt])
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@bp.route("/api/export")
+@login_required
+def api_export():
+    """
+    Потоковая выгрузка истории: ?format=csv|ndjson&start=&end=&practice_id=...
+    """
+    from services import export
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in export.FORMATS:
+        return jsonify({"error": "format: csv или ndjson"}), 400
+
+    try:
+        start = date.fromisoformat(request.args["start"]) if request.args.get("start") else None
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else None
+    except ValueError:
+        return jsonify({"error": "Даты в формате ГГГГ-ММ-ДД"}), 400
+
+    practice_ids = request.args.getlist("practice_id", type=int)
+
+    body = export.stream(fmt, current_user.id, start, end, practice_ids)
+    response = Response(
+        stream_with_context(body),
+        mimetype=export.FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=history.{fmt}"}
+    )
+
+    # Дни раньше этой даты в архиве и в выгрузку не попадают
+    first_live = archive.boundary()
+    if first_live:
+        response.headers["X-Archived-Before"] = first_live.isoformat()
+    return response
+
@@ -0,0 +1,58 @@
+"""
+Полнотекстовый поиск: страница и JSON.
+"""
+from flask import Blueprint, jsonify, render_template, request, url_for
+from flask_login import current_user
+
+from services import reference, search
+
+bp = Blueprint("search", __name__)
+
+
+def search_results():
+    """Страница поиска по ?q=&cursor=; записи форм видит только их автор."""
+    user_id = current_user.id if current_user.is_authenticated else None
+    rows, next_cursor = search.search(
+        request.args.get("q", ""),
+        user_id=user_id,
+        cursor=request.args.get("cursor"),
+        limit=request.args.get("limit", search.PAGE_SIZE, type=int)
+    )
+
+    practices = {p.id: p for p in reference.get_practices()}
+    results = []
+    for row in rows:
+        practice = practices.get(row.practice_id)
+        results.append({
+            "kind": row.kind,
+            "ref_id": row.ref_id,
+            "label": search.LABELS[row.kind],
+            "title": practice.title if practice and row.kind != "entry" else row.title,
+            "practice_title": practice.title if practice else None,
+            "snippet": search.highlight(row.snippet),
+            "url": url_for("practices.practice_detail", pid=practice.id) if practice else None,
+        })
+    return results, next_cursor
+
+
+@bp.route("/search")
+def search_page():
+    try:
+        results, next_cursor = search_results()
+    except ValueError as exc:
+        return render_template("search.html", q=request.args.get("q", ""), error=str(exc)), 400
+
+    return render_template("search.html", q=request.args.get("q", ""), results=results, next_cursor=next_cursor)
+
+
+@bp.route("/api/search")
+def api_search():
+    try:
+        results, next_cursor = search_results()
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    for result in results:
+        result["snippet"] = str(result["snippet"])
+    return jsonify({"results": results, "next_cursor": next_cursor})
+